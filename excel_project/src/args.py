@@ -1,62 +1,143 @@
-"""
-File: args.py
-Author: Kyle Fullerton
-Purpose: Handles parsing the command line arguments and puts the given
-arguments into their respective variables.
-"""
-
-import argparse
-# The argparse library does its own error checking. Also the last argument given is what will
-# be used for the arguments respective variable. Ex: -c file_path -c other_file will result in
-# other_file used as the configuration file for the program.
-
-"""
-Method: parse_arguments
-Purpose: Parses the command line arguments, 
-puts those arguments into variables, and then
-returns the variables to the caller. 
-
-Returns: 
-directory- filepath to a directory of files
-config_file- filepath to an alternate configuration file
-pars- A list of configuration parameters the user wants to change.
-Must be like INI format with no spaces in between "foo=2" or "foo:2".
-"""
-
-
-def parse_arguments():
-    parser = argparse.ArgumentParser()
-    add_options(parser)
-
-    args = parser.parse_args()
-    directory = args.directory
-    config_file = args.config_file
-    parameters = args.parameters
-
-    return directory, config_file, parameters
-
-
-"""
-Method: add_options
-Purpose: Adds command line options to store specific
-arguments into their respective variables.
-
-Parameter: parser- ArgumentParser object
-"""
-
-
-def add_options(parser):
-    # dest is where the argument is stored
-    # required means the argument is required or an error occurs
-    # nargs is the number of arguments read in after the commands
-    # help is the help message that appears after -h
-
-    parser.add_argument("-d", "--directory", dest="directory", required=True,
-                        help="file path to a directory to read in excel files")
-
-    parser.add_argument("-c", "--config-file", dest="config_file",
-                        help="specify a different configuration file besides the default")
-
-    parser.add_argument("-p", "--change-parameters", dest="parameters", nargs="*",
-                        help="change one or more of the default configuration parameters")
-
+"""
+File: args.py
+Author: Kyle Fullerton
+Purpose: Handles parsing the command line arguments and puts the given
+arguments into their respective variables.
+"""
+
+import argparse
+# The argparse library does its own error checking. Also the last argument given is what will
+# be used for the arguments respective variable. Ex: -c file_path -c other_file will result in
+# other_file used as the configuration file for the program.
+
+"""
+Method: parse_arguments
+Purpose: Parses the command line arguments, 
+puts those arguments into variables, and then
+returns the variables to the caller. 
+
+Returns: 
+directory- filepath to a directory of files
+config_file- filepath to an alternate configuration file
+pars- A list of configuration parameters the user wants to change.
+Must be like INI format with no spaces in between "foo=2" or "foo:2".
+options- dictionary of run options that aren't configuration parameters.
+Ex: {"jobs": 4, "reader": "xlrd", "rebuild": False, "cache": True, "watch": False,
+"stats_json": "stats.json", "profile": None, "gsheets_diff": True,
+"totals": "formula", "check": False, "prescan": True,
+"store": False, "export": True, "snapshot": False}
+"""
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    add_options(parser)
+
+    args = parser.parse_args()
+    directory = args.directory
+    config_file = args.config_file
+    parameters = args.parameters
+    options = {"jobs": args.jobs,
+               "reader": args.reader,
+               "rebuild": args.rebuild,
+               "cache": args.cache,
+               "watch": args.watch,
+               "poll_interval": args.poll_interval,
+               "flush_interval": args.flush_interval,
+               "stats_json": args.stats_json,
+               "profile": args.profile,
+               "gsheets_diff": args.gsheets_diff,
+               "totals": args.totals,
+               "check": args.check,
+               "prescan": args.prescan or args.check,
+               "store": args.store,
+               "export": args.export or not args.store,
+               "snapshot": args.snapshot and not args.store}
+
+    return directory, config_file, parameters, options
+
+
+"""
+Method: add_options
+Purpose: Adds command line options to store specific
+arguments into their respective variables.
+
+Parameter: parser- ArgumentParser object
+"""
+
+
+def add_options(parser):
+    # dest is where the argument is stored
+    # required means the argument is required or an error occurs
+    # nargs is the number of arguments read in after the commands
+    # help is the help message that appears after -h
+
+    parser.add_argument("-d", "--directory", dest="directory", required=True,
+                        help="file path to a directory to read in excel files")
+
+    parser.add_argument("-c", "--config-file", dest="config_file",
+                        help="specify a different configuration file besides the default")
+
+    parser.add_argument("-p", "--change-parameters", dest="parameters", nargs="*",
+                        help="change one or more of the default configuration parameters")
+
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=1,
+                        help="number of processes used to read in the excel files")
+
+    parser.add_argument("-r", "--reader", dest="reader", choices=["xlrd", "stream"],
+                        default="xlrd",
+                        help="reader used for the excel files. stream reads .xlsx files "
+                             "row by row with openpyxl")
+
+    parser.add_argument("--rebuild", dest="rebuild", action="store_true",
+                        help="make all of the updates in memory and then write the "
+                             "output file in one pass")
+
+    parser.add_argument("--cache", dest="cache", action="store_true",
+                        help="only read in files that are new or changed since the last "
+                             "run and add just the difference to the output file")
+
+    parser.add_argument("-w", "--watch", dest="watch", action="store_true",
+                        help="keep running and add files as they are put in the directory")
+
+    parser.add_argument("--poll-interval", dest="poll_interval", type=float, default=2,
+                        help="seconds between each check of the directory in watch mode")
+
+    parser.add_argument("--flush-interval", dest="flush_interval", type=float, default=30,
+                        help="seconds between each save of the output file in watch mode")
+
+    parser.add_argument("--stats-json", dest="stats_json", metavar="PATH",
+                        help="write the time, rows, cells written, and peak memory of each "
+                             "stage and each file to a JSON file")
+
+    parser.add_argument("--profile", dest="profile", metavar="PATH",
+                        help="profile the merge stage with cProfile and write the "
+                             "results to a file")
+
+    parser.add_argument("--gsheets-diff", dest="gsheets_diff", action="store_true",
+                        help="only send the google sheets cells that changed since the last sync")
+
+    parser.add_argument("--totals", dest="totals", choices=["formula", "value", "both"],
+                        default="formula",
+                        help="write the totals sheet as SUMPRODUCT formulas, as numbers, or "
+                             "as formulas with the numbers in the next column")
+
+    parser.add_argument("--prescan", dest="prescan", action="store_true",
+                        help="check the first rows of every file before any of them are "
+                             "read in and only read in the valid files")
+
+    parser.add_argument("--check", dest="check", action="store_true",
+                        help="only check the first rows of every file, report the files "
+                             "that aren't valid, and exit without changing the output file")
+
+    parser.add_argument("--store", dest="store", action="store_true",
+                        help="keep the parts and qtys in a SQLite file next to the output "
+                             "file and export the output file from it")
+
+    parser.add_argument("--no-export", dest="export", action="store_false",
+                        help="with --store, only update the SQLite file and don't write "
+                             "the output file")
+
+    parser.add_argument("--snapshot", dest="snapshot", action="store_true",
+                        help="save a binary snapshot of the output sheet next to the output "
+                             "file and read it instead of the output file if it hasn't changed")
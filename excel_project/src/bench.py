@@ -0,0 +1,568 @@
+"""
+File: bench.py
+Author: Kyle Fullerton
+Purpose: File that is used to benchmark each stage of the program with
+synthetic input files. The input files are made to match the layout in
+the configuration file (document labels, headers, and data rows) so the
+same configuration file used for the real files can be used here.
+The throughput of each stage can be saved as a baseline and later runs
+compared against it, so a slowdown makes the benchmark fail.
+
+Run with: python -m excelScript.bench -c config_file [options]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import openpyxl
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import xlrd
+
+from excelScript import configs, excel, process_files, readers, utils
+
+
+"""
+Method: main
+Purpose: Parses the benchmark arguments, makes the synthetic files,
+times each stage of a merge, and prints the results. Exits with 1 if
+a stage is slower than the baseline allows.
+
+Variables:
+bench_args- argparse Namespace of the benchmark arguments
+configs_dict- dictionary of configuration parameters
+directory_path- directory the synthetic files are put in
+timings- list of (stage, seconds, rows) tuples
+"""
+
+
+def main():
+    bench_args = parse_arguments()
+
+    start = time.perf_counter()
+    configs_dict = configs.make_config_dict(bench_args.config_file, None)
+    timings = [("config load", time.perf_counter() - start, 0)]
+
+    directory_path = bench_args.keep or tempfile.mkdtemp(prefix="excel_bench_")
+    os.makedirs(directory_path, exist_ok=True)
+
+    try:
+        files, write_file = make_files(directory_path, configs_dict, bench_args)
+        timings.extend(time_stages(directory_path, files, write_file, configs_dict,
+                                   bench_args.readers or ["stream"]))
+
+    finally:
+        if bench_args.keep is None:
+            shutil.rmtree(directory_path)
+
+    print_timings(timings)
+
+    if bench_args.save_baseline is not None:
+        save_baseline(bench_args.save_baseline, timings, bench_args)
+
+    if bench_args.baseline is not None and \
+            not check_baseline(bench_args.baseline, timings, bench_args):
+        sys.exit(1)
+
+
+"""
+Method: parse_arguments
+Purpose: Parses the command line arguments for the benchmark.
+
+Return: argparse Namespace of the benchmark arguments
+"""
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="benchmark the excel merge with synthetic files")
+
+    parser.add_argument("-c", "--config-file", dest="config_file",
+                        help="configuration file the synthetic files are made to match")
+    parser.add_argument("--files", type=int, default=20,
+                        help="number of input files to make")
+    parser.add_argument("--rows", type=int, default=1000,
+                        help="number of data rows in each input file")
+    parser.add_argument("--assemblies", type=int, default=10,
+                        help="number of different assembly numbers across the files")
+    parser.add_argument("--overlap", type=float, default=0.5,
+                        help="ratio of part numbers that are shared between files")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the random data")
+    parser.add_argument("--keep", metavar="DIRECTORY",
+                        help="make the files in this directory and keep them afterwards")
+    parser.add_argument("-r", "--reader", dest="readers", action="append",
+                        choices=["xlrd", "stream"],
+                        help="reader to time. Can be given more than once (default stream)")
+    parser.add_argument("--save-baseline", dest="save_baseline", metavar="FILE",
+                        help="save the rows per second of each stage to a JSON file")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="compare the rows per second of each stage to a saved baseline "
+                             "and exit with 1 if a stage is too slow")
+    parser.add_argument("--max-slowdown", dest="max_slowdown", type=float, default=0.2,
+                        help="ratio a stage can be slower than the baseline (default 0.2)")
+
+    return parser.parse_args()
+
+
+"""
+Method: make_files
+Purpose: Makes the synthetic input files and an empty output file.
+
+Parameters:
+directory_path- directory the files are put in
+configs_dict- dictionary of configuration parameters
+bench_args- argparse Namespace of the benchmark arguments
+
+Variables:
+rand- Random object seeded from the arguments
+shared_parts- number of part numbers that files pick from together
+files- list of input filenames
+write_file- path of the output file
+write_book- Openpyxl workbook of the output file
+
+Returns:
+files- list of input filenames
+write_file- path of the output file
+"""
+
+
+def make_files(directory_path, configs_dict, bench_args):
+    rand = random.Random(bench_args.seed)
+    shared_parts = max(int(bench_args.rows * bench_args.overlap), 1)
+    files = []
+
+    for file_num in range(bench_args.files):
+        file = "bench_{0:04d}.xlsx".format(file_num)
+        assembly_num = "ASSY-{0:03d}".format(file_num % max(bench_args.assemblies, 1))
+
+        make_input_file(os.path.join(directory_path, file), assembly_num, file_num,
+                        shared_parts, configs_dict, bench_args, rand)
+        files.append(file)
+
+    write_file = os.path.join(directory_path, os.path.basename(configs_dict["out_file"]))
+    write_book = openpyxl.Workbook()
+    write_book.active.title = configs_dict["out_sheet_name"]
+    write_book.save(write_file)
+
+    return files, write_file
+
+
+"""
+Method: make_input_file
+Purpose: Makes one synthetic input file. The document labels and values,
+the assembly number, and the header row are put where the configuration
+parameters say they should be. Each data row picks a shared part number
+with a chance of the overlap ratio and otherwise a part number that only
+this file has.
+
+Parameters:
+file_path- path of the file to make
+assembly_num- assembly number of the file
+file_num- number of the file used to make unique part numbers
+shared_parts- number of part numbers that files pick from together
+configs_dict- dictionary of configuration parameters
+bench_args- argparse Namespace of the benchmark arguments
+rand- Random object
+
+Variables:
+work_book- Openpyxl workbook of the file
+sheet- first worksheet of the workbook
+columns- list of the wanted columns
+width- number of columns filled in for each data row
+remarks- index of the remarks in the wanted data
+row- row number of the current data row
+"""
+
+
+def make_input_file(file_path, assembly_num, file_num, shared_parts,
+                    configs_dict, bench_args, rand):
+    work_book = openpyxl.Workbook()
+    sheet = work_book.active
+    sheet.title = configs_dict["in_sheet_name"]
+
+    label_start = configs_dict["label_start_row"]
+    for i, label in enumerate(configs_dict["doc_labels"]):
+        sheet.cell(label_start + i, configs_dict["doc_labels_column"]).value = label
+        sheet.cell(label_start + i, configs_dict["doc_values_column"]).value = "value"
+
+    sheet.cell(configs_dict["part_num_row"], configs_dict["part_num_column"]).value = assembly_num
+
+    for i, header in enumerate(configs_dict["header_list"]):
+        sheet.cell(configs_dict["headers_row"], i + 1).value = header
+
+    columns = [int(column) for column in configs_dict["wanted_columns"]]
+    remarks = configs_dict["out_remarks_index"] - 1
+    width = max(columns + configs_dict["check_columns"] + [len(configs_dict["header_list"])])
+
+    for row in range(configs_dict["data_start"], configs_dict["data_start"] + bench_args.rows):
+        if rand.random() < bench_args.overlap:
+            part_num = "PN-{0:06d}".format(rand.randrange(shared_parts))
+        else:
+            part_num = "PN-{0:04d}-{1:06d}".format(file_num, row)
+
+        values = ["x"] * width
+        values[columns[0] - 1] = part_num
+        values[columns[1] - 1] = "part " + part_num
+        values[columns[remarks] - 1] = rand.choice(["ACME", "BOLT CO", "CORP", "DIST"])
+        values[columns[-1] - 1] = float(rand.randint(1, 10))
+
+        for column, value in enumerate(values, 1):
+            sheet.cell(row, column).value = value
+
+    work_book.save(file_path)
+
+
+"""
+Method: time_stages
+Purpose: Runs a merge of the synthetic files and times each stage. The
+files are read in with each of the readers, and the files read in by
+the first reader that can read them are merged.
+
+Parameters:
+directory_path- directory of the files
+files- list of input filenames
+write_file- path of the output file
+configs_dict- dictionary of configuration parameters
+reader_names- list of the names of the readers to time
+
+Variables:
+reader_timings- timings of the current reader
+reader_files- list of InputFiles read in by the current reader or None
+in_files- list of InputFiles that are merged
+row_count- number of data rows read in
+totals_writer- TotalsWriter of the totals sheet
+
+Return: list of (stage, seconds, rows) tuples
+"""
+
+
+def time_stages(directory_path, files, write_file, configs_dict, reader_names):
+    timings = []
+
+    start = time.perf_counter()
+    out_write_book, out_write_sheet = process_files.\
+        get_valid_writebook(write_file, configs_dict["out_sheet_name"])
+    master_rows = process_files.read_master_rows(out_write_sheet)
+    part_table = process_files.create_part_table(master_rows, configs_dict)
+    header_list = excel.add_headers(master_rows, out_write_sheet, configs_dict)
+    timings.append(("master load", time.perf_counter() - start, len(master_rows)))
+
+    in_files = None
+    for reader in reader_names:
+        reader_timings, reader_files = TIMERS[reader](directory_path, files, configs_dict)
+        timings.extend(reader_timings)
+
+        if in_files is None:
+            in_files = reader_files
+
+    if in_files is None:
+        print("Error: none of the readers could read in the synthetic files")
+        sys.exit(1)
+
+    row_count = sum(len(in_file.rows) for in_file in in_files)
+
+    # the lines skipped that update_master prints for each file are kept out of the results
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for file, in_file in zip(files, in_files):
+            utils.add_assembly_num(header_list, out_write_sheet,
+                                   in_file.assembly_num, configs_dict)
+            excel.update_master(in_file, out_write_sheet, header_list, part_table,
+                                configs_dict, file)
+    excel.write_remarks(out_write_sheet, part_table, configs_dict)
+    timings.append(("update_master", time.perf_counter() - start, row_count))
+
+    start = time.perf_counter()
+    totals_writer = excel.TotalsWriter(out_write_book, header_list, configs_dict)
+    totals_writer.flush(out_write_sheet, part_table)
+    timings.append(("totals", time.perf_counter() - start, len(part_table)))
+
+    start = time.perf_counter()
+    out_write_book.save(write_file)
+    timings.append(("save", time.perf_counter() - start, len(part_table)))
+
+    timings.append(time_gsheets(part_table, header_list, configs_dict))
+
+    return timings
+
+
+"""
+Method: time_xlrd_reader
+Purpose: Times reading in the files the way read_xlrd_file does, with
+opening the file, process_files.check_read_sheet, and pulling the rows
+timed apart. Versions of XLRD after 1.2 can't read .xlsx files, so the
+reader is skipped with them.
+
+Parameters:
+directory_path- directory of the files
+files- list of input filenames
+configs_dict- dictionary of configuration parameters
+
+Variables:
+open_time- time spent opening the files
+check_time- time spent in check_read_sheet
+pull_time- time spent pulling the data rows from the files
+in_files- list of InputFiles read in
+read_book- XLRD workbook of the current file
+read_sheet- XLRD worksheet of the current file
+
+Returns:
+list of (stage, seconds, rows) tuples
+in_files- list of InputFiles read in or None if XLRD can't read the files
+"""
+
+
+def time_xlrd_reader(directory_path, files, configs_dict):
+    open_time, check_time, pull_time = 0.0, 0.0, 0.0
+    in_files = []
+
+    for file in files:
+        start = time.perf_counter()
+        try:
+            read_book = xlrd.open_workbook(os.path.join(directory_path, file))
+
+        except xlrd.XLRDError:
+            return [("xlrd (can't read .xlsx)", 0.0, 0)], None
+        open_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_sheet = process_files.check_read_sheet(read_book, configs_dict)
+        check_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        assembly_num = utils.get_assembly_num(read_sheet, configs_dict)
+        rows, lines_skipped = excel.pull_rows(read_sheet, configs_dict)
+        in_files.append(readers.InputFile(assembly_num, list(rows), lines_skipped))
+        pull_time += time.perf_counter() - start
+
+    return [("xlrd open", open_time, len(files)),
+            ("xlrd check_read_sheet", check_time, len(files)),
+            ("xlrd pull rows", pull_time, sum(len(in_file.rows) for in_file in in_files))], \
+        in_files
+
+
+"""
+Method: time_stream_reader
+Purpose: Times reading in the files the way read_stream_file does, with
+opening the file and checking its first rows timed apart from
+streaming its rows.
+
+Parameters:
+directory_path- directory of the files
+files- list of input filenames
+configs_dict- dictionary of configuration parameters
+
+Variables:
+check_time- time spent opening the files and checking their first rows
+pull_time- time spent streaming the data rows from the files
+in_files- list of InputFiles read in
+in_file- InputFile of the current file
+
+Returns:
+list of (stage, seconds, rows) tuples
+in_files- list of InputFiles read in
+"""
+
+
+def time_stream_reader(directory_path, files, configs_dict):
+    check_time, pull_time = 0.0, 0.0
+    in_files = []
+
+    for file in files:
+        start = time.perf_counter()
+        read_book, head_rows, sheet_rows, assembly_num = \
+            readers.open_stream_file(os.path.join(directory_path, file), configs_dict)
+        check_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        in_file = readers.InputFile(assembly_num, None)
+        in_file.rows = list(readers.stream_rows(in_file, head_rows, sheet_rows, read_book,
+                                                configs_dict))
+        pull_time += time.perf_counter() - start
+        in_files.append(in_file)
+
+    return [("stream open and check", check_time, len(files)),
+            ("stream pull rows", pull_time, sum(len(in_file.rows) for in_file in in_files))], \
+        in_files
+
+
+# maps the reader names to the functions that time them
+TIMERS = {"xlrd": time_xlrd_reader,
+          "stream": time_stream_reader}
+
+
+"""
+Method: time_gsheets
+Purpose: Times sending the merged parts to a fake google sheets service
+that keeps the spreadsheet in memory. Nothing is sent to google. The
+fake is kept with the tests, so the stage is skipped if they aren't
+next to the source directory.
+
+Parameters:
+part_table- PartTable of the merged parts
+header_list- HeaderList of the output file
+configs_dict- dictionary of configuration parameters
+
+Variables:
+tests_directory- directory the fake google sheets service is kept in
+service- FakeService the requests are sent to
+
+Return: a (stage, seconds, rows) tuple
+"""
+
+
+def time_gsheets(part_table, header_list, configs_dict):
+    tests_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                                   "tests")
+    if tests_directory not in sys.path:
+        sys.path.append(tests_directory)
+
+    try:
+        from excelScript import gsheets
+        import fake_sheets
+
+    except ImportError:
+        return "gsheets requests (google libraries or tests not found)", 0.0, 0
+
+    service = fake_sheets.FakeService(title=configs_dict["book_title"],
+                                      sheets=[configs_dict["sheet1_title"],
+                                              configs_dict["total_sheet_name"]])
+
+    start = time.perf_counter()
+    gsheets.execute(part_table, header_list, configs_dict, service=service)
+
+    return "gsheets", time.perf_counter() - start, len(part_table)
+
+
+"""
+Method: print_timings
+Purpose: Prints a table of the time and throughput of each stage.
+
+Parameter: timings- list of (stage, seconds, rows) tuples
+"""
+
+
+def print_timings(timings):
+    print("{0:<22}{1:>12}{2:>12}{3:>16}".format("stage", "seconds", "rows", "rows/second"))
+
+    for stage, seconds, rows in timings:
+        rate = "{0:,.0f}".format(rows / seconds) if seconds > 0 and rows > 0 else "-"
+        print("{0:<22}{1:>12.4f}{2:>12,}{3:>16}".format(stage, seconds, rows, rate))
+
+
+"""
+Method: rates
+Purpose: Gets the rows per second of each stage that processes rows.
+
+Parameter: timings- list of (stage, seconds, rows) tuples
+
+Return: dictionary of stage mapped to its rows per second
+"""
+
+
+def rates(timings):
+    return {stage: rows / seconds for stage, seconds, rows in timings
+            if seconds > 0 and rows > 0}
+
+
+"""
+Method: baseline_arguments
+Purpose: Gets the arguments that change the work done by the benchmark,
+so a baseline is only compared to runs with the same arguments.
+
+Parameter: bench_args- argparse Namespace of the benchmark arguments
+
+Return: dictionary of argument name mapped to its value
+"""
+
+
+def baseline_arguments(bench_args):
+    return {"files": bench_args.files, "rows": bench_args.rows,
+            "assemblies": bench_args.assemblies, "overlap": bench_args.overlap,
+            "seed": bench_args.seed}
+
+
+"""
+Method: save_baseline
+Purpose: Saves the rows per second of each stage as a baseline.
+
+Parameters:
+baseline_path- path of the baseline JSON file
+timings- list of (stage, seconds, rows) tuples
+bench_args- argparse Namespace of the benchmark arguments
+"""
+
+
+def save_baseline(baseline_path, timings, bench_args):
+    with open(baseline_path, "w") as baseline_file:
+        json.dump({"arguments": baseline_arguments(bench_args), "rates": rates(timings)},
+                  baseline_file, indent=2)
+
+    print("Saved the baseline to {0}".format(baseline_path))
+
+
+"""
+Method: check_baseline
+Purpose: Compares the rows per second of each stage to a saved baseline.
+A stage fails if its rows per second dropped by more than the
+--max-slowdown ratio. Stages that aren't in both are left out.
+
+Parameters:
+baseline_path- path of the baseline JSON file
+timings- list of (stage, seconds, rows) tuples
+bench_args- argparse Namespace of the benchmark arguments
+
+Variables:
+baseline- dictionary read in from the baseline file
+current- dictionary of stage mapped to its rows per second
+passed- whether every stage is fast enough
+limit- lowest rows per second allowed for the current stage
+result- whether the current stage is ok or slower
+
+Return: passed- whether every stage is fast enough
+"""
+
+
+def check_baseline(baseline_path, timings, bench_args):
+    try:
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    except (OSError, ValueError):
+        print("Error: baseline file {0} couldn't be read".format(baseline_path))
+        return False
+
+    if baseline.get("arguments") != baseline_arguments(bench_args):
+        print("Error: baseline file {0} was made with different arguments {1}"
+              .format(baseline_path, baseline.get("arguments")))
+        return False
+
+    current = rates(timings)
+    passed = True
+
+    print("{0:<22}{1:>16}{2:>16}".format("stage", "baseline", "rows/second"))
+    for stage, baseline_rate in baseline["rates"].items():
+        if stage not in current:
+            continue
+
+        limit = baseline_rate * (1 - bench_args.max_slowdown)
+        result = "ok" if current[stage] >= limit else "SLOWER"
+        passed = passed and current[stage] >= limit
+
+        print("{0:<22}{1:>16,.0f}{2:>16,.0f}  {3}".format(stage, baseline_rate,
+                                                          current[stage], result))
+
+    if not passed:
+        print("Error: a stage is more than {0:.0%} slower than the baseline"
+              .format(bench_args.max_slowdown))
+
+    return passed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+"""
+File: cache.py
+Author: Kyle Fullerton
+Purpose: File that includes the cache of input files that have already
+been added to the output excel file. The cache is kept next to the
+output file so a re-run only has to read in new or changed files and
+add the difference they make to the output file.
+
+The cache also records the size and modified time of the output file it
+was saved with. The output file is saved next to itself and only put in
+place once the cache has been saved, and the cache keeps the entries it
+replaced until then. If the run stops in between, the next run finds the
+old output file and goes back to those entries, and if the output file
+was changed any other way the cache is remade.
+"""
+
+import hashlib
+import os
+import pickle
+
+from excelScript import readers
+
+
+CACHE_VERSION = 2
+
+"""
+Class: InputCache
+Purpose: Holds the fingerprint and the rows of every input file that
+has been added to the output file.
+
+Attributes:
+cache_path- path of the cache file
+config_key- hash of the configuration parameters the cache was made with
+entries- dictionary of file name mapped to a dictionary with the
+size, mtime, hash, assembly number, and rows of the file
+output- (size, mtime) of the output file when the cache was last saved
+or None if there wasn't an output file
+saved_entries- entries as they were when the cache was last saved
+"""
+
+
+class InputCache:
+    def __init__(self, cache_path, config_key):
+        self.cache_path = cache_path
+        self.config_key = config_key
+        self.entries = {}
+        self.output = None
+        self.saved_entries = {}
+
+    """
+    Method: is_current
+    Purpose: Checks if a file is the same as when it was last added
+    to the output file. The size and modified time are checked first
+    and the file is only hashed if one of them is different.
+
+    Parameters:
+    file_name- name of the file in the directory
+    file_path- path to the file
+
+    Variables:
+    entry- cached dictionary for the file
+    stat- os.stat_result of the file
+
+    Return: True if the file hasn't changed since it was cached
+    """
+
+    def is_current(self, file_name, file_path):
+        entry = self.entries.get(file_name)
+        if entry is None:
+            return False
+
+        stat = os.stat(file_path)
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime"]:
+            return True
+
+        if stat.st_size == entry["size"] and hash_file(file_path) == entry["hash"]:
+            entry["mtime"] = stat.st_mtime_ns
+            return True
+
+        return False
+
+    """
+    Method: changed_files
+    Purpose: Gets the files in the directory that are new or have
+    changed since they were last added to the output file. The cache
+    file itself is left out if it is in the directory.
+
+    Parameters:
+    directory_path- file path to the directory of files
+    files- list of files in the directory
+
+    Return: list of the new or changed files
+    """
+
+    def changed_files(self, directory_path, files):
+        cache_file = os.path.basename(self.cache_path)
+
+        return [file for file in files if file != cache_file and not
+                self.is_current(file, os.path.abspath(os.path.join(directory_path, file)))]
+
+    """
+    Method: delta_files
+    Purpose: Returns the InputFiles that need to be added to the output
+    file to go from the rows that were cached for a file to its new rows.
+    The rows of the read in file are put into a list so they can be
+    recorded once they have been added.
+
+    Parameters:
+    file_name- name of the file in the directory
+    in_file- InputFile of the read in file
+    add_mode- whether qtys are added together or replaced
+
+    Variables:
+    entry- cached dictionary for the file
+    old_file- InputFile that takes away the old rows of the file
+
+    Return: list of InputFiles to add to the output file
+    """
+
+    def delta_files(self, file_name, in_file, add_mode):
+        in_file.rows = list(in_file.rows)
+        entry = self.entries.get(file_name)
+
+        if entry is None:
+            return [in_file]
+
+        # the old rows were added to a different assembly column
+        if entry["assembly_num"] != in_file.assembly_num:
+            if not add_mode:
+                return [in_file]
+
+            old_file = readers.InputFile(entry["assembly_num"],
+                                         delta_rows(entry["rows"], [], add_mode))
+            return [old_file, in_file]
+
+        return [readers.InputFile(in_file.assembly_num,
+                                  delta_rows(entry["rows"], in_file.rows, add_mode),
+                                  in_file.lines_skipped)]
+
+    """
+    Method: record
+    Purpose: Records the fingerprint and rows of a file once it
+    has been added to the output file.
+
+    Parameters:
+    file_name- name of the file in the directory
+    file_path- path to the file
+    in_file- InputFile of the read in file with its rows in a list
+
+    Variable: stat- os.stat_result of the file
+    """
+
+    def record(self, file_name, file_path, in_file):
+        stat = os.stat(file_path)
+        self.entries[file_name] = {"size": stat.st_size,
+                                   "mtime": stat.st_mtime_ns,
+                                   "hash": hash_file(file_path),
+                                   "assembly_num": in_file.assembly_num,
+                                   "rows": in_file.rows}
+
+    """
+    Method: save
+    Purpose: Writes the cache to the cache file along with the size and
+    modified time of the output file it goes with. The entries that were
+    replaced since the last save are kept with the output file they went
+    with, so the cache can go back to them if the new output file is
+    never put in place. The cache is written to a temporary file first
+    so a cache that is cut off is never read in.
+
+    Parameter: output_path- path of the output file the cache goes with
+
+    Variables:
+    output- (size, mtime) of the output file or None
+    replaced- dictionary of file name mapped to the entry it had when the
+    cache was last saved or None if it didn't have one
+    data- dictionary written to the cache file
+    """
+
+    def save(self, output_path):
+        output = output_fingerprint(output_path)
+        replaced = {file_name: self.saved_entries.get(file_name)
+                    for file_name, entry in self.entries.items()
+                    if self.saved_entries.get(file_name) is not entry}
+
+        data = {"version": CACHE_VERSION,
+                "config_key": self.config_key,
+                "output": output,
+                "entries": self.entries,
+                "previous": {"output": self.output, "entries": replaced}}
+
+        with open(self.cache_path + ".tmp", "wb") as cache_file:
+            pickle.dump(data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(self.cache_path + ".tmp", self.cache_path)
+
+        self.output = output
+        self.saved_entries = dict(self.entries)
+
+
+"""
+Method: cache_path
+Purpose: Gets the path of the cache file for an output file.
+
+Parameter: write_file- path of the output excel file
+
+Return: path of the cache file
+"""
+
+
+def cache_path(write_file):
+    return write_file + ".cache"
+
+
+"""
+Method: pending_path
+Purpose: Gets the path the output file is saved to before it is put in
+place when the cache is used.
+
+Parameter: write_file- path of the output excel file
+
+Return: path of the output file being saved
+"""
+
+
+def pending_path(write_file):
+    return write_file + ".pending"
+
+
+"""
+Method: output_fingerprint
+Purpose: Gets the size and modified time of an output file.
+
+Parameter: output_path- path of the output file
+
+Variable: stat- os.stat_result of the output file
+
+Return: (size, mtime) of the output file or None if it doesn't exist
+"""
+
+
+def output_fingerprint(output_path):
+    try:
+        stat = os.stat(output_path)
+
+    except FileNotFoundError:
+        return None
+
+    return stat.st_size, stat.st_mtime_ns
+
+
+"""
+Method: load_cache
+Purpose: Reads in the cache for an output file. If there isn't a cache,
+it can't be read, it was made with different configuration parameters,
+or the output file isn't the one it was saved with then an empty cache
+is used. If the output file is the one from before the last save, the
+run stopped before the new output file was put in place, so the entries
+from before that save are used.
+
+Parameters:
+write_file- path of the output excel file
+configs- dictionary of configuration parameters
+
+Variables:
+config_key- hash of the configuration parameters
+input_cache- InputCache for the output file
+data- dictionary read in from the cache file
+output- (size, mtime) of the output file or None
+
+Return: input_cache- InputCache for the output file
+"""
+
+
+def load_cache(write_file, configs):
+    config_key = hashlib.sha1(repr(sorted(configs.items())).encode()).hexdigest()
+    input_cache = InputCache(cache_path(write_file), config_key)
+
+    try:
+        with open(input_cache.cache_path, "rb") as cache_file:
+            data = pickle.load(cache_file)
+
+    except FileNotFoundError:
+        return input_cache
+
+    except (pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        print("Error: cache file {0} couldn't be read and will be remade"
+              .format(os.path.basename(input_cache.cache_path)))
+        return input_cache
+
+    if data.get("version") != CACHE_VERSION or data.get("config_key") != config_key:
+        print("Cache file {0} was made with different configuration parameters and "
+              "will be remade".format(os.path.basename(input_cache.cache_path)))
+        return input_cache
+
+    output = output_fingerprint(write_file)
+
+    if output == data["output"]:
+        input_cache.entries = data["entries"]
+
+    elif output == data["previous"]["output"]:
+        input_cache.entries = data["entries"]
+        for file_name, entry in data["previous"]["entries"].items():
+            if entry is None:
+                del input_cache.entries[file_name]
+            else:
+                input_cache.entries[file_name] = entry
+
+    else:
+        print("Output file {0} has changed since the cache was saved, so the cache will "
+              "be remade".format(os.path.basename(write_file)))
+        return input_cache
+
+    input_cache.output = output
+    input_cache.saved_entries = dict(input_cache.entries)
+    return input_cache
+
+
+"""
+Method: hash_file
+Purpose: Hashes the contents of a file.
+
+Parameter: file_path- path to the file
+
+Variable: digest- sha1 hash object
+
+Return: hex string of the hash
+"""
+
+
+def hash_file(file_path):
+    digest = hashlib.sha1()
+
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+"""
+Method: delta_rows
+Purpose: Makes the rows that take the output file from having the old
+rows of a file added to having its new rows added. Parts whose rows
+didn't change are left out. In add mode the first row of a part carries
+the difference of the part's total qty and any other rows carry a qty
+of 0 so their remarks are still checked. In replace mode the new rows
+are used as they are. Parts that were removed from the file have their
+old total taken away in add mode. A difference can only be taken of
+numbers, so in add mode a part with a text or blank qty has its new
+rows added as they are, the same as without the cache, and a removed
+one is left alone.
+
+Parameters:
+old_rows- rows of the file when it was last added
+new_rows- rows of the file now
+add_mode- whether qtys are added together or replaced
+
+Variables:
+old_parts- dictionary of part number mapped to its old rows
+new_parts- dictionary of part number mapped to its new rows
+rows- list of rows to add to the output file
+new_total- total qty of the new rows of a part or None
+old_total- total qty of the old rows of a part or None
+
+Return: rows- list of rows to add to the output file
+"""
+
+
+def delta_rows(old_rows, new_rows, add_mode):
+    old_parts = group_rows(old_rows)
+    new_parts = group_rows(new_rows)
+    rows = []
+
+    for part_num, part_rows in new_parts.items():
+        if old_parts.get(part_num) == part_rows:
+            continue
+
+        if not add_mode:
+            rows.extend(part_rows)
+            continue
+
+        new_total = qty_total(part_rows)
+        old_total = qty_total(old_parts.get(part_num, []))
+
+        if new_total is None or old_total is None:
+            rows.extend(part_rows)
+            continue
+
+        rows.append(part_rows[0][:-1] + (new_total - old_total,))
+        rows.extend(row[:-1] + (0,) for row in part_rows[1:])
+
+    if add_mode:
+        for part_num, part_rows in old_parts.items():
+            old_total = qty_total(part_rows)
+
+            if part_num not in new_parts and old_total is not None:
+                rows.append(part_rows[0][:-1] + (-old_total,))
+
+    return rows
+
+
+"""
+Method: qty_total
+Purpose: Adds up the qtys of the rows of a part.
+
+Parameter: part_rows- list of row tuples of a part
+
+Return: total qty or None if a qty isn't a number
+"""
+
+
+def qty_total(part_rows):
+    for row in part_rows:
+        if type(row[-1]) not in (int, float):
+            return None
+
+    return sum(row[-1] for row in part_rows)
+
+
+"""
+Method: group_rows
+Purpose: Groups rows by their part number keeping the order the
+part numbers are first found in.
+
+Parameter: rows- list of row tuples
+
+Variable: parts- dictionary of part number mapped to its rows
+
+Return: parts- dictionary of part number mapped to its rows
+"""
+
+
+def group_rows(rows):
+    parts = {}
+
+    for row in rows:
+        parts.setdefault(str(row[0]).strip(), []).append(tuple(row))
+
+    return parts
@@ -1,286 +1,526 @@
-"""
-File: excel.py
-Author: Kyle Fullerton
-Purpose: File that includes functions pertaining to updating
-the output excel spreadsheet.
-"""
-
-import sys
-from excelScript import utils
-from openpyxl.styles import Alignment
-
-
-"""
-Method: update_master
-Purpose: Grabs the column of serial numbers and loops through every row in
-the spreadsheet starting with the first place that wanted data appears in 
-the spreadsheet (Like you only care about rows 9 to n rows for example). 
-If the serial number is in the dictionary that represents the current output
-file then that entry is checked if additional information needs to be added
-to remarks. Tne entry is also checked to see if a quantity needs to be added,
-update, or replaced. If the serial number isn't in the dictionary, then 
-a new line is appended to the spreadsheet and a new entry is added into
-the dictionary. 
-
-Parameters: read_sheet- spreadsheet used to read values from
-write_sheet- output spreadsheet we are writing to
-header_list- list of headers for the spreadsheet
-part_dict- dictionary of values from the output excel file
-config_dict- dictionary of configuration parameters
-file_name- name of the current file being read in
-
-Variables:
-lines_skipped- number of lines skipped when reading the input excel file
-assembly_num- assembly number for the read in excel sheet
-column_num- column number corresponding to the serial number in the input 
-excel file
-serial_nums- serial numbers found in the serial number column
-row_data- all of the data in the current row of the input spreadsheet
-part_num- current part number in the row
-column- column where the assembly number is found
-part_num_row- row number for the current row
-
-Return- part_dict- updated dictionary of values from the xlw sheet
-"""
-
-
-def update_master(read_sheet, write_sheet, header_list, part_dict,
-                  config_dict, file_name, workbook):
-
-    lines_skipped = 0
-    assembly_num = read_sheet.cell_value(config_dict["part_num_row"] - 1,
-                                         config_dict["part_num_column"] - 1)
-    column_num = utils.get_column_num(config_dict["serial_num_column"])
-
-    try:
-        serial_nums = read_sheet.col_values(column_num)
-
-    except IndexError:
-        print("Error: config parameter {0} defines an out of range column"
-              "for the sheet in file {1}".format("'serial_num_column'", file_name))
-        return part_dict
-
-    # loops through the read_sheet from where we care about the data
-    for row in range(config_dict["data_start"] - 1, len(serial_nums)):
-        row_data = pull_data(row, read_sheet, config_dict)
-
-        # got a row_data with not all of the input needed
-        if len(row_data) == 0:
-            lines_skipped += 1
-            continue
-
-        # if part_num already in dictionary then just add a qty to the respective
-        # assembly number
-        part_num = str(row_data[0]).strip()
-        row_data[1] = row_data[1].upper()
-
-        column = header_list.index(assembly_num)
-
-        if part_num in part_dict:
-
-            part_num_row = part_dict[part_num]
-            update_remarks(part_num_row, config_dict, row_data, write_sheet)
-
-            # update the qty for the card appropriately
-            if len(part_num_row) == len(header_list):
-
-                if part_num_row[column][0] == "":
-                    part_num_row[column][0] = row_data[-1]
-
-                else:
-                    # either adds or replaces qty depending on specified mode
-                    if config_dict["add_mode"]:
-                        part_num_row[column][0] += row_data[-1]
-                    else:
-                        part_num_row[column][0] = row_data[-1]
-
-                write_sheet.cell(part_num_row[0], column + 1).value = part_num_row[column][0]
-
-            # add new column to the id's row_data
-            else:
-                part_num_row.append([row_data[-1], column + 1])
-                write_sheet.cell(part_num_row[0], column + 1).value = row_data[-1]
-
-            part_dict[part_num] = part_num_row
-            update_totals(part_num_row[0], part_num, config_dict, workbook, header_list)
-
-        else:
-            # add row_data to spreadsheet
-            write_sheet.append(row_data[:-1])
-
-            # add qty to spreadsheet
-            row_data[0] = len(part_dict) + config_dict["header_row"] + 1
-            write_sheet.cell(row_data[0], column + 1).value = row_data[-1]
-
-            # add new entry to dictionary
-            row_data[-1] = [row_data[-1], column + 1]
-            part_dict[part_num] = row_data
-
-            update_totals(row_data[0], part_num, config_dict, workbook, header_list)
-    if config_dict["lines_skipped"]:
-        print("Number of lines skipped in file {0}: {1}".format(file_name, lines_skipped))
-
-    return part_dict
-
-
-"""
-Method: update_remarks
-Purpose: Updates the remarks column if a different company
-is found for the same part number. 
-
-Parameters:
-part_num_row- row where the part number is located
-config_dict- dictionary of configuration parameters
-row_data- all of the data in the current row
-write_sheet- worksheet for the output excel file
-
-Variable- remarks- column where the remarks column is located
-"""
-
-
-def update_remarks(part_num_row, config_dict, row_data, write_sheet):
-    remarks = config_dict["out_remarks_index"] - 1
-    if remarks >= len(part_num_row) or remarks >= len(row_data):
-        print("Error: config parameter {0} defines out of range column for sheet"
-              .format("'out_remarks_index'"))
-        sys.exit(1)
-
-    # adds additional company for remarks if needed
-    if row_data[remarks] not in part_num_row[remarks]:
-        part_num_row[remarks] = part_num_row[remarks] + "/" + row_data[remarks]
-
-        write_sheet.cell(part_num_row[0], remarks + 1).value = part_num_row[remarks]
-        write_sheet.cell(part_num_row[0], remarks + 1).alignment = Alignment(wrap_text=True)
-
-
-"""
-Method: pull_data
-Purpose: Checks that all of the specified columns have
-data. Then creates and returns a list of all data
-from the specified columns from the read in spreadsheet.
-
-Parameters:
-row- current row in the spreadsheet
-sheet- spreadsheet that the function is reading from
-config_dict- dictionary of configuration options
-
-Return: row_data- list of all of the specified data
-in the current row
-"""
-
-
-def pull_data(row, sheet, config_dict):
-    row_data = []
-
-    for column in config_dict["check_columns"]:
-        try:
-            if sheet.cell_value(row, column - 1) == "":
-                return row_data
-        except IndexError:
-            return row_data
-
-    for column in config_dict["wanted_columns"]:
-        try:
-            row_data.append(sheet.cell_value(row, int(column) - 1))
-
-        except IndexError:
-            continue
-
-    return row_data
-
-
-"""
-Method: add_headers
-Purpose: Gets the initial headers from the sheet.
-If no headers exist then the specified 
-headers are added to the sheet.
-
-Parameters: out_read_sheet- read excel sheet
-out_write_sheet- write excel sheet
-configs- dictionary of configuration parameters
-"""
-
-
-def add_headers(out_read_sheet, out_write_sheet, configs):
-    try:
-        header_list = out_read_sheet.row_values(configs["header_row"] - 1)
-
-    except IndexError:
-        header_list = configs["out_default_headers"]
-        for i in range(0, len(header_list)):
-            utils.add_header(out_write_sheet.cell(configs["header_row"], i + 1), header_list[i])
-
-    return header_list
-
-
-"""
-Method: update_totals
-Purpose: Used to create a totals sheet for the total
-number of parts needed to make a specified number 
-of cards. First, checks if a new sheet needs to be
-added. Then adds the headers to the total sheet. 
-Next, constructs a SUMPRODUCT formula for the passed
-in row. This formula and the part number are added 
-to the total sheet.
-Note: SUMPRODUCT takes two plus equal length arrays
-from ranges of cells, multiplies the same index
-in each array by each other, and then sums the result.
-Ex: SUMPRODUCT([1,2,3], [4, 5, 6]) = 4 + 10 + 18 = 32
-
-Parameters:
-row- row number from the first sheet
-part_num- part number 
-config_dict- dictionary of configuration parameters 
-workbook- workbook object from the output excel file
-header_list- list of headers on the output excel spreadsheet
-
-
-Variables:
-title- title of the specified spreadsheet
-sheet_headers- headers wanted for the spreadsheet
-worksheet- worksheet that will be written to
-start_row- row to start reading from the out_write_sheet
-qty_start- column where the qty columns start
-qty_end- column where the qty columns end
-header_row- row where the headers are located in the out_write_sheet
-sheet_end- row that the out_write_sheet has no data
-range1- first range of cells to multiply with the
-second range of cells
-range2- second range of cells to multiply with the
-first range of cells
-sheet- sheet name in out_write_sheet
-formula- formula to add to the total sheet
-part_num- part number in the out_write_sheet
-row- row of data to add to the total sheet
-"""
-
-
-def update_totals(row, part_num, config_dict, workbook, header_list):
-    header_row = config_dict["total_header_row"]
-    total_row = row - config_dict["header_row"] + config_dict["total_header_row"]
-
-    title = config_dict["total_sheet_name"]
-    sheet_headers = config_dict["total_sheet_headers"]
-
-    # adds new sheet if the sheet hasn't been created
-    if title not in workbook.sheetnames:
-        workbook.create_sheet(title=title)
-        worksheet = workbook[title]
-
-        # add specified headers
-        for row in range(1, len(sheet_headers) + 1):
-            utils.add_header(worksheet.cell(header_row, row), sheet_headers[row - 1])
-
-    worksheet = workbook[title]
-
-    qty_start = config_dict["qty_start"] - 1
-    qty_end = len(header_list) - 1
-    header_row = config_dict["header_row"]
-
-    range1 = utils.get_range(qty_start, qty_end, row, row)
-    range2 = utils.get_range(qty_start, qty_end, header_row - 1, header_row - 1)
-    sheet = config_dict["out_sheet_name"] + "!"
-    formula = "=IFERROR(SUMPRODUCT({0}{1}, {2}{3}),0)".format(sheet, range1, sheet, range2)
-
-    worksheet.cell(total_row, 1).value = part_num
-    worksheet.cell(total_row, 2).value = formula
+"""
+File: excel.py
+Author: Kyle Fullerton
+Purpose: File that includes functions pertaining to updating
+the output excel spreadsheet.
+"""
+
+import sys
+from excelScript import parts, utils
+from itertools import compress, islice
+
+
+# header of the column the totals are cached in next to the formulas
+CACHED_TOTAL_HEADER = "Cached Total"
+
+
+"""
+Method: update_master
+Purpose: Reduces the rows of wanted data pulled from an input
+spreadsheet to one PartRecord per part number with aggregate_rows,
+then applies each record to the output file once. If the serial number
+is in the table that represents the current output file then that entry
+is checked if additional information needs to be added to remarks.
+Tne entry is also checked to see if a quantity needs to be added,
+update, or replaced. If the serial number isn't in the table, then a
+new line is appended to the spreadsheet and a new entry is added into
+the table. The totals are written afterwards by a TotalsWriter and the
+remarks by write_remarks.
+
+Parameters: in_file- InputFile of the assembly number and rows of wanted
+data from the read in excel sheet
+write_sheet- output spreadsheet we are writing to
+header_list- HeaderList of headers for the spreadsheet
+part_table- PartTable of the parts in the output excel file
+config_dict- dictionary of configuration parameters
+file_name- name of the current file being read in
+
+Variables:
+column- column where the assembly number is found
+assembly- index of the assembly in the qtys of a PartRow
+records- dictionary of part number mapped to its PartRecord for the file
+part_num- current part number
+record- PartRecord of the current part number
+part_row- PartRow for the current part number
+qty- new qty for the part and assembly
+
+Return- part_table- updated PartTable of the parts in the output excel file
+"""
+
+
+def update_master(in_file, write_sheet, header_list, part_table,
+                  config_dict, file_name):
+
+    # the assembly column is the same for every row in the file
+    column = header_list.index(in_file.assembly_num)
+    assembly = column - (config_dict["qty_start"] - 1)
+
+    records = aggregate_rows(in_file.rows, config_dict)
+
+    for part_num, record in records.items():
+
+        # if part_num already in the table then just add a qty to the respective
+        # assembly number
+        if part_num in part_table:
+
+            part_row = part_table[part_num]
+            update_remarks(part_table, part_row, config_dict, record)
+
+            # update the qty for the card appropriately
+            qty = part_row.get_qty(assembly)
+
+            if qty == "":
+                qty = record.qty
+
+            else:
+                # either adds or replaces qty depending on specified mode
+                if config_dict["add_mode"]:
+                    qty += record.qty
+                else:
+                    qty = record.qty
+
+            part_row.set_qty(assembly, qty)
+            write_sheet.cell(part_row.row, column + 1).value = qty
+
+        else:
+            # add row_data to spreadsheet
+            write_sheet.append(record.info)
+
+            # add new entry to the table and qty to spreadsheet
+            part_row = part_table.add(part_num, list(record.info))
+            part_row.set_qty(assembly, record.qty)
+            write_sheet.cell(part_row.row, column + 1).value = record.qty
+
+            # the first company is already in the appended row
+            if len(record.companies) > 1:
+                update_remarks(part_table, part_row, config_dict, record)
+
+        if part_table.changed is not None:
+            part_table.changed[part_num] = part_row
+
+    if config_dict["lines_skipped"]:
+        print("Number of lines skipped in file {0}: {1}".format(file_name,
+                                                                 in_file.lines_skipped))
+
+    return part_table
+
+
+"""
+Method: aggregate_rows
+Purpose: Reduces the rows of an input file to one PartRecord per part
+number, so a part listed on several lines is only applied to the output
+file once. The data of the first row of a part is kept, the qtys are
+added together in add mode or the last one is kept in replace mode,
+and the companies of every row are kept in order.
+
+Parameters:
+rows- iterable of row tuples with the wanted data
+config_dict- dictionary of configuration parameters
+
+Variables:
+records- dictionary of part number mapped to its PartRecord
+add_mode- whether qtys are added together or replaced
+remarks- index of the remarks in the row data
+row_data- all of the data in the current row of the input spreadsheet
+part_num- current part number in the row
+record- PartRecord of the current part number
+
+Return: records- dictionary of part number mapped to its PartRecord
+"""
+
+
+def aggregate_rows(rows, config_dict):
+    records = {}
+    add_mode = config_dict["add_mode"]
+    remarks = config_dict["out_remarks_index"] - 1
+
+    for row in rows:
+        row_data = list(row)
+        part_num = str(row_data[0]).strip()
+        row_data[1] = row_data[1].upper()
+        record = records.get(part_num)
+
+        if record is None:
+            record = parts.PartRecord(row_data[:-1], row_data[-1])
+            records[part_num] = record
+
+        elif add_mode:
+            record.qty += row_data[-1]
+
+        else:
+            record.qty = row_data[-1]
+
+        if remarks < len(row_data):
+            record.companies[row_data[remarks]] = None
+
+    return records
+
+
+"""
+Method: update_remarks
+Purpose: Adds the companies of a PartRecord to the remarks of a part
+if a different company is found for the same part number. The remarks
+column is only written by write_remarks once all of the files are merged.
+
+Parameters:
+part_table- PartTable of the parts in the output excel file
+part_row- PartRow for the part number
+config_dict- dictionary of configuration parameters
+record- PartRecord of the part number from the current file
+
+Variable- remarks- column where the remarks column is located
+"""
+
+
+def update_remarks(part_table, part_row, config_dict, record):
+    remarks = config_dict["out_remarks_index"] - 1
+    if remarks >= len(part_row.info) or len(record.companies) == 0:
+        print("Error: config parameter {0} defines out of range column for sheet"
+              .format("'out_remarks_index'"))
+        sys.exit(1)
+
+    # adds additional companies for remarks if needed
+    for company in record.companies:
+        if part_row.add_remark(remarks, company):
+            part_table.changed_remarks[part_row.row] = part_row
+
+
+"""
+Method: write_remarks
+Purpose: Writes the remarks column of every part that had a company
+added since the remarks were last written.
+
+Parameters:
+write_sheet- worksheet for the output excel file
+part_table- PartTable of the parts in the output excel file
+config_dict- dictionary of configuration parameters
+
+Variables:
+remarks- column where the remarks column is located
+cell- remarks cell of the current part
+"""
+
+
+def write_remarks(write_sheet, part_table, config_dict):
+    remarks = config_dict["out_remarks_index"] - 1
+
+    for part_row in part_table.changed_remarks.values():
+        part_row.info[remarks] = part_row.remarks_text()
+
+        cell = write_sheet.cell(part_row.row, remarks + 1)
+        cell.value = part_row.info[remarks]
+        utils.set_style(cell, "BOM Remarks")
+
+    part_table.changed_remarks.clear()
+
+
+"""
+Method: pull_rows
+Purpose: Reads each of the check and wanted columns once, starting
+with the first place that wanted data appears in the spreadsheet (Like
+you only care about rows 9 to n rows for example). A mask is made from
+the check columns so rows that don't have all of the needed data are
+counted and skipped. The wanted columns are then zipped together into
+row tuples.
+
+Parameters:
+read_sheet- spreadsheet used to read values from
+config_dict- dictionary of configuration parameters
+
+Variables:
+column_num- column number corresponding to the serial number in the input 
+excel file
+start- first row index of the wanted data
+end- row index after the last row of the sheet
+check_values- list of values for each check column
+wanted_values- list of values for each wanted column that is in range
+mask- list of booleans for whether each row has all of the needed data
+rows- list of row tuples with the wanted data
+lines_skipped- number of rows that didn't have all of the needed data
+
+Return: rows- list of row tuples with the wanted data
+lines_skipped- number of rows that didn't have all of the needed data
+"""
+
+
+def pull_rows(read_sheet, config_dict):
+    column_num = utils.get_column_num(config_dict["serial_num_column"])
+
+    if column_num >= read_sheet.ncols:
+        raise IndexError("'serial_num_column'")
+
+    start = config_dict["data_start"] - 1
+    end = read_sheet.nrows
+
+    # a check column that is out of range means no row has all of the needed data
+    try:
+        check_values = [read_sheet.col_values(column - 1, start, end)
+                        for column in config_dict["check_columns"]]
+
+    except IndexError:
+        return [], max(end - start, 0)
+
+    # out of range wanted columns are left out of the rows
+    wanted_values = []
+    for column in config_dict["wanted_columns"]:
+        try:
+            wanted_values.append(read_sheet.col_values(int(column) - 1, start, end))
+
+        except IndexError:
+            continue
+
+    if len(check_values) == 0:
+        mask = [True] * max(end - start, 0)
+    else:
+        mask = ["" not in values for values in zip(*check_values)]
+
+    rows = list(compress(zip(*wanted_values), mask))
+    lines_skipped = max(end - start, 0) - len(rows)
+
+    return rows, lines_skipped
+
+
+"""
+Method: add_headers
+Purpose: Gets the initial headers from the sheet.
+If no headers exist then the specified 
+headers are added to the sheet.
+
+Parameters: master_rows- list of the rows of values in the output excel sheet
+out_write_sheet- write excel sheet
+configs- dictionary of configuration parameters
+
+Return: header_list- HeaderList of the headers on the sheet
+"""
+
+
+def add_headers(master_rows, out_write_sheet, configs):
+    try:
+        header_list = parts.HeaderList(master_rows[configs["header_row"] - 1])
+
+    except IndexError:
+        header_list = parts.HeaderList(configs["out_default_headers"])
+        for i in range(0, len(header_list)):
+            utils.add_header(out_write_sheet.cell(configs["header_row"], i + 1), header_list[i])
+
+    return header_list
+
+
+"""
+Class: TotalsWriter
+Purpose: Writes the totals sheet for the total number of parts needed
+to make a specified number of cards. It is made once per run and
+writes the totals of every part in bulk once the files have been
+merged, instead of once for every merged row. Each total is a
+SUMPRODUCT formula of the part's qtys and the card counts in the row
+above the headers, a number computed from them, or both.
+Note: SUMPRODUCT takes two plus equal length arrays
+from ranges of cells, multiplies the same index
+in each array by each other, and then sums the result.
+Ex: SUMPRODUCT([1,2,3], [4, 5, 6]) = 4 + 10 + 18 = 32
+
+Attributes:
+workbook- workbook object from the output excel file
+header_list- HeaderList of headers on the output excel spreadsheet
+config_dict- dictionary of configuration parameters
+mode- "formula", "value", or "both"
+worksheet- totals worksheet once it has been made or found
+row_offset- difference between a part's row in the totals sheet and
+its row in the first sheet
+sheet- sheet name of the first sheet for the formulas
+written- number of parts in the PartTable that have been written
+qty_end- index of the last qty column when the formulas were written
+"""
+
+
+class TotalsWriter:
+    def __init__(self, workbook, header_list, config_dict, mode="formula"):
+        self.workbook = workbook
+        self.header_list = header_list
+        self.config_dict = config_dict
+        self.mode = mode
+        self.worksheet = None
+        self.row_offset = config_dict["total_header_row"] - config_dict["header_row"]
+        self.sheet = config_dict["out_sheet_name"] + "!"
+        self.written = 0
+        self.qty_end = None
+
+    """
+    Method: get_sheet
+    Purpose: Gets the totals sheet, making it and adding its headers
+    the first time if it isn't in the workbook.
+
+    Variables:
+    title- title of the totals sheet
+    sheet_headers- headers wanted for the totals sheet
+    worksheet- totals worksheet
+
+    Return: totals worksheet
+    """
+
+    def get_sheet(self):
+        if self.worksheet is not None:
+            return self.worksheet
+
+        title = self.config_dict["total_sheet_name"]
+        sheet_headers = self.config_dict["total_sheet_headers"]
+
+        # adds new sheet if the sheet hasn't been created
+        if title not in self.workbook.sheetnames:
+            worksheet = self.workbook.create_sheet(title=title)
+
+            # add specified headers
+            for column in range(1, len(sheet_headers) + 1):
+                utils.add_header(worksheet.cell(self.config_dict["total_header_row"], column),
+                                 sheet_headers[column - 1])
+
+        self.worksheet = self.workbook[title]
+        return self.worksheet
+
+    """
+    Method: flush
+    Purpose: Writes the totals of the parts to the totals sheet. The
+    part numbers are only written for parts added since the last flush.
+    A formula only depends on its row and the last qty column, so the
+    formulas are only written for the new parts unless an assembly
+    column has been added, then every formula is written again. The
+    first flush of a run writes every formula since the formulas
+    already in the file may be from before columns were added.
+    Numbers depend on every qty so they are always computed for every part.
+
+    Parameters:
+    write_sheet- worksheet of the output excel file
+    part_table- PartTable of the parts in the output excel file
+
+    Variables:
+    worksheet- totals worksheet
+    qty_start- column where the qty columns start
+    qty_end- column where the qty columns end
+    new_parts- list of (part number, PartRow) tuples added since the last flush
+    formula_parts- parts whose formulas are written
+    start- column letter of the first qty column
+    end- column letter of the last qty column
+    card_range- range of the card counts for the formulas
+    formula- formula to add to the total sheet
+    column- column the numbers are written to
+    totals- dictionary of part number mapped to its total
+    """
+
+    def flush(self, write_sheet, part_table):
+        if len(part_table) == 0:
+            return
+
+        worksheet = self.get_sheet()
+        qty_start = self.config_dict["qty_start"] - 1
+        qty_end = len(self.header_list) - 1
+
+        new_parts = list(islice(part_table.items(), self.written, None))
+        for part_num, part_row in new_parts:
+            worksheet.cell(part_row.row + self.row_offset, 1).value = part_num
+
+        if self.mode != "value":
+            formula_parts = new_parts if qty_end == self.qty_end else part_table.items()
+
+            start = utils.get_column_letter(qty_start)
+            end = utils.get_column_letter(qty_end)
+            card_range = utils.get_range(qty_start, qty_end, self.config_dict["header_row"] - 1,
+                                         self.config_dict["header_row"] - 1)
+
+            for part_num, part_row in formula_parts:
+                formula = "=IFERROR(SUMPRODUCT({0}{1}{2}:{3}{2}, {0}{4}),0)".format(
+                          self.sheet, start, part_row.row, end, card_range)
+                worksheet.cell(part_row.row + self.row_offset, 2).value = formula
+
+        if self.mode != "formula":
+            column = 2
+
+            if self.mode == "both":
+                column = 3
+                utils.add_header(worksheet.cell(self.config_dict["total_header_row"], column),
+                                 CACHED_TOTAL_HEADER)
+
+            totals = compute_totals(part_table, card_counts(write_sheet, self.header_list,
+                                                            self.config_dict))
+
+            for part_num, part_row in part_table.items():
+                worksheet.cell(part_row.row + self.row_offset, column).value = totals[part_num]
+
+        self.written = len(part_table)
+        self.qty_end = qty_end
+
+
+"""
+Method: card_counts
+Purpose: Reads the number of cards wanted for each assembly from the
+row above the headers. Counts that aren't numbers are 0 like they are
+in SUMPRODUCT.
+
+Parameters:
+write_sheet- worksheet of the output excel file
+header_list- HeaderList of headers on the output excel spreadsheet
+config_dict- dictionary of configuration parameters
+
+Variables:
+row- row of the card counts
+counts- list of card counts indexed by assembly
+value- value of the current card count cell
+
+Return: counts- list of card counts indexed by assembly
+"""
+
+
+def card_counts(write_sheet, header_list, config_dict):
+    row = config_dict["header_row"] - 1
+    counts = []
+
+    if row < 1:
+        return counts
+
+    for column in range(config_dict["qty_start"], len(header_list) + 1):
+        value = write_sheet.cell(row, column).value
+
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            counts.append(value)
+        else:
+            counts.append(0)
+
+    return counts
+
+
+"""
+Method: compute_totals
+Purpose: Computes the total of every part as the product of the qty
+matrix (parts by assemblies) and the card count vector. Only the
+assemblies with a card count are multiplied, so each part's total
+only looks at those columns of its qtys.
+Ex: qtys [1, "", 3] and counts [2, 5, 0] = 1 * 2 = 2
+
+Parameters:
+part_table- PartTable of the parts in the output excel file
+counts- list of card counts indexed by assembly
+
+Variables:
+counted- list of (assembly, count) tuples with a card count
+totals- dictionary of part number mapped to its total
+qtys- qtys of the current part
+total- total of the current part
+
+Return: totals- dictionary of part number mapped to its total
+"""
+
+
+def compute_totals(part_table, counts):
+    counted = [(assembly, count) for assembly, count in enumerate(counts) if count]
+    totals = {}
+
+    for part_num, part_row in part_table.items():
+        qtys = part_row.qtys
+        total = 0
+
+        for assembly, count in counted:
+            if assembly < len(qtys) and isinstance(qtys[assembly], (int, float)):
+                total += qtys[assembly] * count
+
+        totals[part_num] = total
+
+    return totals
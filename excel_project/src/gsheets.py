@@ -1,380 +1,1096 @@
-"""
-File: gsheets.py
-Author: Kyle Fullerton
-Purpose: File that is used to handle functionality with google sheets.
-For additional documentation lookup Google's Sheets API. A good starting
-place would be the batchUpdate page which has information and links
-to many of the update requests made with this file.
-"""
-from excelScript import utils
-from oauth2client.service_account import ServiceAccountCredentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import httplib2
-import sys
-
-
-"""
-Method: execute
-Purpose: Makes calls to authorize the request credentials, update
-properties with the spreadsheets, and then add requests to update
-the spreadsheet headers and data. 
-
-Parameters: 
-part_dict- Dictionary mapping part numbers to the rest of the wanted data
-header_list- List of headers that are on the output excel file
-config_dict- Dictionary of configuration parameters
-
-Variables:
-book_id- file id for the workbook
-requests- will be a list of dictionaries (Json objects) used to make 
-requests to edit the spreadsheet
-sheet1_id- unique id to the first sheet in the workbook
-total_id- unique id to the totals sheet in the workbook
-"""
-
-
-def execute(part_dict, header_list, config_dict):
-    book_id = config_dict["gbook_id"]
-    requests = []
-
-    service = authorize()
-    sheet1_id, total_id = update_sheets(service, book_id, config_dict)
-
-    requests.append(update_headers(header_list, sheet1_id, config_dict["header_row"]))
-    requests.append(update_headers(config_dict["total_sheet_headers"],
-                                   total_id, config_dict["total_header_row"]))
-
-    requests.extend(update_values(part_dict, header_list, config_dict, sheet1_id, total_id))
-
-    requests.append(resize_columns(header_list, sheet1_id))
-    requests.append(resize_columns(config_dict["total_sheet_headers"], total_id))
-
-    request_body = {"requests": requests}
-
-    try:
-        service.spreadsheets().batchUpdate(spreadsheetId=book_id, body=request_body).execute()
-    except HttpError as error:
-        print(error)
-        sys.exit(1)
-
-
-"""
-Method: authorize
-Purpose: Used to authorize the credentials in order to use
-the google sheets API. 
-
-Variables:
-scope- amount of access to the API needed for the program
-to function
-credentials- ServiceAccountCredentials object 
-http- HTTP object
-service- googleapiclient.discovery.Resource object
-
-Return:
-service- googleapiclient.discovery.Resource object
-"""
-
-
-def authorize():
-    scope = ["https://www.googleapis.com/auth/spreadsheets"]
-    credentials = ServiceAccountCredentials.from_json_keyfile_name("service_key.json", scope)
-
-    http = httplib2.Http()
-    http = credentials.authorize(http)
-
-    service = build("sheets", "v4", http=http)
-
-    return service
-
-
-"""
-Method: update_sheets
-Purpose: Used to edit the title of the work book. Also, 
-adds additonal work sheets if the specified work sheets
-are not found in the workbook.
-
-Parameters:
-service- googleapiclient.discovery.Resource object
-book_id- file id for the workbook
-
-Variables:
-total_id- unique id to the totals sheet in the workbook
-sheet1_id- unique id to the first sheet in the workbook
-result- json response after the request
-body- request body for sending a request to the API
-response- json response after the request
-
-Returns:
-total_id- unique id to the totals sheet in the workbook
-sheet1_id- unique id to the first sheet in the workbook
-"""
-
-
-def update_sheets(service, book_id, config_dict):
-    total_id, sheet1_id = "", ""
-
-    # get information about worksheet
-    try:
-        result = service.spreadsheets().get(spreadsheetId=book_id).execute()
-
-    except HttpError as error:
-        print(error)
-        sys.exit(1)
-
-    workbook_title = result["properties"]["title"]
-
-    # change workbook title if necessary
-    if workbook_title != config_dict["book_title"]:
-        body = {"requests": [{"updateSpreadsheetProperties":
-               {"properties": {"title": config_dict["book_title"]},
-                "fields": "*"}}]}
-        try:
-            service.spreadsheets().batchUpdate(spreadsheetId=book_id, body=body).execute()
-        except HttpError as err:
-            print(err)
-            sys.exit(1)
-
-    # loops through the sheets in the json response
-    # looks for the specified sheet names
-    for sheet in result["sheets"]:
-        if sheet["properties"]["title"] == config_dict["total_sheet_name"]:
-            total_id = sheet["properties"]["sheetId"]
-
-        if sheet["properties"]["title"] == config_dict["sheet1_title"]:
-            sheet1_id = sheet["properties"]["sheetId"]
-
-    # create the totals sheet since it wasn't found
-    if total_id == "":
-        body = {"requests": [{"addSheet": {"properties": {"title": "Card Totals"}}}]}
-
-        try:
-            response = service.spreadsheets().batchUpdate(
-                       spreadsheetId=book_id, body=body).execute()
-            total_id = response["replies"][0]["addSheet"]["properties"]["sheetId"]
-        except HttpError as error:
-            print(error)
-            sys.exit(1)
-
-    # create sheet1 since it wasn't found
-    if sheet1_id == "":
-        body = {"requests": [{"addSheet": {"properties": {"title": "Sheet1"}}}]}
-
-        try:
-            response = service.spreadsheets().batchUpdate(
-                       spreadsheetId=book_id, body=body).execute()
-            sheet1_id = response["replies"][0]["addSheet"]["properties"]["sheetId"]
-        except HttpError as error:
-            print(error)
-            sys.exit(1)
-
-    return sheet1_id, total_id
-
-
-"""
-Method: update_headers
-Purpose: Makes the request to update the header formatting 
-and values of the spreadsheet. 
-
-Parameters:
-headers- list of header strings
-sheet_id- unique id for the particular sheet
-in the workbook
-start_row- row where the headers start
-
-Variables:
-values- list of dictionaries that dictate the formatting
-and value for the cells
-black- dictionary that specifies rgb values for
-the color black
-gray- same as black only for gray this time
-border- dictionary that dictates the border color
-and border type
-borders- dictionary that dictates which borders of
-the cell will be formatted
-cell_range- range of cells where the headers will
-be located
-cell_format- dictionary that dictates the formatting
-for the cells
-cell_value- value that will be inserted into the cell
-header- Dictionary that dictates what attributes of 
-the cells will be updated. "*" for fields means that 
-any change will be applied to the particular cell.
-
-Return: Returns an updateCells request via a dictionary
-of "updateCells" mapped to the header dictionary. 
-"""
-
-
-def update_headers(headers, sheet_id, start_row):
-    values = []
-    black = {"red": 0,
-             "blue": 0,
-             "green": 0
-             }
-
-    gray = {"red": .72,
-            "blue": .72,
-            "green": .72
-            }
-
-    border = {"style": "SOLID", "color": black}
-    borders = {"top": border,
-               "bottom": border,
-               "left": border,
-               "right": border
-               }
-    cell_range = {"sheetId": sheet_id,
-                  "startRowIndex": start_row - 1,
-                  "endRowIndex": start_row,
-                  "startColumnIndex": 0,
-                  "endColumnIndex": len(headers)
-                  }
-
-    cell_format = {"borders": borders,
-                   "backgroundColor": gray,
-                   "horizontalAlignment": "CENTER"
-                   }
-
-    for header in headers:
-        cell_value = {"stringValue": header}
-        values.append({"userEnteredFormat": cell_format,
-                       "userEnteredValue": cell_value})
-
-    header = {"range": cell_range,
-              "rows": [{"values": values}],
-              "fields": "*"}
-
-    return {"updateCells": header}
-
-
-"""
-Method: resize_columns
-Purpose: To make a request to auto resize columns in the
-spreadsheet. 
-
-Parameters:
-header_list- list of header strings
-sheet_id- unique id for a sheet in the workbook
-
-Variables:
-sheet_dimensions- dictionary that dictates which
-columns in the spreadsheet should be auto resized
-
-Returns: 
-A dictionary that makes an autoResizeDimensions request.
-"""
-
-
-def resize_columns(header_list, sheet_id):
-    sheet_dimensions = {"sheetId": sheet_id,
-                        "dimension": "COLUMNS",
-                        "startIndex": 0,
-                        "endIndex": len(header_list)
-                        }
-
-    return {"autoResizeDimensions": {"dimensions": sheet_dimensions}}
-
-
-"""
-Method: update_header 
-Purpose: Makes updateCells requests per row of 
-data that needs to be entered into both the first sheet
-and the totals sheet. 
-
-Parameters:
-part_dict- dictionary mapping part numbers to the rest of the wanted data
-header_list- list of header strings
-config_dict- dictionary of configuration parameters 
-sheet1_id- unique id for the first sheet in the workbook
-totals_id- unique id for the totals sheet in the workbook
-
-Variables:
-qty_start- starting index for the qty of parts
-qty_end- ending index for the qty of parts
-header_row- row where the headers are located
-row_updates- list of dictionaries that specify
-the updates to make per row of cells
-row_num- row number that corresponds to the part info
-found in the excel sheet
-data- list of updateCells requests
-sheet_range- dictionary that specifies the range of 
-cells for the row that will be altered
-row- dictionary that specifies the attributes of the
-row that will change
-total_data- same as data
-total_range- same as range only particular to the total sheet
-totals_row_num- same as row_num only particular
-to the total sheet
-range1- cell range 1 for the formula
-range1- cell range 2 for the formula
-sheet- sheet name for the formula
-formula- sumproduct formula used to calculate the number of
-parts needed for a specified number of cards
-total_row- same as row only particular to the total sheet
-
-Returns: 
-A list of cellUpdates requests.
-"""
-
-
-def update_values(part_dict, header_list, config_dict, sheet1_id, totals_id):
-    qty_start = config_dict["qty_start"] - 1
-    qty_end = len(header_list) - 1
-    header_row = config_dict["header_row"]
-
-    row_updates = []
-    for keys, values in part_dict.items():
-        row_num = values[0] - 1
-        data = []
-        data.append({"userEnteredValue": {"stringValue": keys}})
-
-        sheet_range = {"sheetId": sheet1_id,
-                       "startRowIndex": row_num,
-                       "endRowIndex": row_num + 1,
-                       "startColumnIndex": 0,
-                       "endColumnIndex": len(header_list)
-                       }
-
-        for i in range(1, len(values)):
-            if isinstance(values[i], list):
-                if isinstance(values[i][0], str):
-                    cell_value = {"stringValue": values[i][0]}
-
-                else:
-                    cell_value = {"numberValue": values[i][0]}
-
-            else:
-                cell_value = {"stringValue": values[i]}
-            data.append({"userEnteredValue": cell_value})
-
-        row = {"range": sheet_range,
-               "rows": [{"values": data}],
-               "fields": "*"}
-
-        row_updates.append({"updateCells": row})
-
-        total_data = []
-        total_row_num = row_num - config_dict["header_row"] + config_dict["total_header_row"]
-        totals_range = {"sheetId": totals_id,
-                        "startRowIndex": total_row_num,
-                        "endRowIndex": total_row_num + 1,
-                        "startColumnIndex": 0,
-                        "endColumnIndex": len(config_dict["total_sheet_headers"])
-                        }
-
-        range1 = utils.get_range(qty_start, qty_end, row_num + 1, row_num + 1)
-        range2 = utils.get_range(qty_start, qty_end, header_row - 1, header_row - 1)
-        sheet = config_dict["out_sheet_name"] + "!"
-        formula = "=SUMPRODUCT({0}{1}, {2}{3})".format(sheet, range1, sheet, range2)
-
-        total_data.append({"userEnteredValue": {"stringValue": keys}})
-        total_data.append({"userEnteredValue": {"formulaValue": formula}})
-
-        total_row = {"range": totals_range,
-                     "rows": [{"values": total_data}],
-                     "fields": "*"}
-
-        row_updates.append({"updateCells": total_row})
-
-    return row_updates
+"""
+File: gsheets.py
+Author: Kyle Fullerton
+Purpose: File that is used to handle functionality with google sheets.
+For additional documentation lookup Google's Sheets API. A good starting
+place would be the batchUpdate page which has information and links
+to many of the update requests made with this file.
+"""
+from excelScript import utils
+from concurrent.futures import ThreadPoolExecutor
+from oauth2client.client import EXPIRY_FORMAT
+from oauth2client.service_account import ServiceAccountCredentials
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.errors import HttpError
+import datetime
+import hashlib
+import httplib2
+import json
+import os
+import random
+import sys
+import time
+
+
+# requests are sent in chunks so a large spreadsheet doesn't go over the
+# payload limit and a failure only has to resend one chunk
+MAX_CHUNK_BYTES = 2 * 1024 * 1024
+MAX_CHUNK_REQUESTS = 1000
+
+# rate limit and server errors are retried with an exponential backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+
+# the discovery document and access token are cached so a run doesn't
+# have to fetch them every time
+KEY_FILE = "service_key.json"
+CACHE_DIRECTORY = ".gsheets_cache"
+DISCOVERY_MAX_AGE = 7 * 24 * 60 * 60
+
+
+"""
+Method: execute
+Purpose: Makes calls to authorize the request credentials, update
+properties with the spreadsheets, and then add requests to update
+the spreadsheet headers and data. 
+
+Parameters: 
+part_table- PartTable of the parts in the output excel file
+header_list- HeaderList of headers that are on the output excel file
+config_dict- Dictionary of configuration parameters
+progress_path- path of the file the sent chunks are recorded in or None
+service- googleapiclient.discovery.Resource object or None to authorize one
+snapshot_path- path of the snapshot of the last sync or None to send every cell
+setup- Future from start_setup or None to set up the spreadsheet now
+
+Variables:
+book_id- file id for the workbook
+requests- will be a list of dictionaries (Json objects) used to make 
+requests to edit the spreadsheet
+sheet1_id- unique id to the first sheet in the workbook
+total_id- unique id to the totals sheet in the workbook
+sheet_ids- list of the sheet ids the snapshot is for
+header_blocks- blocks of the header rows of both sheets
+blocks- blocks of the values of both sheets
+grids- dictionary of sheet title mapped to the rows of the last sync
+resizes- list of requests to resize the columns
+chunks- list of (kind, body) tuples that are sent in order
+"""
+
+
+def execute(part_table, header_list, config_dict, progress_path=None, service=None,
+            snapshot_path=None, setup=None):
+    book_id = config_dict["gbook_id"]
+    requests = []
+
+    if setup is None:
+        service, sheet1_id, total_id = setup_sheets(config_dict, service)
+    else:
+        service, sheet1_id, total_id = setup.result()
+
+    sheet_ids = [sheet1_id, total_id]
+
+    requests.append(update_headers(header_list, sheet1_id, config_dict["header_row"]))
+    requests.append(update_headers(config_dict["total_sheet_headers"],
+                                   total_id, config_dict["total_header_row"]))
+
+    header_blocks = [(config_dict["sheet1_title"], config_dict["header_row"], 0,
+                      [list(header_list)], "RAW"),
+                     (config_dict["total_sheet_name"], config_dict["total_header_row"], 0,
+                      [list(config_dict["total_sheet_headers"])], "RAW")]
+    blocks = update_values(part_table, header_list, config_dict)
+
+    # only the headers and cells that changed since the last sync are sent
+    grids = None
+    if snapshot_path is not None:
+        grids = load_snapshot(snapshot_path, book_id, sheet_ids)
+
+        if grids is None:
+            grids = fetch_grids(service, book_id, [config_dict["sheet1_title"],
+                                                   config_dict["total_sheet_name"]])
+
+        requests = [request for request, header_block in zip(requests, header_blocks)
+                    if diff_blocks([header_block], grids)]
+        blocks, grids = diff_blocks(blocks, grids), overlay_grids(grids, header_blocks + blocks)
+
+    resizes = [resize_columns(header_list, sheet1_id),
+               resize_columns(config_dict["total_sheet_headers"], total_id)]
+
+    # the values are written after the headers are formatted and the
+    # columns are resized after everything has been written
+    chunks = [("batchUpdate", {"requests": chunk}) for chunk in chunk_items(requests)]
+    chunks.extend(value_chunks(blocks))
+
+    if chunks:
+        chunks.extend(("batchUpdate", {"requests": chunk}) for chunk in chunk_items(resizes))
+
+    send_requests(service, book_id, chunks, progress_path)
+
+    if snapshot_path is not None:
+        save_snapshot(snapshot_path, book_id, sheet_ids, grids)
+
+
+"""
+Method: start_setup
+Purpose: Starts authorizing and setting up the spreadsheet in another
+thread so it can happen while the excel files are being merged. The
+google calls block while they wait on the network, so a thread lets
+the merge keep running in the meantime.
+
+Parameters:
+config_dict- Dictionary of configuration parameters
+service- googleapiclient.discovery.Resource object or None to authorize one
+
+Variables:
+executor- ThreadPoolExecutor the setup is ran in
+future- Future of the setup
+
+Return: future- Future of the (service, sheet1_id, total_id) tuple
+"""
+
+
+def start_setup(config_dict, service=None):
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(setup_sheets, config_dict, service)
+    executor.shutdown(wait=False)
+
+    return future
+
+
+"""
+Method: setup_sheets
+Purpose: Authorizes the credentials if a service isn't given and
+sets up the spreadsheet's title and sheets.
+
+Parameters:
+config_dict- Dictionary of configuration parameters
+service- googleapiclient.discovery.Resource object or None to authorize one
+
+Variables:
+sheet1_id- unique id to the first sheet in the workbook
+total_id- unique id to the totals sheet in the workbook
+
+Returns:
+service- googleapiclient.discovery.Resource object
+sheet1_id- unique id to the first sheet in the workbook
+total_id- unique id to the totals sheet in the workbook
+"""
+
+
+def setup_sheets(config_dict, service=None):
+    if service is None:
+        service = authorize()
+
+    sheet1_id, total_id = update_sheets(service, config_dict["gbook_id"], config_dict)
+
+    return service, sheet1_id, total_id
+
+
+"""
+Method: progress_path
+Purpose: Gets the path of the file that records which chunks of
+requests have been sent for an output file.
+
+Parameter: write_file- path of the output excel file
+
+Return: path of the progress file
+"""
+
+
+def progress_path(write_file):
+    return write_file + ".gsheets"
+
+
+"""
+Method: snapshot_path
+Purpose: Gets the path of the file that keeps a snapshot of the values
+that were last synced to google sheets for an output file.
+
+Parameter: write_file- path of the output excel file
+
+Return: path of the snapshot file
+"""
+
+
+def snapshot_path(write_file):
+    return write_file + ".gsheets.json"
+
+
+"""
+Method: send_requests
+Purpose: Sends each chunk of requests in order. batchUpdate chunks go to
+spreadsheets().batchUpdate and values chunks go to
+spreadsheets().values().batchUpdate. After each chunk is sent the
+number of sent chunks is recorded in the progress file, so if a chunk
+fails the next run with the same chunks starts at the chunk that failed.
+The progress file is removed once every chunk has been sent.
+
+Parameters:
+service- googleapiclient.discovery.Resource object
+book_id- file id for the workbook
+chunks- list of (kind, body) tuples in the order they are sent
+progress_path- path of the file the sent chunks are recorded in or None
+
+Variables:
+key- hash of the chunks so progress is only used for the same chunks
+sent- number of chunks that have already been sent
+kind- "batchUpdate" or "values"
+body- request body for the current chunk
+request- googleapiclient.http.HttpRequest object for the current chunk
+"""
+
+
+def send_requests(service, book_id, chunks, progress_path=None):
+    key = hashlib.sha1(json.dumps(chunks, sort_keys=True).encode()).hexdigest()
+    sent = load_progress(progress_path, key)
+
+    if sent > 0:
+        print("Resuming google sheets update at chunk {0} of {1}".format(sent + 1, len(chunks)))
+
+    for index in range(sent, len(chunks)):
+        kind, body = chunks[index]
+
+        if kind == "values":
+            request = service.spreadsheets().values().batchUpdate(spreadsheetId=book_id,
+                                                                  body=body)
+        else:
+            request = service.spreadsheets().batchUpdate(spreadsheetId=book_id, body=body)
+
+        try:
+            execute_request(request)
+        except HttpError as error:
+            print(error)
+            print("Error: google sheets update stopped at chunk {0} of {1}. Run again "
+                  "to resume from this chunk".format(index + 1, len(chunks)))
+            sys.exit(1)
+
+        save_progress(progress_path, key, index + 1)
+
+    if progress_path is not None and os.path.exists(progress_path):
+        os.remove(progress_path)
+
+
+"""
+Method: chunk_items
+Purpose: Splits a list of requests or value ranges into chunks that are
+no larger than the byte and item limits, keeping them in order. An item
+larger than the byte limit is put in a chunk by itself.
+
+Parameters:
+items- list of request or value range dictionaries
+max_bytes- largest size of a chunk in bytes of JSON
+max_items- largest number of items in a chunk
+
+Variables:
+chunks- list of lists of items
+chunk- items in the current chunk
+chunk_bytes- size of the current chunk
+size- size of the current item
+
+Return: chunks- list of lists of items
+"""
+
+
+def chunk_items(items, max_bytes=MAX_CHUNK_BYTES, max_items=MAX_CHUNK_REQUESTS):
+    chunks = []
+    chunk, chunk_bytes = [], 0
+
+    for item in items:
+        # the extra byte is for the comma between items
+        size = len(json.dumps(item, separators=(",", ":"))) + 1
+
+        if chunk and (chunk_bytes + size > max_bytes or len(chunk) >= max_items):
+            chunks.append(chunk)
+            chunk, chunk_bytes = [], 0
+
+        chunk.append(item)
+        chunk_bytes += size
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+"""
+Method: execute_request
+Purpose: Executes a request to the API, retrying it when google
+responds with a rate limit or server error. The wait doubles after
+each retry and has some random jitter added so retries don't line up.
+
+Parameters:
+request- googleapiclient.http.HttpRequest object
+retries- number of times the request is retried
+backoff- seconds waited before the first retry
+
+Variables:
+attempt- number of times the request has been retried
+delay- seconds waited before the next retry
+
+Return: json response of the request
+"""
+
+
+def execute_request(request, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+    attempt = 0
+
+    while True:
+        try:
+            return request.execute()
+
+        except HttpError as error:
+            if error.resp.status not in RETRY_STATUSES or attempt >= retries:
+                raise
+
+            delay = backoff * 2 ** attempt
+            delay += random.uniform(0, delay / 2)
+            print("Google sheets responded with status {0}, retrying in {1:.1f} "
+                  "seconds".format(error.resp.status, delay))
+
+        time.sleep(delay)
+        attempt += 1
+
+
+"""
+Method: load_progress
+Purpose: Reads in the number of chunks that were sent for the same
+requests by a run that didn't finish.
+
+Parameters:
+progress_path- path of the progress file or None
+key- hash of the requests being sent
+
+Variable: progress- dictionary read in from the progress file
+
+Return: number of chunks that have already been sent
+"""
+
+
+def load_progress(progress_path, key):
+    if progress_path is None:
+        return 0
+
+    try:
+        with open(progress_path) as progress_file:
+            progress = json.load(progress_file)
+
+    except (OSError, ValueError):
+        return 0
+
+    if progress.get("key") != key:
+        return 0
+
+    return progress.get("sent", 0)
+
+
+"""
+Method: save_progress
+Purpose: Records the number of chunks that have been sent.
+
+Parameters:
+progress_path- path of the progress file or None
+key- hash of the requests being sent
+sent- number of chunks that have been sent
+"""
+
+
+def save_progress(progress_path, key, sent):
+    if progress_path is None:
+        return
+
+    with open(progress_path, "w") as progress_file:
+        json.dump({"key": key, "sent": sent}, progress_file)
+
+
+"""
+Method: authorize
+Purpose: Used to authorize the credentials in order to use
+the google sheets API. An access token from an earlier run is used
+if it hasn't expired, otherwise a new one is fetched and cached.
+
+Variables:
+scope- amount of access to the API needed for the program
+to function
+credentials- ServiceAccountCredentials object 
+http- HTTP object
+service- googleapiclient.discovery.Resource object
+
+Return:
+service- googleapiclient.discovery.Resource object
+"""
+
+
+def authorize():
+    scope = ["https://www.googleapis.com/auth/spreadsheets"]
+    credentials = ServiceAccountCredentials.from_json_keyfile_name(KEY_FILE, scope)
+    os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+
+    load_token(credentials)
+    if credentials.access_token is None or credentials.access_token_expired:
+        credentials.get_access_token()
+        save_token(credentials)
+
+    http = httplib2.Http()
+    http = credentials.authorize(http)
+
+    service = build_service(http)
+
+    return service
+
+
+"""
+Method: build_service
+Purpose: Builds the sheets service from the cached discovery document.
+If there isn't a cached document or it is too old then the service is
+built the normal way and its discovery document is cached.
+
+Parameter: http- authorized HTTP object
+
+Variables:
+discovery_path- path of the cached discovery document
+document- dictionary of the discovery document
+service- googleapiclient.discovery.Resource object
+
+Return: service- googleapiclient.discovery.Resource object
+"""
+
+
+def build_service(http):
+    discovery_path = os.path.join(CACHE_DIRECTORY, "sheets_v4.json")
+
+    try:
+        if time.time() - os.path.getmtime(discovery_path) < DISCOVERY_MAX_AGE:
+            with open(discovery_path) as discovery_file:
+                document = json.load(discovery_file)
+
+            return build_from_document(document, http=http)
+
+    except (OSError, ValueError):
+        pass
+
+    service = build("sheets", "v4", http=http)
+
+    # _rootDesc is the discovery document the service was built from
+    with open(discovery_path, "w") as discovery_file:
+        json.dump(service._rootDesc, discovery_file)
+
+    return service
+
+
+"""
+Method: load_token
+Purpose: Sets the access token of the credentials to the cached token
+if it was made for the same service account and scopes.
+
+Parameter: credentials- ServiceAccountCredentials object
+
+Variables:
+token_path- path of the cached access token
+token- dictionary read in from the token file
+"""
+
+
+def load_token(credentials):
+    token_path = os.path.join(CACHE_DIRECTORY, "token.json")
+
+    try:
+        with open(token_path) as token_file:
+            token = json.load(token_file)
+
+        if token["account"] == credentials.service_account_email and \
+                token["scopes"] == credentials._scopes:
+            credentials.access_token = token["access_token"]
+            credentials.token_expiry = datetime.datetime.strptime(token["token_expiry"],
+                                                                  EXPIRY_FORMAT)
+
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+
+"""
+Method: save_token
+Purpose: Caches the access token of the credentials. The file can only
+be read by the user since the token gives access to the spreadsheets.
+
+Parameter: credentials- ServiceAccountCredentials object
+
+Variables:
+token_path- path of the cached access token
+token- dictionary of the access token
+"""
+
+
+def save_token(credentials):
+    token_path = os.path.join(CACHE_DIRECTORY, "token.json")
+    token = {"account": credentials.service_account_email,
+             "scopes": credentials._scopes,
+             "access_token": credentials.access_token,
+             "token_expiry": credentials.token_expiry.strftime(EXPIRY_FORMAT)}
+
+    with open(os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600),
+              "w") as token_file:
+        json.dump(token, token_file)
+
+
+"""
+Method: update_sheets
+Purpose: Used to edit the title of the work book. Also, 
+adds additonal work sheets if the specified work sheets
+are not found in the workbook. The title change and the new
+sheets are sent together in one request.
+
+Parameters:
+service- googleapiclient.discovery.Resource object
+book_id- file id for the workbook
+
+Variables:
+total_id- unique id to the totals sheet in the workbook
+sheet1_id- unique id to the first sheet in the workbook
+result- json response after the request
+requests- list of requests to set up the workbook
+response- json response after the request
+properties- properties of an added sheet
+
+Returns:
+total_id- unique id to the totals sheet in the workbook
+sheet1_id- unique id to the first sheet in the workbook
+"""
+
+
+def update_sheets(service, book_id, config_dict):
+    total_id, sheet1_id = "", ""
+    requests = []
+
+    # get information about worksheet
+    try:
+        result = execute_request(service.spreadsheets().get(
+                 spreadsheetId=book_id, fields="properties.title,sheets.properties"))
+
+    except HttpError as error:
+        print(error)
+        sys.exit(1)
+
+    workbook_title = result["properties"]["title"]
+
+    # change workbook title if necessary
+    if workbook_title != config_dict["book_title"]:
+        requests.append({"updateSpreadsheetProperties":
+                        {"properties": {"title": config_dict["book_title"]},
+                         "fields": "title"}})
+
+    # loops through the sheets in the json response
+    # looks for the specified sheet names
+    for sheet in result["sheets"]:
+        if sheet["properties"]["title"] == config_dict["total_sheet_name"]:
+            total_id = sheet["properties"]["sheetId"]
+
+        if sheet["properties"]["title"] == config_dict["sheet1_title"]:
+            sheet1_id = sheet["properties"]["sheetId"]
+
+    # create the totals sheet since it wasn't found
+    if total_id == "":
+        requests.append({"addSheet": {"properties": {"title": config_dict["total_sheet_name"]}}})
+
+    # create sheet1 since it wasn't found
+    if sheet1_id == "":
+        requests.append({"addSheet": {"properties": {"title": config_dict["sheet1_title"]}}})
+
+    if requests:
+        try:
+            response = execute_request(service.spreadsheets().batchUpdate(
+                       spreadsheetId=book_id, body={"requests": requests}))
+        except HttpError as error:
+            print(error)
+            sys.exit(1)
+
+        # the replies are in the same order as the requests
+        for reply in response["replies"]:
+            if "addSheet" not in reply:
+                continue
+
+            properties = reply["addSheet"]["properties"]
+            if properties["title"] == config_dict["total_sheet_name"]:
+                total_id = properties["sheetId"]
+
+            else:
+                sheet1_id = properties["sheetId"]
+
+    return sheet1_id, total_id
+
+
+"""
+Method: update_headers
+Purpose: Makes the request to update the header formatting 
+and values of the spreadsheet. 
+
+Parameters:
+headers- list of header strings
+sheet_id- unique id for the particular sheet
+in the workbook
+start_row- row where the headers start
+
+Variables:
+values- list of dictionaries that dictate the formatting
+and value for the cells
+black- dictionary that specifies rgb values for
+the color black
+gray- same as black only for gray this time
+border- dictionary that dictates the border color
+and border type
+borders- dictionary that dictates which borders of
+the cell will be formatted
+cell_range- range of cells where the headers will
+be located
+cell_format- dictionary that dictates the formatting
+for the cells
+cell_value- value that will be inserted into the cell
+header- Dictionary that dictates what attributes of 
+the cells will be updated. "*" for fields means that 
+any change will be applied to the particular cell.
+
+Return: Returns an updateCells request via a dictionary
+of "updateCells" mapped to the header dictionary. 
+"""
+
+
+def update_headers(headers, sheet_id, start_row):
+    values = []
+    black = {"red": 0,
+             "blue": 0,
+             "green": 0
+             }
+
+    gray = {"red": .72,
+            "blue": .72,
+            "green": .72
+            }
+
+    border = {"style": "SOLID", "color": black}
+    borders = {"top": border,
+               "bottom": border,
+               "left": border,
+               "right": border
+               }
+    cell_range = {"sheetId": sheet_id,
+                  "startRowIndex": start_row - 1,
+                  "endRowIndex": start_row,
+                  "startColumnIndex": 0,
+                  "endColumnIndex": len(headers)
+                  }
+
+    cell_format = {"borders": borders,
+                   "backgroundColor": gray,
+                   "horizontalAlignment": "CENTER"
+                   }
+
+    for header in headers:
+        cell_value = {"stringValue": header}
+        values.append({"userEnteredFormat": cell_format,
+                       "userEnteredValue": cell_value})
+
+    header = {"range": cell_range,
+              "rows": [{"values": values}],
+              "fields": "*"}
+
+    return {"updateCells": header}
+
+
+"""
+Method: resize_columns
+Purpose: To make a request to auto resize columns in the
+spreadsheet. 
+
+Parameters:
+header_list- list of header strings
+sheet_id- unique id for a sheet in the workbook
+
+Variables:
+sheet_dimensions- dictionary that dictates which
+columns in the spreadsheet should be auto resized
+
+Returns: 
+A dictionary that makes an autoResizeDimensions request.
+"""
+
+
+def resize_columns(header_list, sheet_id):
+    sheet_dimensions = {"sheetId": sheet_id,
+                        "dimension": "COLUMNS",
+                        "startIndex": 0,
+                        "endIndex": len(header_list)
+                        }
+
+    return {"autoResizeDimensions": {"dimensions": sheet_dimensions}}
+
+
+"""
+Method: update_values
+Purpose: Lays out the data of the first sheet and the totals sheet as
+blocks of rows so they can be written with values().batchUpdate
+instead of a request per row. The rows of the first sheet are padded
+to the width of the headers so old values past the end of a row are
+cleared. The part numbers of the totals sheet are written as they are
+and the totals formulas are written in their own column so only the
+formulas are parsed by google sheets.
+
+Parameters:
+part_table- PartTable of the parts in the output excel file
+header_list- HeaderList of header strings
+config_dict- dictionary of configuration parameters
+
+Variables:
+qty_start- starting index for the qty of parts
+qty_end- ending index for the qty of parts
+header_row- row where the headers are located
+first_row- row number of the first part in the output excel file
+row_count- number of rows from the first part to the last part
+sheet_rows- list of the rows of the first sheet
+part_nums- list of the part number rows of the totals sheet
+formulas- list of the formula rows of the totals sheet
+part_row- PartRow for the current part number
+index- index of the part's row in the lists of rows
+values- values in the part's row of the first sheet
+range1- cell range 1 for the formula
+range2- cell range 2 for the formula
+sheet- sheet name for the formula
+formula- sumproduct formula used to calculate the number of
+parts needed for a specified number of cards
+total_row- row number of the first part in the totals sheet
+
+Return: list of (sheet title, start row, start column index, rows,
+value input option) blocks
+"""
+
+
+def update_values(part_table, header_list, config_dict):
+    qty_start = config_dict["qty_start"] - 1
+    qty_end = len(header_list) - 1
+    header_row = config_dict["header_row"]
+    first_row = part_table.first_row
+
+    # rows without a part are left as empty rows
+    row_count = max((part_row.row for part_num, part_row in part_table.items()),
+                    default=first_row - 1) - first_row + 1
+    sheet_rows = [[""] * len(header_list) for i in range(row_count)]
+    part_nums = [[""] for i in range(row_count)]
+    formulas = [[""] for i in range(row_count)]
+
+    range2 = utils.get_range(qty_start, qty_end, header_row - 1, header_row - 1)
+    sheet = config_dict["out_sheet_name"] + "!"
+
+    for part_num, part_row in part_table.items():
+        index = part_row.row - first_row
+        values = [part_num] + part_row.info[1:] + part_row.qtys
+        sheet_rows[index][:len(values)] = values
+
+        range1 = utils.get_range(qty_start, qty_end, part_row.row, part_row.row)
+        formula = "=SUMPRODUCT({0}{1}, {2}{3})".format(sheet, range1, sheet, range2)
+
+        part_nums[index] = [part_num]
+        formulas[index] = [formula]
+
+    total_row = first_row - header_row + config_dict["total_header_row"]
+
+    return [(config_dict["sheet1_title"], first_row, 0, sheet_rows, "RAW"),
+            (config_dict["total_sheet_name"], total_row, 0, part_nums, "RAW"),
+            (config_dict["total_sheet_name"], total_row, 1, formulas, "USER_ENTERED")]
+
+
+"""
+Method: value_chunks
+Purpose: Makes the values batchUpdate chunks for blocks of rows. Blocks
+that are written as they are and blocks of formulas are sent in their
+own chunks since the value input option is set for the whole request.
+
+Parameter: blocks- list of blocks from update_values
+
+Variables:
+chunks- list of (kind, body) tuples
+ranges- list of value ranges for the current value input option
+
+Return: chunks- list of (kind, body) tuples
+"""
+
+
+def value_chunks(blocks):
+    chunks = []
+
+    for value_input in ("RAW", "USER_ENTERED"):
+        ranges = []
+        for title, row, column, rows, block_input in blocks:
+            if block_input == value_input:
+                ranges.extend(block_ranges(title, row, column, rows))
+
+        chunks.extend(("values", {"valueInputOption": value_input, "data": chunk})
+                      for chunk in chunk_items(ranges))
+
+    return chunks
+
+
+"""
+Method: diff_blocks
+Purpose: Finds the cells of the blocks that are different from the
+last sync. The changed cells in a row are sent from the first changed
+column to the last one, and rows next to each other with the same
+changed columns are put in one block, so new rows and new assembly
+columns are sent as whole blocks.
+
+Parameters:
+blocks- list of blocks from update_values
+grids- dictionary of sheet title mapped to the rows of the last sync
+
+Variables:
+changed- list of blocks of the changed cells
+old_rows- rows of the sheet at the last sync
+spans- list of (row index, first column, last column) of the changed cells
+columns- indexes of the changed cells in the current row
+group- spans of the rows in the current block of changed cells
+
+Return: changed- list of blocks of the changed cells
+"""
+
+
+def diff_blocks(blocks, grids):
+    changed = []
+
+    for title, start_row, start_column, rows, value_input in blocks:
+        old_rows = grids.get(title, [])
+        spans = []
+
+        for i, row in enumerate(rows):
+            old_row = grid_row(old_rows, start_row - 1 + i)
+            columns = [j for j, value in enumerate(row)
+                       if grid_value(old_row, start_column + j) != value]
+
+            if columns:
+                spans.append((i, columns[0], columns[-1]))
+
+        group = []
+        for span in spans + [None]:
+            if group and (span is None or span[0] != group[-1][0] + 1 or
+                          span[1:] != group[-1][1:]):
+                first, last = group[0][1], group[0][2]
+                changed.append((title, start_row + group[0][0], start_column + first,
+                                [rows[span[0]][first:last + 1] for span in group],
+                                value_input))
+                group = []
+
+            if span is not None:
+                group.append(span)
+
+    return changed
+
+
+"""
+Method: overlay_grids
+Purpose: Writes blocks of rows over the rows of the last sync to make
+the snapshot of this sync.
+
+Parameters:
+grids- dictionary of sheet title mapped to the rows of the last sync
+blocks- list of blocks that were synced
+
+Variables:
+new_grids- dictionary of sheet title mapped to the rows of this sync
+sheet_rows- rows of the current sheet
+grid_index- index of the current row in the sheet
+
+Return: new_grids- dictionary of sheet title mapped to the rows of this sync
+"""
+
+
+def overlay_grids(grids, blocks):
+    new_grids = {title: [list(row) for row in rows] for title, rows in grids.items()}
+
+    for title, start_row, start_column, rows, value_input in blocks:
+        sheet_rows = new_grids.setdefault(title, [])
+
+        for i, row in enumerate(rows):
+            grid_index = start_row - 1 + i
+            while len(sheet_rows) <= grid_index:
+                sheet_rows.append([])
+
+            if len(sheet_rows[grid_index]) < start_column + len(row):
+                sheet_rows[grid_index].extend(
+                    [""] * (start_column + len(row) - len(sheet_rows[grid_index])))
+            sheet_rows[grid_index][start_column:start_column + len(row)] = row
+
+    return new_grids
+
+
+"""
+Method: grid_row
+Purpose: Gets a row of a sheet's rows, or an empty row past the end.
+
+Parameters:
+rows- list of rows of a sheet
+index- index of the row
+
+Return: list of the values in the row
+"""
+
+
+def grid_row(rows, index):
+    if index < len(rows):
+        return rows[index]
+
+    return []
+
+
+"""
+Method: grid_value
+Purpose: Gets a value of a row, or an empty string past the end.
+
+Parameters:
+row- list of values in a row
+index- column index of the value
+
+Return: value in the column
+"""
+
+
+def grid_value(row, index):
+    if index < len(row):
+        return row[index]
+
+    return ""
+
+
+"""
+Method: fetch_grids
+Purpose: Gets the values of the sheets from google sheets when there
+isn't a snapshot of the last sync. Formulas are fetched as formulas so
+they can be compared to the formulas being sent.
+
+Parameters:
+service- googleapiclient.discovery.Resource object
+book_id- file id for the workbook
+titles- list of the titles of the sheets
+
+Variables:
+ranges- list of A1 ranges of the whole sheets
+response- json response after the request
+
+Return: dictionary of sheet title mapped to its rows
+"""
+
+
+def fetch_grids(service, book_id, titles):
+    ranges = ["'{0}'".format(title.replace("'", "''")) for title in titles]
+
+    try:
+        response = execute_request(service.spreadsheets().values().batchGet(
+                   spreadsheetId=book_id, ranges=ranges, valueRenderOption="FORMULA"))
+    except HttpError as error:
+        print(error)
+        sys.exit(1)
+
+    return {title: value_range.get("values", [])
+            for title, value_range in zip(titles, response["valueRanges"])}
+
+
+"""
+Method: load_snapshot
+Purpose: Reads in the snapshot of the last sync. The snapshot is only
+used if it was made for the same workbook and sheets.
+
+Parameters:
+snapshot_path- path of the snapshot file
+book_id- file id for the workbook
+sheet_ids- list of the sheet ids of the sheets
+
+Variable: snapshot- dictionary read in from the snapshot file
+
+Return: dictionary of sheet title mapped to its rows or None
+"""
+
+
+def load_snapshot(snapshot_path, book_id, sheet_ids):
+    try:
+        with open(snapshot_path) as snapshot_file:
+            snapshot = json.load(snapshot_file)
+
+    except (OSError, ValueError):
+        return None
+
+    if snapshot.get("book_id") != book_id or snapshot.get("sheet_ids") != sheet_ids:
+        return None
+
+    return snapshot["grids"]
+
+
+"""
+Method: save_snapshot
+Purpose: Writes the snapshot of this sync.
+
+Parameters:
+snapshot_path- path of the snapshot file
+book_id- file id for the workbook
+sheet_ids- list of the sheet ids of the sheets
+grids- dictionary of sheet title mapped to its rows
+"""
+
+
+def save_snapshot(snapshot_path, book_id, sheet_ids, grids):
+    with open(snapshot_path, "w") as snapshot_file:
+        json.dump({"book_id": book_id, "sheet_ids": sheet_ids, "grids": grids}, snapshot_file)
+
+
+"""
+Method: block_ranges
+Purpose: Splits rows of values into blocks of rows that are no larger
+than the byte limit and makes a value range for each block.
+
+Parameters:
+title- title of the sheet the rows are written to
+start_row- row number of the first row
+start_column- column index of the first column
+rows- list of lists of values
+max_bytes- largest size of a block in bytes of JSON
+
+Variables:
+ranges- list of value ranges
+block- rows in the current block
+block_bytes- size of the current block
+block_row- row number of the first row in the current block
+size- size of the current row
+
+Return: ranges- list of value ranges
+"""
+
+
+def block_ranges(title, start_row, start_column, rows, max_bytes=MAX_CHUNK_BYTES):
+    ranges = []
+    block, block_bytes, block_row = [], 0, start_row
+
+    for row in rows:
+        size = len(json.dumps(row, separators=(",", ":"))) + 1
+
+        if block and block_bytes + size > max_bytes:
+            ranges.append(value_range(title, block_row, start_column, block))
+            block_row += len(block)
+            block, block_bytes = [], 0
+
+        block.append(row)
+        block_bytes += size
+
+    if block:
+        ranges.append(value_range(title, block_row, start_column, block))
+
+    return ranges
+
+
+"""
+Method: value_range
+Purpose: Makes a value range for a block of rows.
+Ex: {"range": "'Sheet1'!A3:F4", "values": [["PN-1", 2.0], ["PN-2", 1.0]]}
+
+Parameters:
+title- title of the sheet the rows are written to
+row- row number of the first row
+column- column index of the first column
+rows- list of lists of values
+
+Variable: width- number of columns in the widest row
+
+Return: dictionary of the A1 range mapped to the rows
+"""
+
+
+def value_range(title, row, column, rows):
+    width = max(max(len(values) for values in rows), 1)
+    cell_range = utils.get_range(column, column + width - 1, row, row + len(rows) - 1)
+
+    return {"range": "'{0}'!{1}".format(title.replace("'", "''"), cell_range),
+            "values": rows}
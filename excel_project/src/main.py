@@ -1,99 +1,420 @@
-"""
-File: main.py
-Author: Kyle Fullerton
-Purpose: File that is used to control the main flow of the
-program.
-"""
-
-import xlrd
-import os
-
-from excelScript import (args,
-                         process_files,
-                         utils,
-                         configs,
-                         excel,
-                         gsheets
-                         )
-
-from xlrd.biffh import XLRDError
-import sys
-# import time
-
-
-"""
-Method: main
-Purpose: Used to control the main flow of the program. 
-Makes function calls to parse the arguments, set up
-configuration parameters, read in an output file,
-and finally process the other read in files in the directory
-
-Variables: 
-directory_path- Path to the specified directory on the command line
-arg_config_file- None or a filename/path for a specified configuration file
-parameters- List of specified parameters to change
-configs_dict- Dictionary of configuration parameters
-files- List of files to read in the directory
-write_file- Output excel file that will be written to
-out_write_book- Openpyxl workbook object of the output excel file
-out_write_sheet- Openpyxl worksheet of the output excel file
-out_read_book- XLRD workbook object of the output excel file
-out_read_sheet- XLRD workbook object of the output excel file
-part_dict- Dictionary mapping part numbers to the rest of the wanted data
-header_list- List of headers that are on the output excel file 
-file_path- Full file path for the other read in files in the directory 
-in_read_book- XLRD workbook object of an input excel file
-in_read_sheet- XLRD worksheet object of an input excel file
-"""
-
-
-def main():
-    # start_time = time.clock()
-
-    directory_path, arg_config_file, parameters = args.parse_arguments()
-    configs_dict = configs.make_config_dict(arg_config_file, parameters)
-
-    files, write_file = process_files.find_write_file(directory_path, configs_dict["out_file"])
-    out_write_book, out_write_sheet = process_files.\
-        get_valid_writebook(write_file, configs_dict["out_sheet_name"])
-
-    out_read_book = xlrd.open_workbook(write_file)
-    out_read_sheet = out_read_book.sheet_by_name(configs_dict["out_sheet_name"])
-
-    part_dict = process_files.create_part_dict(out_read_sheet, configs_dict)
-    header_list = excel.add_headers(out_read_sheet, out_write_sheet, configs_dict)
-
-    for file in files:
-        file_path = os.path.abspath(os.path.join(directory_path, file))
-
-        try:
-            in_read_book, in_read_sheet = process_files.get_valid_readbook(file_path, configs_dict)
-            utils.add_assembly_num(header_list, out_write_sheet, in_read_sheet, configs_dict)
-            part_dict = excel.update_master(in_read_sheet, out_write_sheet, header_list,
-                                            part_dict, configs_dict, file, out_write_book)
-        except XLRDError:
-            print("Error: {0} was not read in since it's not a .xlsx file".format(file))
-            continue
-
-        except RuntimeError as error:
-            print(str(error).format(file))
-            continue
-
-        except IndexError as parameter:
-            print("Error: config parameter {0} defines an out of "
-                  "range column for file {1}".format(parameter, file))
-            continue
-
-    utils.edit_column_width(out_write_sheet, header_list, configs_dict)
-    title = configs_dict["total_sheet_name"]
-    utils.edit_column_width(out_write_book[title],
-                            configs_dict["total_sheet_headers"], configs_dict)
-    out_write_book.save(write_file)
-
-    if configs_dict["use_gsheets"]:
-        gsheets.execute(part_dict, header_list, configs_dict)
-
-    # print(time.clock() - start_time, "seconds")
-
-
-main()
+"""
+File: main.py
+Author: Kyle Fullerton
+Purpose: File that is used to control the main flow of the
+program.
+"""
+
+import os
+
+from excelScript import (args,
+                         process_files,
+                         utils,
+                         configs,
+                         excel,
+                         readers,
+                         rebuild,
+                         cache,
+                         store,
+                         snapshot,
+                         watch,
+                         stats
+                         )
+
+from xlrd.biffh import XLRDError
+import sys
+import time
+
+
+"""
+Method: main
+Purpose: Used to control the main flow of the program. 
+Makes function calls to parse the arguments, set up
+configuration parameters, read in an output file,
+and finally process the other read in files in the directory.
+In watch mode the directory is then watched for new or changed files.
+
+Variables: 
+run_stats- RunStats that records the stats for each stage of the run
+directory_path- Path to the specified directory on the command line
+arg_config_file- None or a filename/path for a specified configuration file
+parameters- List of specified parameters to change
+options- Dictionary of run options that aren't configuration parameters
+configs_dict- Dictionary of configuration parameters
+gsheets_setup- Future of the google sheets setup or None
+files- List of files to read in the directory
+write_file- Output excel file that will be written to
+valid_files- List of the files that passed the prescan
+watched- sizes and modified times of the input files before the first pass
+out_write_book- Openpyxl workbook object of the output excel file or
+a GridBook in rebuild or store mode
+out_write_sheet- Openpyxl worksheet of the output excel file or
+a GridSheet in rebuild or store mode
+input_cache- InputCache of the files already added to the output file or None
+snapshot_rows- List of the rows of the output sheet from its snapshot or None
+master_store- MasterStore of the output file or None
+loaded- whether the output file was read in from the store
+master_rows- List of the rows of values in the output excel file
+part_table- PartTable mapping part numbers to the rest of the wanted data
+header_list- HeaderList of headers that are on the output excel file 
+totals_writer- TotalsWriter of the totals sheet
+"""
+
+
+def main():
+    directory_path, arg_config_file, parameters, options = args.parse_arguments()
+    run_stats = stats.RunStats(options["stats_json"], options["profile"])
+
+    with run_stats.stage("config"):
+        configs_dict = configs.make_config_dict(arg_config_file, parameters)
+
+    # check mode only reports on the files and leaves the output file alone
+    if options["check"]:
+        files, write_file = process_files.find_write_file(directory_path,
+                                                          configs_dict["out_file"])
+        files = [file for file in files if process_files.is_input_file(file, write_file)]
+        valid_files = prescan_files(directory_path, files, configs_dict, options, run_stats)
+        run_stats.save()
+        sys.exit(0 if len(valid_files) == len(files) else 1)
+
+    # google sheets is set up while the files are merged. The google
+    # libraries are slow to import so they are only imported when used
+    gsheets_setup = None
+    if configs_dict["use_gsheets"]:
+        from excelScript import gsheets
+        gsheets_setup = gsheets.start_setup(configs_dict)
+
+    with run_stats.stage("master load") as stage_record:
+        files, write_file = process_files.find_write_file(directory_path,
+                                                          configs_dict["out_file"])
+        files = [file for file in files if process_files.is_input_file(file, write_file)]
+
+        # the output sheet is made from the snapshot if the output file hasn't changed
+        snapshot_rows = None
+        if options["snapshot"]:
+            snapshot_rows = snapshot.load_snapshot(write_file, configs_dict)
+
+        # the store is read in instead of the output file once it is filled in
+        master_store = None
+        if options["store"]:
+            master_store = store.open_store(write_file, configs_dict)
+            out_write_book, out_write_sheet, loaded = store.\
+                load_book(master_store, write_file, configs_dict)
+
+        elif snapshot_rows is not None:
+            out_write_book, out_write_sheet = rebuild.make_grid_book(snapshot_rows,
+                                                                     configs_dict)
+
+        elif options["rebuild"]:
+            out_write_book, out_write_sheet = rebuild.\
+                get_valid_gridbook(write_file, configs_dict["out_sheet_name"])
+        else:
+            out_write_book, out_write_sheet = process_files.\
+                get_valid_writebook(write_file, configs_dict["out_sheet_name"])
+
+        # counts the cells written when stats are being recorded
+        out_write_book = run_stats.wrap_book(out_write_book)
+        out_write_sheet = out_write_book[configs_dict["out_sheet_name"]]
+
+        # only new or changed files are read in when using the cache.
+        # watch mode always keeps a cache in memory to find the changes in files
+        input_cache = None
+        if options["cache"]:
+            input_cache = cache.load_cache(write_file, configs_dict)
+            files = input_cache.changed_files(directory_path, files)
+
+        elif options["watch"]:
+            input_cache = cache.InputCache(cache.cache_path(write_file), None)
+
+        # the output file is only read in once and its rows are shared for the lookups
+        master_rows = snapshot_rows
+        if master_rows is None:
+            master_rows = process_files.read_master_rows(out_write_sheet)
+        part_table = process_files.create_part_table(master_rows, configs_dict)
+        header_list = excel.add_headers(master_rows, out_write_sheet, configs_dict)
+        totals_writer = excel.TotalsWriter(out_write_book, header_list, configs_dict,
+                                           options["totals"])
+        stage_record["rows"] = len(master_rows)
+
+        if master_store is not None:
+            if not loaded:
+                master_store.reset(master_rows[:configs_dict["header_row"] - 1],
+                                   header_list, part_table, configs_dict)
+            part_table.changed = {}
+
+    # the files are looked at before the first pass so watch mode picks up changes during it
+    watched = None
+    if options["watch"]:
+        watched = watch.stat_files(directory_path, write_file)
+
+    merge_files(directory_path, files, out_write_book, out_write_sheet, header_list,
+                part_table, configs_dict, options, input_cache, run_stats, master_store)
+    save_master(write_file, out_write_book, out_write_sheet, header_list,
+                part_table, configs_dict, options, input_cache, run_stats, gsheets_setup,
+                totals_writer, master_store)
+
+    if options["watch"]:
+        watch.watch(directory_path, write_file, watched,
+                    lambda changed: merge_files(directory_path, changed, out_write_book,
+                                                out_write_sheet, header_list, part_table,
+                                                configs_dict, options, input_cache,
+                                                run_stats, master_store),
+                    lambda: save_master(write_file, out_write_book, out_write_sheet,
+                                        header_list, part_table, configs_dict,
+                                        options, input_cache, run_stats,
+                                        gsheets_setup, totals_writer, master_store),
+                    options["poll_interval"], options["flush_interval"])
+
+
+"""
+Method: merge_files
+Purpose: Reads in the given files from the directory and adds
+their data to the output file. Files that can't be read in are
+outputted to the console and skipped.
+
+Parameters:
+directory_path- Path to the directory of files
+files- List of files to read in the directory
+out_write_book- Workbook object of the output excel file
+out_write_sheet- Worksheet of the output excel file
+header_list- HeaderList of headers that are on the output excel file
+part_table- PartTable mapping part numbers to the rest of the wanted data
+configs_dict- Dictionary of configuration parameters
+options- Dictionary of run options that aren't configuration parameters
+input_cache- InputCache of the files already added to the output file or None
+run_stats- RunStats that records the stats for each stage of the run
+master_store- MasterStore of the output file or None
+
+Variables:
+file_paths- Full file paths for the files in the directory 
+results- Futures holding the InputFile of each read in file
+wait- seconds spent waiting for a file to be read in before its future was given
+stage_record- dictionary of stats for the merge stage
+file_record- dictionary of stats for the current file
+in_file- InputFile of the assembly number and rows of a read in file
+add_files- InputFiles to add to the output file for a read in file
+
+Return: part_table- updated PartTable
+"""
+
+
+def merge_files(directory_path, files, out_write_book, out_write_sheet, header_list,
+                part_table, configs_dict, options, input_cache, run_stats, master_store):
+
+    # files that aren't valid are left out before any of them are fully read in
+    if options["prescan"]:
+        files = prescan_files(directory_path, files, configs_dict, options, run_stats)
+
+    file_paths = [os.path.abspath(os.path.join(directory_path, file)) for file in files]
+    results = readers.read_input_files(file_paths, configs_dict,
+                                       options["jobs"], options["reader"])
+
+    with run_stats.stage("merge", profile=True) as stage_record:
+        # files are merged in the same order no matter how many jobs read them in
+        for (file, file_path, result), wait in run_stats.timed(zip(files, file_paths, results)):
+            with run_stats.file(file) as file_record:
+                try:
+                    start = time.perf_counter()
+                    in_file = result.result()
+                    file_record["read_seconds"] = wait + time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    in_file.rows = run_stats.count_rows(in_file.rows, file_record)
+                    add_files = [in_file]
+
+                    if input_cache is not None:
+                        add_files = input_cache.delta_files(file, in_file,
+                                                            configs_dict["add_mode"])
+
+                    for add_file in add_files:
+                        utils.add_assembly_num(header_list, out_write_sheet,
+                                               add_file.assembly_num, configs_dict)
+                        part_table = excel.update_master(add_file, out_write_sheet,
+                                                         header_list, part_table,
+                                                         configs_dict, file)
+
+                    if input_cache is not None:
+                        input_cache.record(file, file_path, in_file)
+
+                    # each file's changes are written to the store in one transaction
+                    if master_store is not None:
+                        master_store.write_changes(part_table, header_list, configs_dict)
+
+                    file_record["merge_seconds"] = time.perf_counter() - start
+                    file_record["lines_skipped"] = in_file.lines_skipped
+                    stage_record["rows"] += file_record["rows"]
+
+                except (XLRDError, RuntimeError, IndexError) as error:
+                    print(file_error(error, file))
+                    continue
+
+    return part_table
+
+
+"""
+Method: prescan_files
+Purpose: Checks the first rows of every file before any of them are
+fully read in. The files that aren't valid are outputted to the
+console together and left out.
+
+Parameters:
+directory_path- Path to the directory of files
+files- List of files to check in the directory
+configs_dict- Dictionary of configuration parameters
+options- Dictionary of run options that aren't configuration parameters
+run_stats- RunStats that records the stats for each stage of the run
+
+Variables:
+file_paths- Full file paths for the files in the directory
+errors- exception each file was rejected with or None
+valid_files- List of the files that passed the prescan
+watched- sizes and modified times of the input files before the first pass
+rejected- List of (file, exception) tuples of the files that didn't pass
+
+Return: valid_files- List of the files that passed the prescan
+watched- sizes and modified times of the input files before the first pass
+"""
+
+
+def prescan_files(directory_path, files, configs_dict, options, run_stats):
+    with run_stats.stage("prescan") as stage_record:
+        file_paths = [os.path.abspath(os.path.join(directory_path, file)) for file in files]
+        errors = readers.prescan_files(file_paths, configs_dict,
+                                       options["jobs"], options["reader"])
+
+        valid_files = [file for file, error in zip(files, errors) if error is None]
+        rejected = [(file, error) for file, error in zip(files, errors) if error is not None]
+        stage_record["rows"] = len(files)
+
+    if options["check"]:
+        print("Checked {0} files: {1} valid, {2} not valid"
+              .format(len(files), len(valid_files), len(rejected)))
+
+    elif rejected:
+        print("{0} of {1} files weren't valid and won't be read in:"
+              .format(len(rejected), len(files)))
+
+    for file, error in rejected:
+        print(file_error(error, file))
+
+    return valid_files
+
+
+"""
+Method: file_error
+Purpose: Makes the message outputted to the console for a file
+that couldn't be read in.
+
+Parameters:
+error- exception the file was rejected with
+file- name of the file
+
+Return: the error message
+"""
+
+
+def file_error(error, file):
+    if isinstance(error, XLRDError):
+        return "Error: {0} was not read in since it's not a .xlsx file".format(file)
+
+    if isinstance(error, IndexError):
+        return ("Error: config parameter {0} defines an out of "
+                "range column for file {1}".format(error, file))
+
+    return str(error).format(file)
+
+
+"""
+Method: save_master
+Purpose: Writes the totals sheet and the remarks, sets the column
+widths, and saves the output file. Then
+saves the cache and updates google sheets if they are being used.
+With the cache the output file is saved next to itself and only put in
+place once the cache has been saved, so a run that stops in between
+never leaves an output file that the cache doesn't match.
+
+Parameters:
+write_file- Output excel file that will be written to
+out_write_book- Workbook object of the output excel file
+out_write_sheet- Worksheet of the output excel file
+header_list- HeaderList of headers that are on the output excel file
+part_table- PartTable mapping part numbers to the rest of the wanted data
+configs_dict- Dictionary of configuration parameters
+options- Dictionary of run options that aren't configuration parameters
+input_cache- InputCache of the files already added to the output file or None
+run_stats- RunStats that records the stats for each stage of the run
+gsheets_setup- Future of the google sheets setup or None
+totals_writer- TotalsWriter of the totals sheet
+master_store- MasterStore of the output file or None
+
+Variables:
+stage_record- dictionary of stats for the current stage
+title- title of the totals sheet
+output_path- path the output file is saved to
+snapshot_path- path of the snapshot of the last google sheets sync or None
+"""
+
+
+def save_master(write_file, out_write_book, out_write_sheet, header_list,
+                part_table, configs_dict, options, input_cache, run_stats, gsheets_setup,
+                totals_writer, master_store):
+
+    # the remarks are written once all of the companies are in
+    excel.write_remarks(out_write_sheet, part_table, configs_dict)
+
+    output_path = write_file
+    if options["export"] and options["cache"]:
+        output_path = cache.pending_path(write_file)
+
+    # with the store the output file is only exported when it's wanted
+    if options["export"]:
+        # the totals are written once all of the qtys are in
+        with run_stats.stage("totals") as stage_record:
+            totals_writer.flush(out_write_sheet, part_table)
+            stage_record["rows"] = len(part_table)
+
+        with run_stats.stage("save") as stage_record:
+            utils.edit_column_width(out_write_sheet, header_list, configs_dict)
+            title = configs_dict["total_sheet_name"]
+
+            # the totals sheet is only made once a part has been added
+            if title in out_write_book.sheetnames:
+                utils.edit_column_width(out_write_book[title],
+                                        configs_dict["total_sheet_headers"], configs_dict)
+            out_write_book.save(output_path)
+            stage_record["rows"] = len(part_table)
+
+    if options["cache"]:
+        with run_stats.stage("cache save"):
+            input_cache.save(output_path)
+
+            # renaming the file keeps the size and modified time the cache has
+            if output_path != write_file:
+                os.replace(output_path, write_file)
+
+    # the store notes the output file it exported so later edits to it are found
+    if options["export"] and master_store is not None:
+        master_store.record_export(write_file)
+
+    if options["export"] and options["snapshot"]:
+        with run_stats.stage("snapshot save"):
+            snapshot.save_snapshot(write_file, out_write_book, out_write_sheet, configs_dict)
+
+    if configs_dict["use_gsheets"]:
+        from excelScript import gsheets
+
+        with run_stats.stage("gsheets") as stage_record:
+            snapshot_path = None
+            if options["gsheets_diff"]:
+                snapshot_path = gsheets.snapshot_path(write_file)
+
+            gsheets.execute(part_table, header_list, configs_dict,
+                            gsheets.progress_path(write_file), snapshot_path=snapshot_path,
+                            setup=gsheets_setup)
+            stage_record["rows"] = len(part_table)
+
+    run_stats.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+File: parts.py
+Author: Kyle Fullerton
+Purpose: File that includes the table of parts that are in the output
+excel spreadsheet.
+"""
+
+
+"""
+Class: PartRow
+Purpose: Holds the data for one part in the output spreadsheet.
+
+Attributes:
+row- row number of the part in the output spreadsheet
+info- list of values in the columns before the qty columns.
+Index 0 is the part number.
+qtys- list of qtys indexed by assembly. The assembly index is the
+header column minus the columns before the qty columns. Assemblies
+the part isn't used in are empty strings.
+remarks- dictionary of the companies in the remarks column used as an
+ordered set, or None until a company is first added
+"""
+
+
+class PartRow:
+    __slots__ = ("row", "info", "qtys", "remarks")
+
+    def __init__(self, row, info, qtys):
+        self.row = row
+        self.info = info
+        self.qtys = qtys
+        self.remarks = None
+
+    def get_qty(self, assembly):
+        if assembly < len(self.qtys):
+            return self.qtys[assembly]
+
+        return ""
+
+    def set_qty(self, assembly, qty):
+        if assembly >= len(self.qtys):
+            self.qtys.extend([""] * (assembly - len(self.qtys) + 1))
+
+        self.qtys[assembly] = qty
+
+    """
+    Method: add_remark
+    Purpose: Adds a company to the remarks of the part if it isn't
+    already there. The first time, the companies are split out of the
+    "/" joined remarks text the part started with.
+
+    Parameters:
+    index- index of the remarks in info
+    company- company to add
+
+    Return: True if the company was added
+    """
+
+    def add_remark(self, index, company):
+        if self.remarks is None:
+            self.remarks = dict.fromkeys(remark for remark in str(self.info[index]).split("/")
+                                         if remark != "")
+
+        if company == "" or company in self.remarks:
+            return False
+
+        self.remarks[company] = None
+        return True
+
+    """
+    Method: remarks_text
+    Purpose: Joins the companies in the remarks together with "/".
+
+    Return: remarks text of the part
+    """
+
+    def remarks_text(self):
+        return "/".join(self.remarks)
+
+
+"""
+Class: PartRecord
+Purpose: Holds the data for one part from one input file once the rows
+of the file have been aggregated.
+
+Attributes:
+info- list of values of the first row of the part without its qty
+qty- qty of the part for the file's assembly
+companies- dictionary of the companies of every row of the part used
+as an ordered set
+"""
+
+
+class PartRecord:
+    __slots__ = ("info", "qty", "companies")
+
+    def __init__(self, info, qty):
+        self.info = info
+        self.qty = qty
+        self.companies = {}
+
+
+"""
+Class: PartTable
+Purpose: Maps part numbers to their PartRow. New parts are given the
+next row number after the last part in the output spreadsheet.
+
+Attributes:
+parts- dictionary of part number mapped to PartRow
+first_row- row number of the first part in the output spreadsheet
+changed_remarks- dictionary of row number mapped to the PartRows whose
+remarks have changed since they were last written
+changed- dictionary of part number mapped to the PartRows that have
+changed since they were last written to the store, or None when
+changes aren't being tracked
+"""
+
+
+class PartTable:
+    def __init__(self, first_row):
+        self.parts = {}
+        self.first_row = first_row
+        self.changed_remarks = {}
+        self.changed = None
+
+    def __len__(self):
+        return len(self.parts)
+
+    def __contains__(self, part_num):
+        return part_num in self.parts
+
+    def __getitem__(self, part_num):
+        return self.parts[part_num]
+
+    def items(self):
+        return self.parts.items()
+
+    def add(self, part_num, info, qtys=None, row=None):
+        if row is None:
+            row = self.first_row + len(self.parts)
+
+        part_row = PartRow(row, info, [] if qtys is None else qtys)
+        self.parts[part_num] = part_row
+
+        return part_row
+
+
+"""
+Class: HeaderList
+Purpose: Keeps the ordered list of headers for the output spreadsheet
+along with a dictionary of header mapped to its column index, so the
+column of an assembly can be found without searching the list.
+
+Attributes:
+headers- list of header values in column order
+columns- dictionary of header mapped to its column index
+"""
+
+
+class HeaderList:
+    def __init__(self, headers):
+        self.headers = []
+        self.columns = {}
+
+        for header in headers:
+            self.append(header)
+
+    def __len__(self):
+        return len(self.headers)
+
+    def __iter__(self):
+        return iter(self.headers)
+
+    def __getitem__(self, index):
+        return self.headers[index]
+
+    def __contains__(self, header):
+        return header in self.columns
+
+    def index(self, header):
+        try:
+            return self.columns[header]
+
+        except KeyError:
+            raise ValueError("{0} is not in the headers".format(header))
+
+    def append(self, header):
+        # the first column of a repeated header is the one that is used
+        if header not in self.columns:
+            self.columns[header] = len(self.headers)
+
+        self.headers.append(header)
@@ -0,0 +1,470 @@
+"""
+File: readers.py
+Author: Kyle Fullerton
+Purpose: File that includes the reader backends used to read in the
+input excel files. Every backend returns an InputFile so the rest of
+the program doesn't need to know how a file was read in.
+"""
+
+import openpyxl
+import sys
+import xlrd
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from excelScript import excel, process_files, utils
+from itertools import chain, repeat
+from openpyxl.utils.exceptions import InvalidFileException
+from xlrd.biffh import XLRDError
+from zipfile import BadZipFile
+
+
+"""
+Class: InputFile
+Purpose: Holds the data read in from an input excel file.
+
+Attributes:
+assembly_num- assembly number for the read in excel sheet
+rows- iterable of row tuples with the wanted data
+lines_skipped- number of rows that didn't have all of the needed data.
+For a streamed file this is only complete once rows has been looped through.
+"""
+
+
+class InputFile:
+    __slots__ = ("assembly_num", "rows", "lines_skipped")
+
+    def __init__(self, assembly_num, rows, lines_skipped=0):
+        self.assembly_num = assembly_num
+        self.rows = rows
+        self.lines_skipped = lines_skipped
+
+
+"""
+Method: read_xlrd_file
+Purpose: Reads in a whole input excel file with XLRD, validates it,
+and then pulls the wanted rows from it.
+
+Parameters:
+file_path- path to the file that will be read in
+configs- dictionary of configuration parameters
+
+Variables:
+read_sheet- XLRD worksheet object from the read excel file
+rows- list of row tuples with the wanted data
+lines_skipped- number of rows that didn't have all of the needed data
+
+Return: an InputFile of the read in data
+"""
+
+
+def read_xlrd_file(file_path, configs):
+    read_book, read_sheet = process_files.get_valid_readbook(file_path, configs)
+    assembly_num = utils.get_assembly_num(read_sheet, configs)
+    rows, lines_skipped = excel.pull_rows(read_sheet, configs)
+
+    return InputFile(assembly_num, rows, lines_skipped)
+
+
+"""
+Method: read_stream_file
+Purpose: Opens an input excel file with Openpyxl in read only mode
+and reads just the first rows of the first sheet to validate it and
+get the assembly number. The data rows are then streamed from the
+file as they are looped through so memory stays flat no matter
+the size of the sheet.
+
+Parameters:
+file_path- path to the file that will be read in
+configs- dictionary of configuration parameters
+
+Variables:
+read_book- Openpyxl read only workbook object
+head_rows- the first rows of the sheet needed for validation
+sheet_rows- iterator over the rest of the value tuples of the sheet
+assembly_num- assembly number for the read in excel sheet
+in_file- InputFile of the read in data
+
+Return: an InputFile whose rows are streamed from the file
+"""
+
+
+def read_stream_file(file_path, configs):
+    read_book, head_rows, sheet_rows, assembly_num = open_stream_file(file_path, configs)
+
+    in_file = InputFile(assembly_num, None)
+    in_file.rows = stream_rows(in_file, head_rows, sheet_rows, read_book, configs)
+
+    return in_file
+
+
+"""
+Method: open_stream_file
+Purpose: Opens an input excel file with Openpyxl in read only mode
+and reads just the first rows of the first sheet to validate it and
+get the assembly number. If the file isn't valid it is closed and
+an exception is raised.
+
+Parameters:
+file_path- path to the file that will be read in
+configs- dictionary of configuration parameters
+
+Variables:
+read_book- Openpyxl read only workbook object
+read_sheet- first worksheet of the workbook
+sheet_rows- iterator over the value tuples of the sheet
+head_rows- the first rows of the sheet needed for validation
+assembly_num- assembly number for the read in excel sheet
+
+Returns:
+read_book- Openpyxl read only workbook object
+head_rows- the first rows of the sheet
+sheet_rows- iterator over the rest of the value tuples of the sheet
+assembly_num- assembly number for the read in excel sheet
+"""
+
+
+def open_stream_file(file_path, configs):
+    try:
+        read_book = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+
+    except (InvalidFileException, BadZipFile, KeyError):
+        raise RuntimeError("Error: {0} was not read in since it's not a .xlsx file")
+
+    try:
+        read_sheet = read_book.worksheets[0]
+
+        # Check first sheet name
+        if read_sheet.title != configs["in_sheet_name"]:
+            raise RuntimeError("Error: {0} doesn't have the specified first sheet name")
+
+        sheet_rows = (utils.xlrd_values(row) for row in read_sheet.iter_rows(values_only=True))
+        head_rows = read_head_rows(sheet_rows, configs)
+        process_files.check_head_rows(head_rows, configs)
+        assembly_num = check_head_columns(head_rows, configs)
+
+    except (RuntimeError, IndexError):
+        read_book.close()
+        raise
+
+    return read_book, head_rows, sheet_rows, assembly_num
+
+
+"""
+Method: check_head_columns
+Purpose: Checks that the assembly number and the part number column
+are in range of the first rows of a sheet.
+
+Parameters:
+head_rows- list of the first rows of the sheet
+configs- dictionary of configuration parameters
+
+Variables:
+assembly_num- assembly number for the read in excel sheet
+column_num- index of the part number column
+
+Return: assembly_num- assembly number for the read in excel sheet
+"""
+
+
+def check_head_columns(head_rows, configs):
+    try:
+        assembly_num = head_rows[configs["part_num_row"] - 1][configs["part_num_column"] - 1]
+
+    except IndexError:
+        print("Error: config parameter {0} or {1} defines an out of range row/column"
+              .format("'part_num_row'", "'part_num_column'"))
+        sys.exit(1)
+
+    column_num = utils.get_column_num(configs["serial_num_column"])
+    if column_num >= max((len(row) for row in head_rows), default=0):
+        raise IndexError("'serial_num_column'")
+
+    return assembly_num
+
+
+"""
+Method: read_head_rows
+Purpose: Reads in the rows at the top of a sheet that are needed
+to validate it and read its assembly number.
+
+Parameters:
+sheet_rows- iterator over the rows of the sheet
+configs- dictionary of configuration parameters
+
+Variable: head_rows- list of the first rows of the sheet
+
+Return: head_rows- list of the first rows of the sheet
+"""
+
+
+def read_head_rows(sheet_rows, configs):
+    head_rows = []
+
+    for row in sheet_rows:
+        head_rows.append(row)
+
+        if len(head_rows) == process_files.head_size(configs):
+            break
+
+    return head_rows
+
+
+"""
+Method: stream_rows
+Purpose: Generator that loops through the rest of the sheet from where
+we care about the data. Rows that don't have all of the needed data
+are counted on the InputFile and skipped. The workbook is closed once
+the end of the sheet is reached.
+
+Parameters:
+in_file- InputFile that the skipped lines are counted on
+head_rows- rows already read in from the top of the sheet
+sheet_rows- iterator over the rest of the rows of the sheet
+read_book- Openpyxl read only workbook object
+configs- dictionary of configuration parameters
+
+Variables:
+start- index of the first row of wanted data
+check_columns- column indexes that must have data
+wanted_columns- column indexes of the wanted data
+row_num- index of the current row in the sheet
+row_data- all of the wanted data in the current row
+
+Yields: row tuples with the wanted data
+"""
+
+
+def stream_rows(in_file, head_rows, sheet_rows, read_book, configs):
+    start = configs["data_start"] - 1
+    check_columns = [column - 1 for column in configs["check_columns"]]
+    wanted_columns = [int(column) - 1 for column in configs["wanted_columns"]]
+
+    try:
+        for row_num, row in enumerate(chain(head_rows, sheet_rows)):
+            if row_num < start:
+                continue
+
+            row_data = pull_row(row, check_columns, wanted_columns)
+
+            # got a row_data with not all of the input needed
+            if row_data is None:
+                in_file.lines_skipped += 1
+                continue
+
+            yield row_data
+
+    finally:
+        read_book.close()
+
+
+"""
+Method: pull_row
+Purpose: Checks that all of the specified columns of a row have
+data. Then creates a tuple of the data from the wanted columns.
+Wanted columns that are out of range are left out.
+
+Parameters:
+row- tuple of values for a row of the sheet
+check_columns- column indexes that must have data
+wanted_columns- column indexes of the wanted data
+
+Return: a tuple of the wanted data or None if the row
+doesn't have all of the needed data
+"""
+
+
+def pull_row(row, check_columns, wanted_columns):
+    for column in check_columns:
+        if column >= len(row) or row[column] == "":
+            return None
+
+    row_data = tuple(row[column] for column in wanted_columns if column < len(row))
+
+    if len(row_data) == 0:
+        return None
+
+    return row_data
+
+
+"""
+Method: prescan_xlrd_file
+Purpose: Checks an input excel file the same way read_xlrd_file does
+without pulling its rows. The workbook is opened on demand so only
+the first sheet is loaded.
+
+Parameters:
+file_path- path to the file that will be checked
+configs- dictionary of configuration parameters
+
+Variables:
+read_book- XLRD workbook object opened on demand
+read_sheet- first worksheet of the workbook
+head_rows- the first rows of the sheet needed for validation
+"""
+
+
+def prescan_xlrd_file(file_path, configs):
+    read_book = xlrd.open_workbook(file_path, on_demand=True)
+
+    try:
+        # Check first sheet name
+        if read_book.sheet_names()[0] != configs["in_sheet_name"]:
+            raise RuntimeError("Error: {0} doesn't have the specified first sheet name")
+
+        read_sheet = read_book.sheet_by_index(0)
+        head_rows = [read_sheet.row_values(row) for row in
+                     range(min(read_sheet.nrows, process_files.head_size(configs)))]
+        process_files.check_head_rows(head_rows, configs)
+
+        column_num = utils.get_column_num(configs["serial_num_column"])
+        if column_num >= read_sheet.ncols:
+            raise IndexError("'serial_num_column'")
+
+    finally:
+        read_book.release_resources()
+
+
+"""
+Method: prescan_stream_file
+Purpose: Checks an input excel file the same way read_stream_file does
+by reading in just the first rows of its first sheet.
+
+Parameters:
+file_path- path to the file that will be checked
+configs- dictionary of configuration parameters
+"""
+
+
+def prescan_stream_file(file_path, configs):
+    open_stream_file(file_path, configs)[0].close()
+
+
+# maps the reader names that can be given on the command line to their functions
+READERS = {"xlrd": read_xlrd_file,
+           "stream": read_stream_file}
+
+# maps the reader names to functions that check a file the same way without reading its rows
+PRESCANNERS = {"xlrd": prescan_xlrd_file,
+               "stream": prescan_stream_file}
+
+
+"""
+Method: read_input_file
+Purpose: Reads in an input excel file with the specified reader.
+If the rows need to be sent to another process then any streamed
+rows are read into a list.
+
+Parameters:
+file_path- path to the file that will be read in
+configs- dictionary of configuration parameters
+reader- name of the reader in READERS
+materialize- whether the rows need to be put into a list
+
+Variable: in_file- InputFile of the read in data
+
+Return: in_file- InputFile of the read in data
+"""
+
+
+def read_input_file(file_path, configs, reader, materialize=False):
+    in_file = READERS[reader](file_path, configs)
+
+    if materialize:
+        in_file.rows = list(in_file.rows)
+
+    return in_file
+
+
+"""
+Method: read_input_files
+Purpose: Reads in every input file with read_input_file and yields
+a future per file in the same order as the given file paths.
+If jobs is greater than one the files are read in by a pool of
+processes, otherwise each file is read in when its future is reached.
+Errors from reading a file are stored in its future so the caller
+can handle them per file.
+
+Parameters:
+file_paths- list of paths to the files that will be read in
+configs- dictionary of configuration parameters
+jobs- number of processes used to read in the files
+reader- name of the reader in READERS
+
+Variables:
+future- Future object holding the InputFile of a file
+executor- ProcessPoolExecutor object
+futures- list of futures in the same order as file_paths
+"""
+
+
+def read_input_files(file_paths, configs, jobs, reader):
+    if jobs <= 1:
+        for file_path in file_paths:
+            future = Future()
+
+            try:
+                future.set_result(read_input_file(file_path, configs, reader))
+
+            except (XLRDError, RuntimeError, IndexError) as error:
+                future.set_exception(error)
+
+            yield future
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(read_input_file, file_path, configs, reader, True)
+                   for file_path in file_paths]
+
+        for future in futures:
+            yield future
+
+
+"""
+Method: prescan_file
+Purpose: Checks an input excel file with the prescanner of the specified
+reader. The error of a file that isn't valid is returned instead of
+raised so every file can be reported on together.
+
+Parameters:
+file_path- path to the file that will be checked
+configs- dictionary of configuration parameters
+reader- name of the reader in PRESCANNERS
+
+Return: the exception the file was rejected with or None if it's valid
+"""
+
+
+def prescan_file(file_path, configs, reader):
+    try:
+        PRESCANNERS[reader](file_path, configs)
+
+    except (XLRDError, RuntimeError, IndexError) as error:
+        return error
+
+    return None
+
+
+"""
+Method: prescan_files
+Purpose: Checks every input file with prescan_file before any of them
+are fully read in. If jobs is greater than one the files are checked
+by a pool of processes.
+
+Parameters:
+file_paths- list of paths to the files that will be checked
+configs- dictionary of configuration parameters
+jobs- number of processes used to check the files
+reader- name of the reader in PRESCANNERS
+
+Variable: executor- ProcessPoolExecutor object
+
+Return: list of the exception or None for each file in the same order as file_paths
+"""
+
+
+def prescan_files(file_paths, configs, jobs, reader):
+    if jobs <= 1 or len(file_paths) <= 1:
+        return [prescan_file(file_path, configs, reader) for file_path in file_paths]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(prescan_file, file_paths, repeat(configs), repeat(reader)))
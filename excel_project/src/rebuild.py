@@ -0,0 +1,464 @@
+"""
+File: rebuild.py
+Author: Kyle Fullerton
+Purpose: File that includes the in memory workbook used by rebuild mode.
+The output excel file is read in once as values and styles, all of the
+updates are made in memory, and then the whole file is written back out
+with a write only Openpyxl workbook in a single pass.
+"""
+
+import openpyxl
+import os
+import sys
+
+from collections import defaultdict
+from excelScript import utils
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils.exceptions import InvalidFileException
+from zipfile import BadZipFile
+
+
+STYLE_NAMES = ("font", "fill", "border", "alignment", "number_format")
+
+"""
+Class: GridStyle
+Purpose: Holds the styles of a cell. Styles that are None are left as
+the default when the cell is written.
+"""
+
+
+class GridStyle:
+    __slots__ = STYLE_NAMES
+
+    def __init__(self):
+        self.font = None
+        self.fill = None
+        self.border = None
+        self.alignment = None
+        self.number_format = None
+
+    def has_style(self):
+        for name in STYLE_NAMES:
+            if getattr(self, name) is not None:
+                return True
+
+        return False
+
+
+"""
+Method: style_property
+Purpose: Makes a property of a GridCell that reads and writes one of
+the styles of its cell. A GridStyle is only made for the cell once one
+of its styles is set.
+
+Parameter: name- name of the style
+
+Return: property object
+"""
+
+
+def style_property(name):
+    def get_style(grid_cell):
+        grid_style = grid_cell.sheet.styles.get(grid_cell.row, {}).get(grid_cell.column)
+
+        return None if grid_style is None else getattr(grid_style, name)
+
+    def set_style(grid_cell, value):
+        row_styles = grid_cell.sheet.styles.setdefault(grid_cell.row, {})
+        setattr(row_styles.setdefault(grid_cell.column, GridStyle()), name, value)
+
+    return property(get_style, set_style)
+
+
+"""
+Class: GridCell
+Purpose: Gives a cell of a GridSheet the value and style attributes of
+an Openpyxl cell. It only points at the cell, so it isn't kept once it
+has been used and the sheet holds nothing for each cell but its value.
+
+Attributes:
+sheet- GridSheet the cell is in
+row- row number of the cell
+column- column number of the cell
+"""
+
+
+class GridCell:
+    __slots__ = ("sheet", "row", "column")
+
+    def __init__(self, sheet, row, column):
+        self.sheet = sheet
+        self.row = row
+        self.column = column
+
+    @property
+    def value(self):
+        return self.sheet.rows[self.row][self.column - 1]
+
+    @value.setter
+    def value(self, value):
+        self.sheet.rows[self.row][self.column - 1] = value
+
+    font = style_property("font")
+    fill = style_property("fill")
+    border = style_property("border")
+    alignment = style_property("alignment")
+    number_format = style_property("number_format")
+
+
+"""
+Class: GridDimension
+Purpose: Holds the width of a column.
+"""
+
+
+class GridDimension:
+    __slots__ = ("width",)
+
+    def __init__(self):
+        self.width = None
+
+
+"""
+Class: GridSheet
+Purpose: In memory worksheet that supports the parts of the Openpyxl
+worksheet used by the program (cell, append, iter_rows, max_row,
+and column_dimensions). Rows are stored as lists of values, and the
+styles of the few cells that have them are stored apart from the
+values, so a cell costs no more than its value.
+It also lists the cells that have styles with styled_cells.
+
+Attributes:
+title- title of the worksheet
+rows- dictionary of row number to the list of values in that row
+styles- dictionary of row number to a dictionary of column number
+mapped to the GridStyle of the cell
+max_row- last row that a cell has been used in
+column_dimensions- dictionary of column letter to GridDimension
+"""
+
+
+class GridSheet:
+    def __init__(self, title):
+        self.title = title
+        self.rows = {}
+        self.styles = {}
+        self.max_row = 0
+        self.column_dimensions = defaultdict(GridDimension)
+
+    def cell(self, row, column):
+        if row > self.max_row:
+            self.max_row = row
+
+        values = self.rows.setdefault(row, [])
+        if len(values) < column:
+            values.extend([None] * (column - len(values)))
+
+        return GridCell(self, row, column)
+
+    def append(self, values):
+        self.max_row += 1
+        self.rows[self.max_row] = list(values)
+
+    def iter_rows(self, values_only=True):
+        max_column = max((len(values) for values in self.rows.values()), default=0)
+
+        for row in range(1, self.max_row + 1):
+            values = self.rows.get(row, [])
+            yield tuple(values) + (None,) * (max_column - len(values))
+
+    def styled_cells(self):
+        for row, row_styles in self.styles.items():
+            for column, grid_style in row_styles.items():
+                if grid_style.has_style():
+                    yield row, column
+
+
+"""
+Class: GridBook
+Purpose: In memory workbook that supports the parts of the Openpyxl
+workbook used by the program (sheetnames, create_sheet, indexing by
+title, and save).
+
+Attribute: sheets- dictionary of sheet title to GridSheet in sheet order
+"""
+
+
+class GridBook:
+    def __init__(self):
+        self.sheets = {}
+
+    @property
+    def sheetnames(self):
+        return list(self.sheets)
+
+    def create_sheet(self, title):
+        self.sheets[title] = GridSheet(title)
+        return self.sheets[title]
+
+    def __getitem__(self, title):
+        return self.sheets[title]
+
+    def save(self, file_path):
+        save_grid_book(self, file_path)
+
+
+"""
+Method: get_valid_gridbook
+Purpose: Reads the output file into a GridBook. Various error messages
+are printed should an error occur with reading the workbook
+or finding the worksheet.
+
+Parameters:
+file_path- file that will be written to
+sheet_title- specified sheet title in the workbook
+
+Variables:
+out_write_book- GridBook of the write excel file
+out_write_sheet- GridSheet from the write excel file
+
+Returns- out_write_book- GridBook of the write excel file
+out_write_sheet- GridSheet from the write excel file
+"""
+
+
+def get_valid_gridbook(file_path, sheet_title):
+    file = os.path.basename(file_path)
+
+    try:
+        out_write_book = load_grid_book(file_path)
+
+    except (InvalidFileException, BadZipFile):
+        print("Error: file from {0} is not an .xslx file".format(file))
+        sys.exit(1)
+
+    except FileNotFoundError:
+        print("Error: file {0} cannot be found from path {1}".format(file, file_path))
+        sys.exit(1)
+
+    try:
+        out_write_sheet = out_write_book[sheet_title]
+
+    except KeyError:
+        print("Error: sheet {0} doesn't exist in the output file".format(sheet_title))
+        sys.exit(1)
+
+    return out_write_book, out_write_sheet
+
+
+"""
+Method: make_grid_book
+Purpose: Makes a GridBook of the output file from its rows of values
+without reading the output file. The headers are given the header
+style and the remarks of parts with more than one company are wrapped.
+No other styles are kept.
+
+Parameters:
+master_rows- list of the rows of values of the output sheet
+configs- dictionary of configuration parameters
+
+Variables:
+grid_book- GridBook of the output file
+grid_sheet- GridSheet of the output sheet
+remarks- column of the remarks
+cell- remarks cell of the current row
+
+Returns:
+grid_book- GridBook of the output file
+grid_sheet- GridSheet of the output sheet
+"""
+
+
+def make_grid_book(master_rows, configs):
+    grid_book = GridBook()
+    grid_sheet = grid_book.create_sheet(configs["out_sheet_name"])
+
+    for row_num, row in enumerate(master_rows, 1):
+        grid_sheet.append([None if value == "" else value for value in row])
+
+        if row_num == configs["header_row"]:
+            for column, header in enumerate(row, 1):
+                if header != "":
+                    utils.add_header(grid_sheet.cell(row_num, column), header)
+
+    remarks = configs["out_remarks_index"]
+    for row_num in range(configs["header_row"] + 1, len(master_rows) + 1):
+        cell = grid_sheet.cell(row_num, remarks)
+        if "/" in str(cell.value):
+            utils.set_style(cell, "BOM Remarks")
+
+    return grid_book, grid_sheet
+
+
+"""
+Method: can_make_grid_book
+Purpose: Checks if make_grid_book can make the output file again from
+its values without losing anything. Only the output sheet and the totals
+sheet are made, with no sheet settings like frozen panes or merged
+cells, and only the headers and the remarks are styled. GridSheets
+don't have sheet settings so only their styles are checked.
+
+Parameters:
+out_write_book- workbook of the output file
+out_write_sheet- worksheet of the output file
+configs- dictionary of configuration parameters
+
+Variables:
+sheet- current worksheet
+styled- iterable of (row, column) of the cells with styles
+
+Return: True if the output file can be made again from its values
+"""
+
+
+def can_make_grid_book(out_write_book, out_write_sheet, configs):
+    if not set(out_write_book.sheetnames) <= {configs["out_sheet_name"],
+                                              configs["total_sheet_name"]}:
+        return False
+
+    for title in out_write_book.sheetnames:
+        sheet = out_write_book[title]
+        if hasattr(sheet, "freeze_panes") and (
+                sheet.freeze_panes is not None or sheet.merged_cells.ranges or
+                len(sheet.conditional_formatting) or sheet.data_validations.dataValidation or
+                sheet.auto_filter.ref is not None):
+            return False
+
+    if hasattr(out_write_sheet, "styled_cells"):
+        styled = out_write_sheet.styled_cells()
+    else:
+        styled = ((cell.row, cell.column) for row in out_write_sheet.iter_rows()
+                  for cell in row if cell.has_style)
+
+    for row, column in styled:
+        if row < configs["header_row"] or \
+                row > configs["header_row"] and column != configs["out_remarks_index"]:
+            return False
+
+    return True
+
+
+"""
+Method: load_grid_book
+Purpose: Reads every sheet of an excel file in read only mode and
+copies the values and styles of the used cells into a GridBook.
+Empty cells at the end of a row that don't have a style are left off.
+
+Parameter: file_path- path to the excel file
+
+Variables:
+read_book- Openpyxl read only workbook object
+grid_book- GridBook of the excel file
+grid_sheet- GridSheet being filled in
+values- values of the current row
+row_styles- GridStyles of the current row by column
+used- number of cells in the current row up to the last used one
+grid_style- GridStyle being filled in
+
+Return: grid_book- GridBook of the excel file
+"""
+
+
+def load_grid_book(file_path):
+    read_book = openpyxl.load_workbook(file_path, read_only=True)
+    grid_book = GridBook()
+
+    try:
+        for read_sheet in read_book.worksheets:
+            grid_sheet = grid_book.create_sheet(read_sheet.title)
+
+            for row_num, row in enumerate(read_sheet.iter_rows(), 1):
+                values, row_styles, used = [], {}, 0
+
+                for column, cell in enumerate(row, 1):
+                    values.append(cell.value)
+
+                    if getattr(cell, "has_style", False):
+                        grid_style = row_styles[column] = GridStyle()
+                        for name in STYLE_NAMES:
+                            setattr(grid_style, name, getattr(cell, name))
+
+                    if cell.value is not None or column in row_styles:
+                        used = column
+
+                if used > 0:
+                    grid_sheet.rows[row_num] = values[:used]
+                    grid_sheet.max_row = row_num
+                if row_styles:
+                    grid_sheet.styles[row_num] = row_styles
+
+    finally:
+        read_book.close()
+
+    return grid_book
+
+
+"""
+Method: save_grid_book
+Purpose: Writes a GridBook to an excel file with a write only Openpyxl
+workbook. Each sheet is written in a single pass from its first row
+to its last row.
+
+Parameters:
+grid_book- GridBook to write out
+file_path- path of the excel file to write
+
+Variables:
+write_book- Openpyxl write only workbook object
+write_sheet- Openpyxl write only worksheet object
+values- values or WriteOnlyCells for the current row
+"""
+
+
+def save_grid_book(grid_book, file_path):
+    write_book = openpyxl.Workbook(write_only=True)
+
+    for grid_sheet in grid_book.sheets.values():
+        write_sheet = write_book.create_sheet(grid_sheet.title)
+
+        for letter, dimension in grid_sheet.column_dimensions.items():
+            if dimension.width is not None:
+                write_sheet.column_dimensions[letter].width = dimension.width
+
+        for row_num in range(1, grid_sheet.max_row + 1):
+            values = grid_sheet.rows.get(row_num, [])
+
+            if row_num in grid_sheet.styles:
+                values = list(values)
+                for column, grid_style in grid_sheet.styles[row_num].items():
+                    if column <= len(values):
+                        values[column - 1] = write_cell(write_sheet, values[column - 1],
+                                                        grid_style)
+
+            write_sheet.append(values)
+
+    write_book.save(file_path)
+
+
+"""
+Method: write_cell
+Purpose: Converts a value and its GridStyle into the value that is
+appended to a write only worksheet. Cells with styles become
+WriteOnlyCells.
+
+Parameters:
+write_sheet- Openpyxl write only worksheet object
+value- value of the cell
+grid_style- GridStyle of the cell
+
+Variable: cell- WriteOnlyCell with the value and styles of the cell
+
+Return: the value or WriteOnlyCell for the cell
+"""
+
+
+def write_cell(write_sheet, value, grid_style):
+    if not grid_style.has_style():
+        return value
+
+    cell = WriteOnlyCell(write_sheet, value=value)
+    for name in STYLE_NAMES:
+        if getattr(grid_style, name) is not None:
+            setattr(cell, name, getattr(grid_style, name))
+
+    return cell
@@ -0,0 +1,260 @@
+"""
+File: snapshot.py
+Author: Kyle Fullerton
+Purpose: File that includes the binary snapshot of the output sheet.
+The snapshot is saved next to the output file every time the output
+file is saved. If the output file hasn't changed since then, the next
+run reads the rows of the output sheet from the snapshot with mmap
+instead of unzipping and parsing the XML of the output file. Every cell
+is still decoded, so loading the snapshot takes time in proportion to
+the number of cells, just with much less work per cell.
+
+The output sheet is made again from the values in the snapshot, so a
+snapshot is only kept for output files that rebuild.make_grid_book can
+make again without losing anything. Column widths are set again from
+the configuration parameters when the output file is saved.
+
+Layout (all little endian):
+header- magic, config key, size and modified time of the output file,
+number of strings, number of rows, and number of columns
+string offsets- (number of strings + 1) uint32 offsets into the string pool
+string pool- every distinct string of the sheet in utf-8
+types- one byte per cell (0 empty, 1 number, 2 string, 3 boolean)
+numbers- one double per cell. Strings hold their index in the pool.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+
+from excelScript import process_files, rebuild
+
+
+MAGIC = b"BOMSNAP1"
+
+# magic, sha1 of the configuration parameters, output file size,
+# output file modified time, strings, rows, and columns
+HEADER = struct.Struct("<8s20sqqIII")
+
+EMPTY, NUMBER, STRING, BOOLEAN = range(4)
+
+"""
+Method: snapshot_path
+Purpose: Gets the path of the snapshot file for an output file.
+
+Parameter: write_file- path of the output excel file
+
+Return: path of the snapshot file
+"""
+
+
+def snapshot_path(write_file):
+    return write_file + ".snap"
+
+
+"""
+Method: config_key
+Purpose: Hashes the configuration parameters so a snapshot isn't used
+with different parameters than it was saved with.
+
+Parameter: configs- dictionary of configuration parameters
+
+Return: sha1 digest of the configuration parameters
+"""
+
+
+def config_key(configs):
+    return hashlib.sha1(repr(sorted(configs.items())).encode()).digest()
+
+
+"""
+Method: save_snapshot
+Purpose: Writes the snapshot of the output sheet once the output file
+has been saved. The snapshot is only written if the output file can be
+made again from its values without losing other sheets, sheet settings,
+or styles, and if every value is a string, number, or boolean.
+The snapshot is written to a temporary file first so a snapshot that
+is cut off is never read in.
+
+Parameters:
+write_file- path of the output excel file
+out_write_book- workbook object of the output excel file
+out_write_sheet- worksheet of the output excel file
+configs- dictionary of configuration parameters
+
+Variables:
+path- path of the snapshot file
+master_rows- list of the rows of values in the output sheet
+columns- number of columns in the widest row
+strings- dictionary of string mapped to its index in the pool
+types- type of each cell
+numbers- number of each cell
+pool- utf-8 encoded strings in index order
+offsets- offsets of the strings in the pool
+stat- os.stat_result of the output file
+"""
+
+
+def save_snapshot(write_file, out_write_book, out_write_sheet, configs):
+    path = snapshot_path(write_file)
+
+    if not rebuild.can_make_grid_book(out_write_book, out_write_sheet, configs):
+        remove_snapshot(path)
+        return
+
+    master_rows = process_files.read_master_rows(out_write_sheet)
+    columns = max((len(row) for row in master_rows), default=0)
+    strings = {}
+    types = bytearray()
+    numbers = []
+
+    for row in master_rows:
+        for value in row + [""] * (columns - len(row)):
+            if type(value) is str:
+                if value == "":
+                    types.append(EMPTY)
+                    numbers.append(0.0)
+                    continue
+
+                types.append(STRING)
+                numbers.append(float(strings.setdefault(value, len(strings))))
+
+            elif type(value) is float:
+                types.append(NUMBER)
+                numbers.append(value)
+
+            elif type(value) is bool:
+                types.append(BOOLEAN)
+                numbers.append(float(value))
+
+            else:
+                # dates and other values can't be kept
+                remove_snapshot(path)
+                return
+
+    pool = [string.encode("utf-8") for string in strings]
+    offsets = [0]
+    for string in pool:
+        offsets.append(offsets[-1] + len(string))
+
+    stat = os.stat(write_file)
+
+    with open(path + ".tmp", "wb") as snapshot_file:
+        snapshot_file.write(HEADER.pack(MAGIC, config_key(configs), stat.st_size,
+                                        stat.st_mtime_ns, len(pool), len(master_rows),
+                                        columns))
+        snapshot_file.write(struct.pack("<{0}I".format(len(offsets)), *offsets))
+        snapshot_file.write(b"".join(pool))
+        snapshot_file.write(bytes(types))
+        snapshot_file.write(struct.pack("<{0}d".format(len(numbers)), *numbers))
+
+    os.replace(path + ".tmp", path)
+
+
+"""
+Method: load_snapshot
+Purpose: Reads the rows of the output sheet from its snapshot if the
+output file hasn't changed since the snapshot was saved. The snapshot
+file is mapped into memory and every cell is decoded into the rows, so
+this takes time in proportion to the number of cells.
+
+Parameters:
+write_file- path of the output excel file
+configs- dictionary of configuration parameters
+
+Variables:
+stat- os.stat_result of the output file
+snapshot_map- mmap of the snapshot file
+magic- magic bytes at the start of the file
+key- sha1 of the configuration parameters the snapshot was saved with
+size- size of the output file when the snapshot was saved
+mtime- modified time of the output file when the snapshot was saved
+string_count- number of strings in the pool
+row_count- number of rows
+columns- number of columns
+offset- position in the snapshot file
+offsets- offsets of the strings in the pool
+strings- list of the strings in the pool
+types- type of each cell
+numbers- number of each cell
+
+Return: list of the rows of values or None if the snapshot can't be used
+"""
+
+
+def load_snapshot(write_file, configs):
+    try:
+        stat = os.stat(write_file)
+
+        with open(snapshot_path(write_file), "rb") as snapshot_file, \
+                mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as snapshot_map:
+            magic, key, size, mtime, string_count, row_count, columns = \
+                HEADER.unpack_from(snapshot_map)
+
+            if magic != MAGIC or key != config_key(configs) or \
+                    size != stat.st_size or mtime != stat.st_mtime_ns:
+                return None
+
+            offset = HEADER.size
+            offsets = struct.unpack_from("<{0}I".format(string_count + 1), snapshot_map, offset)
+            offset += 4 * (string_count + 1)
+
+            strings = [snapshot_map[offset + offsets[i]:offset + offsets[i + 1]].decode("utf-8")
+                       for i in range(string_count)]
+            offset += offsets[-1]
+
+            types = snapshot_map[offset:offset + row_count * columns]
+            offset += row_count * columns
+            numbers = struct.unpack_from("<{0}d".format(row_count * columns),
+                                         snapshot_map, offset)
+
+    except (OSError, ValueError, struct.error):
+        return None
+
+    return [[cell_value(types[i], numbers[i], strings)
+             for i in range(row * columns, (row + 1) * columns)]
+            for row in range(row_count)]
+
+
+"""
+Method: cell_value
+Purpose: Gets the value of a cell from its type and number.
+
+Parameters:
+cell_type- type of the cell
+number- number of the cell
+strings- list of the strings in the pool
+
+Return: value of the cell
+"""
+
+
+def cell_value(cell_type, number, strings):
+    if cell_type == NUMBER:
+        return number
+
+    if cell_type == STRING:
+        return strings[int(number)]
+
+    if cell_type == BOOLEAN:
+        return bool(number)
+
+    return ""
+
+
+"""
+Method: remove_snapshot
+Purpose: Removes a snapshot that can't be kept up to date so an old
+one is never used.
+
+Parameter: path- path of the snapshot file
+"""
+
+
+def remove_snapshot(path):
+    try:
+        os.remove(path)
+
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,303 @@
+"""
+File: stats.py
+Author: Kyle Fullerton
+Purpose: File that is used to record how long each stage of a run takes
+along with the rows processed, cells written, and peak memory used by
+each stage and each input file. The results can be written out as JSON
+and the merge stage can be profiled with cProfile.
+"""
+
+import cProfile
+import json
+import sys
+import time
+
+from contextlib import contextmanager
+
+try:
+    import resource
+
+except ImportError:
+    # the resource module isn't available on Windows
+    resource = None
+
+
+"""
+Class: RunStats
+Purpose: Records the stats for a run. When neither a JSON path nor a
+profile path is given nothing is recorded so a normal run isn't
+slowed down.
+
+Attributes:
+json_path- path the stats are written to as JSON or None
+profile_path- path the cProfile stats of the merge stage are written to or None
+profiler- cProfile.Profile object kept across the profiled stages or None
+enabled- whether stats are being recorded
+stages- list of dictionaries of stats for each stage
+files- list of dictionaries of stats for each input file
+cells- number of cells written so far
+"""
+
+
+class RunStats:
+    def __init__(self, json_path=None, profile_path=None):
+        self.json_path = json_path
+        self.profile_path = profile_path
+        self.profiler = None
+        self.enabled = json_path is not None or profile_path is not None
+        self.stages = []
+        self.files = []
+        self.cells = 0
+
+    """
+    Method: stage
+    Purpose: Context manager that times a stage and records its stats.
+    The rows processed by the stage can be added to the yielded
+    dictionary. If profile is True and a profile path was given the
+    stage is ran under cProfile. The same profiler is used for every
+    profiled stage, so when the merge stage is ran more than once in
+    watch mode the file holds the stats of all of the merges instead of
+    only the last one.
+
+    Parameters:
+    name- name of the stage
+    profile- whether the stage should be profiled
+
+    Variables:
+    record- dictionary of stats for the stage
+    profiling- whether the stage is being profiled
+    cells- number of cells written before the stage
+    start- time the stage started
+
+    Yields: record- dictionary of stats for the stage
+    """
+
+    @contextmanager
+    def stage(self, name, profile=False):
+        record = {"stage": name, "seconds": 0.0, "rows": 0, "cells": 0}
+
+        if not self.enabled:
+            yield record
+            return
+
+        profiling = profile and self.profile_path is not None
+        if profiling:
+            if self.profiler is None:
+                self.profiler = cProfile.Profile()
+
+            self.profiler.enable()
+
+        cells = self.cells
+        start = time.perf_counter()
+
+        try:
+            yield record
+
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            record["cells"] = self.cells - cells
+            record["process_peak_rss_kb"] = peak_rss()
+            self.stages.append(record)
+
+            if profiling:
+                self.profiler.disable()
+                self.profiler.dump_stats(self.profile_path)
+
+    """
+    Method: file
+    Purpose: Context manager that records the stats for an input file.
+    The time to read the file and the time to add it to the output file
+    are set on the yielded dictionary by the caller.
+
+    Parameter: name- name of the input file
+
+    Variables:
+    record- dictionary of stats for the file
+    cells- number of cells written before the file
+
+    Yields: record- dictionary of stats for the file
+    """
+
+    @contextmanager
+    def file(self, name):
+        record = {"file": name, "read_seconds": 0.0, "merge_seconds": 0.0,
+                  "rows": 0, "lines_skipped": 0, "cells": 0}
+
+        if not self.enabled:
+            yield record
+            return
+
+        cells = self.cells
+
+        try:
+            yield record
+
+        finally:
+            record["cells"] = self.cells - cells
+            record["process_peak_rss_kb"] = peak_rss()
+            self.files.append(record)
+
+    """
+    Method: count_rows
+    Purpose: Counts the rows of an InputFile as they are looped through
+    so streamed rows are counted without putting them in a list. The
+    rows are returned as they are if stats aren't enabled.
+
+    Parameters:
+    rows- iterable of row tuples
+    record- dictionary of stats the rows are counted on
+
+    Return: generator of the rows that counts them or the rows
+    """
+
+    def count_rows(self, rows, record):
+        if not self.enabled:
+            return rows
+
+        def counted_rows():
+            for row in rows:
+                record["rows"] += 1
+                yield row
+
+        return counted_rows()
+
+    """
+    Method: timed
+    Purpose: Loops through an iterable and gives back each item with
+    the seconds it took to get it. Used to time how long each input
+    file takes to be read in.
+
+    Parameter: iterable- iterable to loop through
+
+    Variables:
+    iterator- iterator of the iterable
+    start- time before getting the next item
+
+    Yields: tuples of an item and the seconds it took to get it
+    """
+
+    def timed(self, iterable):
+        iterator = iter(iterable)
+
+        while True:
+            start = time.perf_counter()
+
+            try:
+                item = next(iterator)
+
+            except StopIteration:
+                return
+
+            yield item, time.perf_counter() - start
+
+    """
+    Method: wrap_book
+    Purpose: Wraps the output workbook so the cells written to it are
+    counted. The workbook is returned as it is if stats aren't enabled.
+
+    Parameter: workbook- workbook object of the output excel file
+
+    Return: CountingBook of the workbook or the workbook
+    """
+
+    def wrap_book(self, workbook):
+        if not self.enabled:
+            return workbook
+
+        return CountingBook(workbook, self)
+
+    """
+    Method: save
+    Purpose: Writes the stats to the JSON path if one was given.
+
+    Variable: data- dictionary of all of the stats
+    """
+
+    def save(self):
+        if self.json_path is None:
+            return
+
+        data = {"stages": self.stages,
+                "files": self.files,
+                "process_peak_rss_kb": peak_rss()}
+
+        with open(self.json_path, "w") as json_file:
+            json.dump(data, json_file, indent=2)
+
+
+"""
+Class: CountingBook
+Purpose: Passes everything through to a workbook, but the worksheets
+it gives back are wrapped in CountingSheets.
+
+Attributes:
+workbook- workbook object being wrapped
+run_stats- RunStats the cells are counted on
+"""
+
+
+class CountingBook:
+    def __init__(self, workbook, run_stats):
+        self.workbook = workbook
+        self.run_stats = run_stats
+
+    def __getattr__(self, name):
+        return getattr(self.workbook, name)
+
+    def __getitem__(self, title):
+        return CountingSheet(self.workbook[title], self.run_stats)
+
+    def create_sheet(self, title):
+        return CountingSheet(self.workbook.create_sheet(title=title), self.run_stats)
+
+
+"""
+Class: CountingSheet
+Purpose: Passes everything through to a worksheet, counting every
+cell that is got with cell to be written to or written with append.
+
+Attributes:
+sheet- worksheet object being wrapped
+run_stats- RunStats the cells are counted on
+"""
+
+
+class CountingSheet:
+    def __init__(self, sheet, run_stats):
+        self.sheet = sheet
+        self.run_stats = run_stats
+
+    def __getattr__(self, name):
+        return getattr(self.sheet, name)
+
+    def cell(self, row, column):
+        self.run_stats.cells += 1
+        return self.sheet.cell(row, column)
+
+    def append(self, values):
+        self.run_stats.cells += len(values)
+        self.sheet.append(values)
+
+
+"""
+Method: peak_rss
+Purpose: Gets the peak memory used by the program so far in kilobytes.
+This is the peak of the whole process since it started, not of a
+single stage, so a stage only shows a higher number than the one
+before it if it went past every earlier peak.
+
+Return: peak memory in kilobytes or None if it can't be found
+"""
+
+
+def peak_rss():
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS gives bytes instead of kilobytes
+    if sys.platform == "darwin":
+        peak //= 1024
+
+    return peak
@@ -0,0 +1,380 @@
+"""
+File: store.py
+Author: Kyle Fullerton
+Purpose: File that includes the SQLite store of the output file. The
+store is kept next to the output file and holds every part, assembly,
+and qty, so a run doesn't have to read the output file back in. The
+changes made by each input file are written to the store in a single
+transaction, and the output excel file is exported from the store
+instead of being loaded and saved again.
+
+The output file is only made from the store if it hasn't changed since
+it was last exported and the store can make everything in it. If it has
+other sheets, sheet settings like frozen panes, or styles the store
+doesn't keep, or it was edited after it was exported, it is read in and
+the store is filled in from it again, so nothing in it is lost.
+
+The store can be looked at without excel. Ex:
+sqlite3 BOM.xlsx.db "SELECT assemblies.name, qty FROM quantities
+JOIN assemblies USING (assembly) WHERE part_num = 'PN-1'"
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from excelScript import process_files, rebuild
+
+
+STORE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS parts (part_num TEXT PRIMARY KEY,
+                                  row INTEGER NOT NULL,
+                                  info TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS assemblies (assembly INTEGER PRIMARY KEY,
+                                       name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS quantities (part_num TEXT NOT NULL,
+                                       assembly INTEGER NOT NULL,
+                                       qty,
+                                       PRIMARY KEY (part_num, assembly));
+CREATE INDEX IF NOT EXISTS quantities_assembly ON quantities (assembly);
+"""
+
+"""
+Class: MasterStore
+Purpose: Holds the connection to the store of an output file.
+
+Attributes:
+store_path- path of the store file
+config_key- hash of the configuration parameters the store is used with
+connection- sqlite3 Connection to the store
+rebuildable- whether the output file can be made from the store
+"""
+
+
+class MasterStore:
+    def __init__(self, store_path, config_key):
+        self.store_path = store_path
+        self.config_key = config_key
+        self.connection = sqlite3.connect(store_path)
+        self.connection.executescript(SCHEMA)
+        self.rebuildable = False
+
+    """
+    Method: is_current
+    Purpose: Checks if the store has been filled in for the same
+    configuration parameters.
+
+    Variable: row- row of the config key in the meta table or None
+
+    Return: True if the store can be used
+    """
+
+    def is_current(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'config_key'").fetchone()
+
+        return row is not None and row[0] == self.config_key
+
+    """
+    Method: read_master_rows
+    Purpose: Makes the rows of values of the output file from the store
+    in the same form that process_files.read_master_rows reads them in.
+    Rows that didn't have a part are left empty.
+
+    Parameter: configs- dictionary of configuration parameters
+
+    Variables:
+    head_rows- rows above the header row
+    headers- header row
+    qty_start- index of the first qty column
+    qtys- dictionary of part number mapped to its qtys
+    rows- list of the rows of values
+
+    Return: rows- list of the rows of values
+    """
+
+    def read_master_rows(self, configs):
+        head_rows = json.loads(self.get_meta("head_rows"))
+        headers = json.loads(self.get_meta("headers"))
+        qty_start = configs["qty_start"] - 1
+
+        qtys = {}
+        for part_num, assembly, qty in self.connection.execute(
+                "SELECT part_num, assembly, qty FROM quantities"):
+            part_qtys = qtys.setdefault(part_num, [""] * (len(headers) - qty_start))
+            part_qtys[assembly] = qty
+
+        rows = head_rows + [[]] * (configs["header_row"] - 1 - len(head_rows)) + [headers]
+        for part_num, row, info in self.connection.execute(
+                "SELECT part_num, row, info FROM parts ORDER BY row"):
+            while len(rows) < row - 1:
+                rows.append([""] * len(headers))
+
+            rows.append(json.loads(info) + qtys.get(part_num, [""] * (len(headers) - qty_start)))
+
+        return rows
+
+    """
+    Method: reset
+    Purpose: Replaces everything in the store with the output file
+    that was read in, in a single transaction.
+
+    Parameters:
+    head_rows- rows above the header row
+    header_list- HeaderList of the output file
+    part_table- PartTable of the parts in the output file
+    configs- dictionary of configuration parameters
+    """
+
+    def reset(self, head_rows, header_list, part_table, configs):
+        with self.connection:
+            for table in ("meta", "parts", "assemblies", "quantities"):
+                self.connection.execute("DELETE FROM " + table)
+
+            self.set_meta("head_rows", self.to_json(head_rows))
+            self.set_meta("config_key", self.config_key)
+            self.write_parts(part_table.items(), header_list, configs)
+
+    """
+    Method: write_changes
+    Purpose: Writes the parts that changed since the last write to the
+    store in a single transaction. If anything fails nothing is written.
+
+    Parameters:
+    part_table- PartTable of the parts in the output file
+    header_list- HeaderList of the output file
+    configs- dictionary of configuration parameters
+    """
+
+    def write_changes(self, part_table, header_list, configs):
+        with self.connection:
+            self.write_parts(part_table.changed.items(), header_list, configs)
+
+        part_table.changed.clear()
+
+    """
+    Method: write_parts
+    Purpose: Writes the headers and the given parts with their qtys.
+    The remarks are written as their joined text. Empty qtys aren't kept.
+
+    Parameters:
+    part_rows- iterable of (part number, PartRow) tuples
+    header_list- HeaderList of the output file
+    configs- dictionary of configuration parameters
+
+    Variables:
+    qty_start- index of the first qty column
+    remarks- index of the remarks in the info of a part
+    info- values of the current part before the qty columns
+    """
+
+    def write_parts(self, part_rows, header_list, configs):
+        qty_start = configs["qty_start"] - 1
+        remarks = configs["out_remarks_index"] - 1
+
+        self.set_meta("headers", self.to_json(list(header_list)))
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO assemblies (assembly, name) VALUES (?, ?)",
+            [(i, str(name)) for i, name in enumerate(header_list[qty_start:])])
+
+        for part_num, part_row in part_rows:
+            info = list(part_row.info)
+            if part_row.remarks is not None:
+                info[remarks] = part_row.remarks_text()
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO parts (part_num, row, info) VALUES (?, ?, ?)",
+                (part_num, part_row.row, self.to_json(info)))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO quantities (part_num, assembly, qty) VALUES (?, ?, ?)",
+                [(part_num, assembly, qty) for assembly, qty in enumerate(part_row.qtys)
+                 if qty != ""])
+
+    """
+    Method: to_json
+    Purpose: Turns values from the output file into JSON to be kept in
+    the store. Dates and other values that aren't strings, numbers,
+    booleans, or None can't be read back as they were, so they are kept
+    as text and the output file is no longer made from the store.
+
+    Parameter: values- list of values
+
+    Return: JSON text of the values
+    """
+
+    def to_json(self, values):
+        return json.dumps(values, default=self.not_json)
+
+    """
+    Method: not_json
+    Purpose: Called by json.dumps for a value that can't be kept in the
+    store. Marks the store as not able to make the output file.
+
+    Parameter: value- value that can't be kept
+
+    Return: text of the value
+    """
+
+    def not_json(self, value):
+        if self.rebuildable:
+            print("Output file has dates or other values that can't be kept in the store, "
+                  "so it will be read in on every run")
+
+        self.rebuildable = False
+
+        return str(value)
+
+    """
+    Method: record_export
+    Purpose: Records the size and modified time of the output file once
+    it has been exported, so the next run can tell if it was changed
+    after that. Nothing is recorded if the output file can't be made
+    from the store, so it is read in again on the next run.
+
+    Parameter: write_file- path of the output excel file
+    """
+
+    def record_export(self, write_file):
+        with self.connection:
+            if self.rebuildable:
+                self.set_meta("export", output_key(write_file))
+            else:
+                self.connection.execute("DELETE FROM meta WHERE key = 'export'")
+
+    """
+    Method: get_meta
+    Purpose: Gets a value from the meta table.
+
+    Parameter: key- key of the value
+
+    Variable: row- row of the key in the meta table or None
+
+    Return: value of the key or None if it isn't in the meta table
+    """
+
+    def get_meta(self, key):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?",
+                                      (key,)).fetchone()
+
+        return None if row is None else row[0]
+
+    def set_meta(self, key, value):
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                (key, value))
+
+
+"""
+Method: store_path
+Purpose: Gets the path of the store file for an output file.
+
+Parameter: write_file- path of the output excel file
+
+Return: path of the store file
+"""
+
+
+def store_path(write_file):
+    return write_file + ".db"
+
+
+"""
+Method: open_store
+Purpose: Opens the store for an output file, making it if it
+doesn't exist yet.
+
+Parameters:
+write_file- path of the output excel file
+configs- dictionary of configuration parameters
+
+Variable: config_key- hash of the configuration parameters
+
+Return: MasterStore for the output file
+"""
+
+
+def open_store(write_file, configs):
+    config_key = hashlib.sha1(repr((STORE_VERSION, sorted(configs.items())))
+                              .encode()).hexdigest()
+
+    return MasterStore(store_path(write_file), config_key)
+
+
+"""
+Method: output_key
+Purpose: Gets the size and modified time of the output file as text
+for the meta table.
+
+Parameter: write_file- path of the output excel file
+
+Variable: stat- os.stat_result of the output file
+
+Return: json text of the size and modified time or None if there
+isn't an output file
+"""
+
+
+def output_key(write_file):
+    try:
+        stat = os.stat(write_file)
+
+    except FileNotFoundError:
+        return None
+
+    return json.dumps([stat.st_size, stat.st_mtime_ns])
+
+
+"""
+Method: load_book
+Purpose: Gets the workbook the output file is exported from. If the
+store is filled in and the output file is the one last exported from
+it, a GridBook is made from the store without reading the output file.
+Otherwise the whole output file is read in so nothing in it is lost,
+and the store is filled in from it.
+
+Parameters:
+master_store- MasterStore of the output file
+write_file- path of the output excel file
+configs- dictionary of configuration parameters
+
+Variables:
+file- name of the output file
+export- size and modified time of the output file when it was last
+exported from the store or None
+out_write_book- workbook of the output file
+out_write_sheet- worksheet of the output file
+
+Returns:
+out_write_book- workbook of the output file
+out_write_sheet- worksheet of the output file
+loaded- whether the output file was read in from the store
+"""
+
+
+def load_book(master_store, write_file, configs):
+    file = os.path.basename(write_file)
+    export = master_store.get_meta("export") if master_store.is_current() else None
+
+    if export is not None and export == output_key(write_file):
+        out_write_book, out_write_sheet = rebuild.\
+            make_grid_book(master_store.read_master_rows(configs), configs)
+        master_store.rebuildable = True
+
+        return out_write_book, out_write_sheet, True
+
+    if export is not None:
+        print("Output file {0} has changed since it was exported from the store, so the "
+              "store will be filled in from it again".format(file))
+
+    out_write_book, out_write_sheet = process_files.\
+        get_valid_writebook(write_file, configs["out_sheet_name"])
+    master_store.rebuildable = rebuild.can_make_grid_book(out_write_book, out_write_sheet,
+                                                          configs)
+
+    if not master_store.rebuildable:
+        print("Output file {0} has sheets, sheet settings, or styles that can't be made "
+              "from the store, so it will be read in on every run".format(file))
+
+    return out_write_book, out_write_sheet, False
@@ -1,166 +1,286 @@
-"""
-File: utils.py
-Author: Kyle Fullerton
-Purpose: File to put any miscellaneous functions that can be helpful
-in other places in the program.
-"""
-from openpyxl.styles import (Color,
-                             Border,
-                             Side,
-                             Alignment,
-                             PatternFill
-                             )
-import sys
-
-"""
-Method: add_header
-Purpose: Handles all of the stlying for the header cells.
-Also, inserts the header title as well.
-
-Parameters: 
-cell- cell object
-value - header string to be inserted
-"""
-
-
-def add_header(cell, value):
-    gray = Color(rgb='00C2C2C2')
-    black = Color(rgb='000000')
-
-    border = Border(left=Side(border_style='thin', color=black),
-                    right=Side(border_style='thin', color=black),
-                    top=Side(border_style='thin', color=black),
-                    bottom=Side(border_style='thin', color=black))
-
-    cell.fill = PatternFill(patternType='solid', fgColor=gray)
-    cell.alignment = Alignment(horizontal="center")
-    cell.border = border
-    cell.value = value
-
-
-"""
-Method: add_assembly_num
-Purpose: Adds a new header to the spreadsheet 
-and to the header list.
-
-Parameters: 
-header_list- list of headers for the spreadsheet
-write_sheet- spreadsheet that is being written to
-read_sheet- spreadsheet to read the assembly number
-configs- dictionary of configuration parameters
-"""
-
-
-def add_assembly_num(header_list, write_sheet, read_sheet, configs):
-    try:
-        assembly_num = read_sheet.cell_value(configs["part_num_row"] - 1,
-                                             configs["part_num_column"] - 1)
-
-    except IndexError:
-        print("Error: config parameter {0} or {1} defines an out of range row/column"
-              .format("'part_num_row'", "'part_num_column'"))
-        sys.exit(1)
-
-    if assembly_num not in header_list:
-        add_header(write_sheet.cell(configs["header_row"], len(header_list) + 1), assembly_num)
-        header_list.append(assembly_num)
-
-
-"""
-Method: edit_column_width
-Purpose: Changes the dimensions of all the columns
-used in the spreadsheet to the specified width.
-
-Parameters: 
-out_write_sheet- spreadsheet that is written to
-headers- list of headers
-configs- dictionary of configuration parameters
-"""
-
-
-def edit_column_width(out_write_sheet, headers, configs):
-    for i in range(0, len(headers)):
-        column = get_column_letter(i)
-        out_write_sheet.column_dimensions[column].width = configs["column_width"]
-
-
-"""
-Method: get_column_num
-Purpose: Utility function to get a column number if a
-letter may be specified instead.
-
-Parameter: 
-number- string or int that will be converted to a string
-
-Return: 
-col_num- Column number corresponding to its column letter.
-Ex: 2 = 'C'.
-"""
-
-
-def get_column_num(letters):
-    try:
-        column_num = int(letters)
-
-    except ValueError:
-        letters_str = letters
-        column_num = 0
-
-        while len(letters_str) > 1:
-            column_num += 26
-            letters_str = letters_str[1:]
-        column_num += ord(letters[0].upper()) - ord("A")
-
-    return column_num
-
-
-"""
-Method: get_column_letter
-Purpose: Utility function to get a column letter if a
-number may be specified instead.
-
-Parameter: 
-number- string or int that will be converted to a string
-Return: 
-col_ltr- Column letter corresponding to its column number.
-Ex: 'C' = 2.
-"""
-
-
-def get_column_letter(number):
-    try:
-        column_num = int(number)
-
-        column_letter = ""
-        while column_num > 25:
-            column_num -= 26
-            column_letter += "A"
-        column_letter += chr(column_num + ord("A"))
-
-    except ValueError:
-        column_letter = number
-
-    return column_letter
-
-
-"""
-Method: get_range
-Purpose: To construct a range of cells as a string.
-Ex: "A1:D1"
-
-Parameters:
-column1- column for the first cell in the range
-column2- column for the second cell in the range
-row1- row for the first cell in the range
-row2- row for the second cell in the range 
-
-Return:
-A string that represents a range of cells.
-"""
-
-
-def get_range(column1, column2, row1, row2):
-    start = str(get_column_letter(column1)) + str(row1)
-    end = str(get_column_letter(column2)) + str(row2)
-
-    return start + ":" + end
+"""
+File: utils.py
+Author: Kyle Fullerton
+Purpose: File to put any miscellaneous functions that can be helpful
+in other places in the program.
+"""
+from openpyxl.styles import (Color,
+                             Border,
+                             Side,
+                             Alignment,
+                             PatternFill,
+                             NamedStyle
+                             )
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fills import DEFAULT_EMPTY_FILL
+from openpyxl.styles.fonts import DEFAULT_FONT
+import sys
+
+
+# the header and remarks styles are made once and shared by every cell
+# instead of making new style objects for each cell
+BLACK_SIDE = Side(border_style='thin', color=Color(rgb='000000'))
+
+STYLES = {"BOM Header": {"fill": PatternFill(patternType='solid', fgColor=Color(rgb='00C2C2C2')),
+                         "border": Border(left=BLACK_SIDE, right=BLACK_SIDE,
+                                          top=BLACK_SIDE, bottom=BLACK_SIDE),
+                         "alignment": Alignment(horizontal="center")},
+          "BOM Remarks": {"alignment": Alignment(wrap_text=True)}}
+
+# named styles start from the workbook defaults so only the styles above change
+NAMED_STYLE_DEFAULTS = {"font": DEFAULT_FONT, "border": DEFAULT_BORDER, "fill": DEFAULT_EMPTY_FILL}
+
+"""
+Method: add_header
+Purpose: Handles all of the stlying for the header cells.
+Also, inserts the header title as well.
+
+Parameters: 
+cell- cell object
+value - header string to be inserted
+"""
+
+
+def add_header(cell, value):
+    set_style(cell, "BOM Header")
+    cell.value = value
+
+
+"""
+Method: set_style
+Purpose: Sets one of the shared styles on a cell. The first time a
+style is used in a workbook it is registered as a named style, so
+after that setting it doesn't have to build or look up any style
+objects. Cells in rebuild mode don't belong to a workbook, so they
+are given the shared style objects instead.
+
+Parameters:
+cell- cell object
+name- name of the style in STYLES
+
+Variable: workbook- workbook of the cell or None
+"""
+
+
+def set_style(cell, name):
+    workbook = getattr(getattr(cell, "parent", None), "parent", None)
+
+    if workbook is None:
+        for attribute, style in STYLES[name].items():
+            setattr(cell, attribute, style)
+        return
+
+    if name not in workbook.named_styles:
+        workbook.add_named_style(NamedStyle(name=name, **dict(NAMED_STYLE_DEFAULTS,
+                                                              **STYLES[name])))
+
+    cell.style = name
+
+
+"""
+Method: get_assembly_num
+Purpose: Gets the assembly number from the read in spreadsheet.
+
+Parameters:
+read_sheet- spreadsheet to read the assembly number
+configs- dictionary of configuration parameters
+
+Return: assembly_num- assembly number for the read in spreadsheet
+"""
+
+
+def get_assembly_num(read_sheet, configs):
+    try:
+        assembly_num = read_sheet.cell_value(configs["part_num_row"] - 1,
+                                             configs["part_num_column"] - 1)
+
+    except IndexError:
+        print("Error: config parameter {0} or {1} defines an out of range row/column"
+              .format("'part_num_row'", "'part_num_column'"))
+        sys.exit(1)
+
+    return assembly_num
+
+
+"""
+Method: add_assembly_num
+Purpose: Adds a new header to the spreadsheet 
+and to the header list.
+
+Parameters: 
+header_list- HeaderList of headers for the spreadsheet
+write_sheet- spreadsheet that is being written to
+assembly_num- assembly number for the read in spreadsheet
+configs- dictionary of configuration parameters
+"""
+
+
+def add_assembly_num(header_list, write_sheet, assembly_num, configs):
+    if assembly_num not in header_list:
+        add_header(write_sheet.cell(configs["header_row"], len(header_list) + 1), assembly_num)
+        header_list.append(assembly_num)
+
+
+"""
+Method: xlrd_values
+Purpose: Converts a row of Openpyxl values to the values XLRD
+would have given for the same cells. Empty cells become empty
+strings and whole numbers become floats so rows read with
+Openpyxl can be used the same way as rows read with XLRD.
+
+Parameter: row- tuple of Openpyxl cell values
+
+Return: list of converted values
+"""
+
+
+def xlrd_values(row):
+    values = []
+
+    for value in row:
+        if value is None:
+            value = ""
+        elif type(value) is int:
+            value = float(value)
+
+        values.append(value)
+
+    return values
+
+
+"""
+Method: edit_column_width
+Purpose: Changes the dimensions of all the columns
+used in the spreadsheet to the specified width.
+
+Parameters: 
+out_write_sheet- spreadsheet that is written to
+headers- list or HeaderList of headers
+configs- dictionary of configuration parameters
+"""
+
+
+def edit_column_width(out_write_sheet, headers, configs):
+    for i in range(0, len(headers)):
+        column = get_column_letter(i)
+        out_write_sheet.column_dimensions[column].width = configs["column_width"]
+
+
+"""
+Method: column_letters
+Purpose: Converts a column number to its letters. Columns are lettered
+in bijective base 26, so after Z comes AA, after AZ comes BA, and after
+ZZ comes AAA.
+
+Parameter: number- column number starting at 0
+
+Variable: letters- list of the letters from last to first
+
+Return: column letters. Ex: 0 = 'A', 26 = 'AA', 16383 = 'XFD'.
+"""
+
+
+def column_letters(number):
+    letters = []
+    number += 1
+
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        letters.append(chr(remainder + ord("A")))
+
+    return "".join(reversed(letters))
+
+
+# every column an excel sheet can have (A to XFD) is converted once and
+# shared so the conversions are only a lookup
+MAX_COLUMNS = 16384
+COLUMN_LETTERS = [column_letters(number) for number in range(MAX_COLUMNS)]
+COLUMN_NUMS = {letters: number for number, letters in enumerate(COLUMN_LETTERS)}
+
+"""
+Method: get_column_num
+Purpose: Utility function to get a column number if a
+letter may be specified instead.
+
+Parameter: 
+letters- string or int of the column letters or number
+
+Variables:
+letters_str- upper case column letters
+column_num- column number being built up from the letters
+
+Return: 
+column_num- Column number corresponding to its column letter.
+Ex: 2 = 'C', 27 = 'AB'.
+"""
+
+
+def get_column_num(letters):
+    try:
+        return int(letters)
+
+    except ValueError:
+        letters_str = letters.strip().upper()
+
+    column_num = COLUMN_NUMS.get(letters_str)
+    if column_num is not None:
+        return column_num
+
+    if not letters_str or not all("A" <= letter <= "Z" for letter in letters_str):
+        raise ValueError("invalid column letters: {0}".format(letters))
+
+    # past XFD the letters are worked out
+    column_num = 0
+    for letter in letters_str:
+        column_num = column_num * 26 + ord(letter) - ord("A") + 1
+
+    return column_num - 1
+
+
+"""
+Method: get_column_letter
+Purpose: Utility function to get a column letter if a
+number may be specified instead.
+
+Parameter: 
+number- string or int that will be converted to a string
+Return: 
+column_letter- Column letter corresponding to its column number.
+Ex: 'C' = 2, 'AB' = 27.
+"""
+
+
+def get_column_letter(number):
+    try:
+        column_num = int(number)
+
+    except ValueError:
+        return number
+
+    if 0 <= column_num < MAX_COLUMNS:
+        return COLUMN_LETTERS[column_num]
+
+    return column_letters(column_num)
+
+
+"""
+Method: get_range
+Purpose: To construct a range of cells as a string.
+Ex: "A1:D1"
+
+Parameters:
+column1- column for the first cell in the range
+column2- column for the second cell in the range
+row1- row for the first cell in the range
+row2- row for the second cell in the range 
+
+Return:
+A string that represents a range of cells.
+"""
+
+
+def get_range(column1, column2, row1, row2):
+    start = str(get_column_letter(column1)) + str(row1)
+    end = str(get_column_letter(column2)) + str(row2)
+
+    return start + ":" + end
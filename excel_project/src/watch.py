@@ -0,0 +1,124 @@
+"""
+File: watch.py
+Author: Kyle Fullerton
+Purpose: File that is used to watch the directory of files for new
+or changed files while the output file is kept in memory.
+"""
+
+import os
+import stat
+import time
+
+from excelScript import process_files
+
+
+"""
+Method: watch
+Purpose: Polls the directory for files that are new or have changed.
+A file is only added once its size and modified time are the same
+for two polls in a row so files that are still being copied into the
+directory aren't read in. The output file is saved every flush
+interval if any files were added, and once more when the program is
+stopped with Ctrl+C. Files that changed after they were looked at for
+the first pass are read in on the first polls.
+
+Parameters:
+directory_path- file path to the directory of files
+write_file- file path of the output file
+handled- dictionary of filename mapped to its size and modified time
+from before the first pass
+merge- function that takes a list of files and adds them to the output file
+flush- function that saves the output file
+poll_interval- seconds between each check of the directory
+flush_interval- seconds between each save of the output file
+
+Variables:
+pending- dictionary of filename mapped to its size and modified time
+from the last poll for files that are waiting to be read in
+unsaved- whether files were added since the output file was last saved
+last_flush- time the output file was last saved
+stats- dictionary of filename mapped to its size and modified time
+ready- list of files that are ready to be read in
+"""
+
+
+def watch(directory_path, write_file, handled, merge, flush, poll_interval, flush_interval):
+    pending = {}
+    unsaved = False
+    last_flush = time.monotonic()
+
+    print("Watching {0} for new or changed files. Press Ctrl+C to stop."
+          .format(directory_path))
+
+    try:
+        while True:
+            time.sleep(poll_interval)
+            stats = stat_files(directory_path, write_file)
+            ready = []
+
+            for file, stat in stats.items():
+                if handled.get(file) == stat:
+                    pending.pop(file, None)
+
+                # the file didn't change since the last poll
+                elif pending.get(file) == stat:
+                    ready.append(file)
+                    handled[file] = pending.pop(file)
+
+                else:
+                    pending[file] = stat
+
+            # forget removed files so they are read in again if they come back
+            for file in list(handled):
+                if file not in stats:
+                    del handled[file]
+
+            if len(ready) > 0:
+                merge(ready)
+                unsaved = True
+
+            if unsaved and time.monotonic() - last_flush >= flush_interval:
+                flush()
+                unsaved = False
+                last_flush = time.monotonic()
+
+    except KeyboardInterrupt:
+        if unsaved:
+            flush()
+
+
+"""
+Method: stat_files
+Purpose: Gets the size and modified time of every input file in the
+directory. The output file and the files kept next to it are left out.
+
+Parameters:
+directory_path- file path to the directory of files
+write_file- file path of the output file
+
+Variables:
+stats- dictionary of filename mapped to its size and modified time
+file_stat- os.stat_result of a file
+
+Return: stats- dictionary of filename mapped to its size and modified time
+"""
+
+
+def stat_files(directory_path, write_file):
+    stats = {}
+
+    for file in os.listdir(directory_path):
+        if not process_files.is_input_file(file, write_file):
+            continue
+
+        try:
+            file_stat = os.stat(os.path.join(directory_path, file))
+
+        # the file was removed after the directory was listed
+        except FileNotFoundError:
+            continue
+
+        if stat.S_ISREG(file_stat.st_mode):
+            stats[file] = (file_stat.st_size, file_stat.st_mtime_ns)
+
+    return stats
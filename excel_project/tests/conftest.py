@@ -0,0 +1,43 @@
+"""
+File: conftest.py
+Author: Kyle Fullerton
+Purpose: File that makes the src directory importable as the excelScript
+package and the fake google sheets service importable by the tests, the
+same way they are imported when the program is run. Every test gets its
+own cache directory so the compiled configurations are never written to
+the user's real cache.
+"""
+
+import os
+import sys
+import types
+
+import pytest
+
+
+TESTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SRC_DIRECTORY = os.path.join(os.path.dirname(TESTS_DIRECTORY), "src")
+
+if "excelScript" not in sys.modules:
+    package = types.ModuleType("excelScript")
+    package.__path__ = [SRC_DIRECTORY]
+    sys.modules["excelScript"] = package
+
+if TESTS_DIRECTORY not in sys.path:
+    sys.path.insert(0, TESTS_DIRECTORY)
+
+
+"""
+Method: cache_home
+Purpose: Points the user's cache directory at the test's temporary
+directory.
+
+Parameters:
+monkeypatch- pytest MonkeyPatch object
+tmp_path- pathlib.Path of the test's temporary directory
+"""
+
+
+@pytest.fixture(autouse=True)
+def cache_home(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
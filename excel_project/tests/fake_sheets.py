@@ -0,0 +1,363 @@
+"""
+File: fake_sheets.py
+Author: Kyle Fullerton
+Purpose: File that includes a fake google sheets service that keeps a
+spreadsheet in memory. It has the same spreadsheets().get,
+spreadsheets().batchUpdate, spreadsheets().values().batchUpdate, and
+spreadsheets().values().batchGet calls as the googleapiclient service so
+gsheets.py can be tested without a google account. Errors can be queued
+up to test the retries, and a payload limit can be set to test the
+chunking of requests.
+
+Ex:
+service = FakeService(title="BOM", sheets=["Sheet1"], failures=[429, 503])
+gsheets.execute(part_table, header_list, config_dict, service=service)
+service.sheet("Sheet1").rows()
+"""
+
+import httplib2
+import json
+import re
+
+from excelScript import utils
+from googleapiclient.errors import HttpError
+
+
+# matches an A1 range like 'Sheet1'!A2:F10 or Sheet1!B3
+A1_RANGE = re.compile(r"^(?:'((?:[^']|'')*)'|([^!]*))!([A-Z]+)(\d+)")
+
+
+"""
+Class: FakeService
+Purpose: Holds the fake spreadsheet and the requests that were sent to it.
+
+Attributes:
+title- title of the spreadsheet
+sheets- dictionary of sheet id mapped to FakeSheet
+failures- list of http statuses that the next requests fail with
+max_bytes- largest request body in bytes of JSON or None for no limit
+batches- list of the batchUpdate and values batchUpdate bodies that were applied
+calls- number of requests that were executed, including failed ones
+"""
+
+
+class FakeService:
+    def __init__(self, title="", sheets=None, failures=None, max_bytes=None):
+        self.title = title
+        self.sheets = {}
+        self.failures = list(failures or [])
+        self.max_bytes = max_bytes
+        self.batches = []
+        self.calls = 0
+
+        for sheet_title in sheets or []:
+            self.add_sheet(sheet_title)
+
+    def spreadsheets(self):
+        return FakeSpreadsheets(self)
+
+    def sheet(self, title):
+        for sheet in self.sheets.values():
+            if sheet.title == title:
+                return sheet
+
+        raise KeyError(title)
+
+    def add_sheet(self, title):
+        sheet_id = len(self.sheets)
+        self.sheets[sheet_id] = FakeSheet(sheet_id, title)
+
+        return self.sheets[sheet_id]
+
+    """
+    Method: metadata
+    Purpose: Makes the response of a spreadsheets().get request.
+
+    Return: dictionary of the spreadsheet properties and sheets
+    """
+
+    def metadata(self):
+        return {"properties": {"title": self.title},
+                "sheets": [{"properties": {"sheetId": sheet.sheet_id, "title": sheet.title}}
+                           for sheet in self.sheets.values()]}
+
+    """
+    Method: batch_update
+    Purpose: Applies the requests in a batchUpdate body. A body over the
+    payload limit fails with a 400 error like the real API.
+
+    Parameter: body- batchUpdate request body
+
+    Variable: replies- list of the replies for each request
+
+    Return: dictionary of the replies
+    """
+
+    def batch_update(self, body):
+        self.check_size(body)
+
+        replies = [self.apply(request) for request in body["requests"]]
+        self.batches.append(body)
+
+        return {"replies": replies}
+
+    """
+    Method: values_update
+    Purpose: Writes the value ranges in a values batchUpdate body. The
+    values are kept as they are, so formulas are kept as their strings.
+
+    Parameter: body- values batchUpdate request body
+
+    Variables:
+    match- match of the A1 range of the current value range
+    sheet- FakeSheet the value range is for
+    start_row- row index of the first row of the range
+    start_column- column index of the first column of the range
+
+    Return: dictionary of the number of ranges updated
+    """
+
+    def values_update(self, body):
+        self.check_size(body)
+
+        for value_range in body["data"]:
+            match = A1_RANGE.match(value_range["range"])
+            if match is None:
+                raise http_error(400, "Unable to parse range: " + value_range["range"])
+
+            title = match.group(1).replace("''", "'") if match.group(1) is not None \
+                else match.group(2)
+
+            try:
+                sheet = self.sheet(title)
+
+            except KeyError:
+                raise http_error(400, "Unable to parse range: " + value_range["range"])
+
+            start_row = int(match.group(4)) - 1
+            start_column = utils.get_column_num(match.group(3))
+
+            for i, row in enumerate(value_range["values"]):
+                for j, value in enumerate(row):
+                    sheet.set(start_row + i, start_column + j, value)
+
+        self.batches.append(body)
+
+        return {"totalUpdatedRanges": len(body["data"])}
+
+    """
+    Method: values_get
+    Purpose: Gets the values of whole sheets like a values batchGet of
+    sheet titles. Empty cells at the end of a row are left off like the
+    real API.
+
+    Parameter: ranges- list of quoted sheet titles
+
+    Variables:
+    value_ranges- list of the value ranges of the sheets
+    title- title of the current sheet
+    rows- rows of the current sheet
+
+    Return: dictionary of the value ranges
+    """
+
+    def values_get(self, ranges):
+        value_ranges = []
+
+        for sheet_range in ranges:
+            title = sheet_range[1:-1].replace("''", "'") if sheet_range.startswith("'") \
+                else sheet_range
+            rows = [list(row) for row in self.sheet(title).rows()]
+
+            for row in rows:
+                while row and row[-1] == "":
+                    row.pop()
+
+            value_ranges.append({"range": sheet_range, "values": rows})
+
+        return {"valueRanges": value_ranges}
+
+    """
+    Method: check_size
+    Purpose: Fails a request with a 400 error like the real API if its
+    body is over the payload limit.
+
+    Parameter: body- request body
+    """
+
+    def check_size(self, body):
+        if self.max_bytes is not None and \
+                len(json.dumps(body, separators=(",", ":"))) > self.max_bytes:
+            raise http_error(400, "Request payload size exceeds the limit")
+
+    """
+    Method: apply
+    Purpose: Applies one request to the spreadsheet.
+
+    Parameter: request- request dictionary
+
+    Variables:
+    kind- type of the request
+    sheet- FakeSheet the request is for
+
+    Return: reply dictionary of the request
+    """
+
+    def apply(self, request):
+        kind, properties = next(iter(request.items()))
+
+        if kind == "updateSpreadsheetProperties":
+            self.title = properties["properties"].get("title", self.title)
+
+        elif kind == "addSheet":
+            sheet = self.add_sheet(properties["properties"]["title"])
+            return {"addSheet": {"properties": {"sheetId": sheet.sheet_id,
+                                                "title": sheet.title}}}
+
+        elif kind == "updateCells":
+            cell_range = properties["range"]
+            sheet = self.sheets[cell_range["sheetId"]]
+
+            for i, row in enumerate(properties["rows"]):
+                for j, cell in enumerate(row.get("values", [])):
+                    # userEnteredValue has one key like stringValue or numberValue
+                    value = next(iter(cell.get("userEnteredValue", {"": ""}).values()))
+                    sheet.set(cell_range["startRowIndex"] + i,
+                              cell_range.get("startColumnIndex", 0) + j, value)
+
+        elif kind != "autoResizeDimensions":
+            raise http_error(400, "Unknown request {0}".format(kind))
+
+        return {}
+
+
+"""
+Class: FakeSpreadsheets
+Purpose: Makes the fake requests for the spreadsheets collection.
+
+Attribute: service- FakeService the requests are made on
+"""
+
+
+class FakeSpreadsheets:
+    def __init__(self, service):
+        self.service = service
+
+    def get(self, spreadsheetId, fields=None):
+        return FakeRequest(self.service, self.service.metadata)
+
+    def batchUpdate(self, spreadsheetId, body):
+        return FakeRequest(self.service, lambda: self.service.batch_update(body))
+
+    def values(self):
+        return FakeValues(self.service)
+
+
+"""
+Class: FakeValues
+Purpose: Makes the fake requests for the spreadsheets values collection.
+
+Attribute: service- FakeService the requests are made on
+"""
+
+
+class FakeValues:
+    def __init__(self, service):
+        self.service = service
+
+    def batchUpdate(self, spreadsheetId, body):
+        return FakeRequest(self.service, lambda: self.service.values_update(body))
+
+    def batchGet(self, spreadsheetId, ranges, valueRenderOption=None):
+        return FakeRequest(self.service, lambda: self.service.values_get(ranges))
+
+
+"""
+Class: FakeRequest
+Purpose: A request that is only applied once it is executed. If there
+are queued up failures the first one is raised instead.
+
+Attributes:
+service- FakeService the request is made on
+action- function that applies the request and returns its response
+"""
+
+
+class FakeRequest:
+    def __init__(self, service, action):
+        self.service = service
+        self.action = action
+
+    def execute(self):
+        self.service.calls += 1
+
+        if self.service.failures:
+            raise http_error(self.service.failures.pop(0), "Fake failure")
+
+        return self.action()
+
+
+"""
+Class: FakeSheet
+Purpose: Holds the cells of one sheet.
+
+Attributes:
+sheet_id- unique id of the sheet
+title- title of the sheet
+cells- dictionary of (row index, column index) mapped to the cell value.
+Empty cells aren't kept.
+"""
+
+
+class FakeSheet:
+    def __init__(self, sheet_id, title):
+        self.sheet_id = sheet_id
+        self.title = title
+        self.cells = {}
+
+    def set(self, row, column, value):
+        if value == "":
+            self.cells.pop((row, column), None)
+
+        else:
+            self.cells[(row, column)] = value
+
+    """
+    Method: rows
+    Purpose: Gets the values of the sheet as a list of rows. Empty
+    cells are empty strings.
+
+    Variables:
+    row_count- number of rows up to the last filled in cell
+    column_count- number of columns up to the last filled in cell
+
+    Return: list of lists of cell values
+    """
+
+    def rows(self):
+        if not self.cells:
+            return []
+
+        row_count = max(row for row, column in self.cells) + 1
+        column_count = max(column for row, column in self.cells) + 1
+
+        return [[self.cells.get((row, column), "") for column in range(column_count)]
+                for row in range(row_count)]
+
+
+"""
+Method: http_error
+Purpose: Makes an HttpError like the ones raised by googleapiclient.
+
+Parameters:
+status- http status code
+message- error message
+
+Return: HttpError object
+"""
+
+
+def http_error(status, message):
+    content = json.dumps({"error": {"code": status, "message": message}}).encode()
+
+    return HttpError(httplib2.Response({"status": status}), content)
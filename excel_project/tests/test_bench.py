@@ -0,0 +1,41 @@
+"""
+File: test_bench.py
+Author: Kyle Fullerton
+Purpose: Tests for comparing the benchmark to a saved baseline.
+"""
+
+import argparse
+
+from excelScript import bench
+
+
+BENCH_ARGS = argparse.Namespace(files=2, rows=100, assemblies=1, overlap=0.5, seed=0,
+                                max_slowdown=0.2)
+
+
+def test_baseline_passes_within_slowdown(tmp_path):
+    baseline_path = str(tmp_path / "baseline.json")
+    bench.save_baseline(baseline_path, [("config load", 0.1, 0), ("update_master", 1.0, 1000),
+                                        ("save", 1.0, 500)], BENCH_ARGS)
+
+    # 15% slower and a stage that isn't in the baseline are fine
+    assert bench.check_baseline(baseline_path, [("update_master", 1.0, 850),
+                                                ("save", 0.5, 500),
+                                                ("gsheets", 1.0, 10)], BENCH_ARGS)
+
+
+def test_baseline_fails_when_slower(tmp_path, capsys):
+    baseline_path = str(tmp_path / "baseline.json")
+    bench.save_baseline(baseline_path, [("update_master", 1.0, 1000)], BENCH_ARGS)
+
+    assert not bench.check_baseline(baseline_path, [("update_master", 1.0, 700)], BENCH_ARGS)
+    assert "SLOWER" in capsys.readouterr().out
+
+
+def test_baseline_needs_same_arguments(tmp_path):
+    baseline_path = str(tmp_path / "baseline.json")
+    bench.save_baseline(baseline_path, [("update_master", 1.0, 1000)], BENCH_ARGS)
+    other_args = argparse.Namespace(**dict(vars(BENCH_ARGS), rows=200))
+
+    assert not bench.check_baseline(baseline_path, [("update_master", 1.0, 1000)], other_args)
+    assert not bench.check_baseline(str(tmp_path / "missing.json"), [], BENCH_ARGS)
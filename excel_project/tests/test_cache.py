@@ -0,0 +1,181 @@
+"""
+File: test_cache.py
+Author: Kyle Fullerton
+Purpose: Tests for the cache of input files, the rows that take the
+output file from the old rows of a file to its new rows, and throwing
+away a cache that doesn't match the output file.
+"""
+
+import os
+
+from excelScript import cache, readers
+
+
+CONFIGS = {"out_file": "BOM.xlsx", "qty_start": 4}
+
+
+"""
+Method: totals
+Purpose: Adds up the qty of each part in a list of rows.
+
+Parameter: rows- list of row tuples
+
+Variable: parts- dictionary of part number mapped to its total qty
+
+Return: parts- dictionary of part number mapped to its total qty
+"""
+
+
+def totals(rows):
+    parts = {}
+
+    for row in rows:
+        parts[row[0]] = parts.get(row[0], 0) + row[-1]
+
+    return parts
+
+
+def test_delta_rows_unchanged_parts_left_out():
+    rows = [("PN-1", "Res", 2), ("PN-2", "Cap", 1)]
+
+    assert cache.delta_rows(rows, list(rows), True) == []
+    assert cache.delta_rows(rows, list(rows), False) == []
+
+
+def test_delta_rows_changed_qty():
+    old_rows = [("PN-1", "Res", 2), ("PN-2", "Cap", 1)]
+    new_rows = [("PN-1", "Res", 5), ("PN-2", "Cap", 1)]
+
+    assert cache.delta_rows(old_rows, new_rows, True) == [("PN-1", "Res", 3)]
+    assert cache.delta_rows(old_rows, new_rows, False) == [("PN-1", "Res", 5)]
+
+
+def test_delta_rows_part_on_several_rows():
+    old_rows = [("PN-1", "Res", 2), ("PN-1", "Res", 2)]
+    new_rows = [("PN-1", "Res", 1), ("PN-1", "Res", 2), ("PN-1", "Res", 4)]
+    rows = cache.delta_rows(old_rows, new_rows, True)
+
+    assert rows == [("PN-1", "Res", 3), ("PN-1", "Res", 0), ("PN-1", "Res", 0)]
+    assert totals(old_rows)["PN-1"] + totals(rows)["PN-1"] == totals(new_rows)["PN-1"]
+
+
+def test_delta_rows_removed_part_goes_to_zero():
+    old_rows = [("PN-1", "Res", 2), ("PN-2", "Cap", 3), ("PN-2", "Cap", 1)]
+    new_rows = [("PN-1", "Res", 2)]
+    rows = cache.delta_rows(old_rows, new_rows, True)
+
+    assert rows == [("PN-2", "Cap", -4)]
+    assert totals(old_rows)["PN-2"] + totals(rows)["PN-2"] == 0
+
+
+def test_delta_files_changed_assembly_number(tmp_path):
+    input_cache = cache.InputCache(str(tmp_path / "BOM.xlsx.cache"), "key")
+    old_rows = [("PN-1", "Res", 2), ("PN-2", "Cap", 1)]
+    input_cache.entries["asm.xlsx"] = {"size": 0, "mtime": 0, "hash": "",
+                                       "assembly_num": "100", "rows": old_rows}
+    in_file = readers.InputFile("200", iter([("PN-1", "Res", 2)]))
+
+    old_file, new_file = input_cache.delta_files("asm.xlsx", in_file, True)
+
+    # the old rows are taken away from the old assembly and the new rows added to the new one
+    assert old_file.assembly_num == "100"
+    assert totals(old_file.rows) == {"PN-1": -2, "PN-2": -1}
+    assert new_file is in_file
+    assert in_file.rows == [("PN-1", "Res", 2)]
+
+    # in replace mode the old column is left as it is
+    in_file = readers.InputFile("200", iter([("PN-1", "Res", 2)]))
+    assert input_cache.delta_files("asm.xlsx", in_file, False) == [in_file]
+
+
+"""
+Method: make_files
+Purpose: Makes an output file and an input file that has been added to it.
+
+Parameter: tmp_path- pathlib.Path of the directory
+
+Variables:
+write_file- path of the output file
+input_cache- InputCache of the output file
+in_file- InputFile of the input file
+
+Returns:
+write_file- path of the output file
+input_cache- InputCache of the output file
+"""
+
+
+def make_files(tmp_path):
+    write_file = str(tmp_path / "BOM.xlsx")
+    (tmp_path / "BOM.xlsx").write_bytes(b"original")
+    (tmp_path / "asm.xlsx").write_bytes(b"input")
+
+    input_cache = cache.load_cache(write_file, CONFIGS)
+    in_file = readers.InputFile("100", [("PN-1", "Res", 2)])
+    input_cache.record("asm.xlsx", str(tmp_path / "asm.xlsx"), in_file)
+
+    return write_file, input_cache
+
+
+def test_load_cache_same_output_file(tmp_path):
+    write_file, input_cache = make_files(tmp_path)
+    input_cache.save(write_file)
+
+    assert cache.load_cache(write_file, CONFIGS).entries.keys() == {"asm.xlsx"}
+    assert cache.load_cache(write_file, CONFIGS).changed_files(
+        str(tmp_path), ["asm.xlsx"]) == []
+
+
+def test_load_cache_output_file_replaced(tmp_path, capsys):
+    write_file, input_cache = make_files(tmp_path)
+    input_cache.save(write_file)
+
+    # an older copy of the output file doesn't have the input file in it
+    with open(write_file, "wb") as write:
+        write.write(b"old copy")
+
+    assert cache.load_cache(write_file, CONFIGS).entries == {}
+    assert "has changed since the cache was saved" in capsys.readouterr().out
+
+
+def test_load_cache_output_file_never_put_in_place(tmp_path):
+    write_file, input_cache = make_files(tmp_path)
+    input_cache.save(write_file)
+
+    # the next run saves the cache but stops before the new output file is put in place
+    input_cache = cache.load_cache(write_file, CONFIGS)
+    (tmp_path / "new.xlsx").write_bytes(b"new input")
+    input_cache.record("new.xlsx", str(tmp_path / "new.xlsx"),
+                       readers.InputFile("200", [("PN-2", "Cap", 1)]))
+    input_cache.entries["asm.xlsx"] = dict(input_cache.entries["asm.xlsx"], assembly_num="300")
+    pending_path = cache.pending_path(write_file)
+    with open(pending_path, "wb") as pending:
+        pending.write(b"new output file")
+    input_cache.save(pending_path)
+
+    input_cache = cache.load_cache(write_file, CONFIGS)
+    assert input_cache.entries.keys() == {"asm.xlsx"}
+    assert input_cache.entries["asm.xlsx"]["assembly_num"] == "100"
+
+    # once it is put in place the new entries are used
+    os.replace(pending_path, write_file)
+    input_cache = cache.load_cache(write_file, CONFIGS)
+    assert input_cache.entries.keys() == {"asm.xlsx", "new.xlsx"}
+    assert input_cache.entries["asm.xlsx"]["assembly_num"] == "300"
+
+
+def test_delta_rows_qty_that_isnt_a_number():
+    old_rows = [("PN-1", "Res", 2), ("PN-2", "Cap", "TBD"), ("PN-3", "Ind", ""),
+                ("PN-4", "Dio", "N/A")]
+    new_rows = [("PN-1", "Res", "2 PCS"), ("PN-2", "Cap", 4), ("PN-3", "Ind", 1),
+                ("PN-5", "Led", "")]
+
+    # the parts with text or blank qtys are added as they are and PN-4 is left alone
+    assert cache.delta_rows(old_rows, new_rows, True) == [("PN-1", "Res", "2 PCS"),
+                                                          ("PN-2", "Cap", 4),
+                                                          ("PN-3", "Ind", 1),
+                                                          ("PN-5", "Led", "")]
+    assert cache.delta_rows(old_rows, new_rows[1:], True) == [("PN-2", "Cap", 4),
+                                                              ("PN-3", "Ind", 1),
+                                                              ("PN-5", "Led", ""),
+                                                              ("PN-1", "Res", -2)]
@@ -0,0 +1,159 @@
+"""
+File: test_configs.py
+Author: Kyle Fullerton
+Purpose: Tests for when the compiled configuration is used and when it
+is stale and the configuration files are read in again.
+"""
+
+import os
+
+from excelScript import configs
+
+
+CONFIG_TEXT = """[config]
+out_file = master.xlsx
+out_sheet_name = Sheet1
+in_serial_num_column = A
+in_sheet_name = BOM
+total_sheet_name = Card Totals
+gbook_id = abc
+sheet1_title = Sheet1
+book_title = BOM
+serial_num_column = 1
+header_row = 2
+qty_start = 4
+out_remarks_index = 3
+column_width = 20
+doc_labels_column = 1
+doc_values_column = 2
+label_start_row = 1
+label_end_row = 3
+headers_row = 5
+part_num_row = 2
+part_num_column = 2
+data_start = 6
+total_header_row = 1
+add_mode = True
+lines_skipped = True
+use_gsheets = False
+doc_labels = Title, Assembly, Rev
+header_list = Part Number, Description, Vendor, Qty
+out_default_headers = Part Number, Description, Remarks
+total_sheet_headers = Part Number, Total
+wanted_columns = 1,2,3,4
+check_columns = 1,4
+"""
+
+
+"""
+Method: write_config
+Purpose: Writes a configuration file.
+
+Parameters:
+tmp_path- pathlib.Path of the directory
+text- text of the configuration file
+
+Return: path of the configuration file
+"""
+
+
+def write_config(tmp_path, text=CONFIG_TEXT):
+    config_file = tmp_path / "config.ini"
+    config_file.write_text(text)
+
+    return str(config_file)
+
+
+"""
+Method: count_reads
+Purpose: Counts how many times the configuration files are read in.
+
+Parameter: monkeypatch- pytest MonkeyPatch object
+
+Variables:
+reads- list that gets an item each time the files are read in
+read_config_dict- read_config_dict before it was patched
+
+Return: reads- list that gets an item each time the files are read in
+"""
+
+
+def count_reads(monkeypatch):
+    reads = []
+    read_config_dict = configs.read_config_dict
+
+    def counted(*args):
+        reads.append(args)
+        return read_config_dict(*args)
+
+    monkeypatch.setattr(configs, "read_config_dict", counted)
+
+    return reads
+
+
+def test_compiled_config_is_kept_in_the_cache_directory(tmp_path):
+    config_file = write_config(tmp_path)
+    compiled_path = configs.compiled_config_path(config_file)
+
+    assert compiled_path.startswith(os.environ["XDG_CACHE_HOME"])
+    assert compiled_path.startswith(str(tmp_path))
+
+
+def test_compiled_config_is_used_again(tmp_path, monkeypatch):
+    config_file = write_config(tmp_path)
+    reads = count_reads(monkeypatch)
+
+    first = configs.make_config_dict(config_file, None)
+    second = configs.make_config_dict(config_file, None)
+
+    assert len(reads) == 1
+    assert dict(second.items()) == dict(first.items())
+    assert second["qty_start"] == 4
+    assert os.path.exists(configs.compiled_config_path(config_file))
+
+
+def test_edited_config_file_is_read_in_again(tmp_path, monkeypatch):
+    config_file = write_config(tmp_path)
+    reads = count_reads(monkeypatch)
+    key = configs.compiled_key([config_file], None)
+
+    configs.make_config_dict(config_file, None)
+    write_config(tmp_path, CONFIG_TEXT.replace("qty_start = 4", "qty_start = 5"))
+
+    # same size, so only the modified time shows the edit
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    assert configs.compiled_key([config_file], None) != key
+    assert configs.make_config_dict(config_file, None)["qty_start"] == 5
+    assert len(reads) == 2
+
+
+def test_compiled_version_change_makes_compiled_config_stale(tmp_path, monkeypatch):
+    config_file = write_config(tmp_path)
+    reads = count_reads(monkeypatch)
+    key = configs.compiled_key([config_file], None)
+
+    configs.make_config_dict(config_file, None)
+    monkeypatch.setattr(configs, "COMPILED_VERSION", configs.COMPILED_VERSION + 1)
+
+    assert configs.compiled_key([config_file], None) != key
+    configs.make_config_dict(config_file, None)
+    assert len(reads) == 2
+
+
+def test_different_parameters_change_the_key(tmp_path):
+    config_file = write_config(tmp_path)
+
+    assert configs.compiled_key([config_file], None) != \
+        configs.compiled_key([config_file], ["qty_start=5"])
+
+
+def test_load_compiled_with_a_different_key(tmp_path):
+    config_file = write_config(tmp_path)
+    compiled_path = configs.compiled_config_path(config_file)
+
+    configs.make_config_dict(config_file, None)
+
+    assert configs.load_compiled(compiled_path, "stale") is None
+    assert configs.load_compiled(str(tmp_path / "missing.compiled"), "stale") is None
@@ -0,0 +1,179 @@
+"""
+File: test_excel.py
+Author: Kyle Fullerton
+Purpose: Tests for aggregating the rows of an input file and merging it
+into the output spreadsheet.
+"""
+
+import openpyxl
+import pytest
+
+from excelScript import excel, parts, readers, utils
+
+
+CONFIGS = {"header_row": 1, "out_remarks_index": 3, "qty_start": 4, "lines_skipped": False}
+
+HEADERS = ["Part", "Desc", "Remarks"]
+
+# rows are (part number, description, company, qty)
+FILES = [("100", [("PN-1", "res 10k", "ACME CORP", 2.0),
+                  ("PN-2", "cap", "BETA", 1.0),
+                  (" PN-1 ", "Res 10K", "ACME", 3.0),
+                  ("PN-1", "RES 10K", "ACME CORP", 1.0),
+                  ("PN-3", "led", "ACME", 4.0),
+                  ("PN-3", "LED", "ACME CORP", 1.0)]),
+         ("200", [("PN-2", "cap", "BETA", 5.0),
+                  ("PN-2", "cap", "BETA", 5.0),
+                  ("PN-1", "res 10k", "CORP", 1.0),
+                  ("PN-4", "diode", "GAMMA", 2.0)]),
+         ("100", [("PN-1", "res 10k", "ACME", 1.0),
+                  ("PN-4", "diode", "GAMMA", 1.0)])]
+
+
+"""
+Method: baseline_merge
+Purpose: Merges the files the way update_master did before the rows
+were aggregated, one row at a time. The only difference is that a
+company is matched against the companies in the remarks instead of
+anywhere in the remarks text, so ACME isn't lost next to ACME CORP.
+
+Parameters:
+files- list of tuples of an assembly number and its rows
+add_mode- whether qtys are added together or replaced
+
+Variables:
+headers- header row
+lines- rows of the output spreadsheet after the headers
+rows- dictionary of part number mapped to its row in lines
+column- column of the current assembly
+line- row of the current part
+
+Return: list of the rows of the output spreadsheet
+"""
+
+
+def baseline_merge(files, add_mode):
+    headers = list(HEADERS)
+    lines = []
+    rows = {}
+
+    for assembly, file_rows in files:
+        if assembly not in headers:
+            headers.append(assembly)
+        column = headers.index(assembly)
+
+        for row in file_rows:
+            row_data = list(row)
+            part_num = str(row_data[0]).strip()
+            row_data[1] = row_data[1].upper()
+
+            if part_num not in rows:
+                rows[part_num] = len(lines)
+                lines.append(row_data[:-1] + [None] * (column - 3) + [row_data[-1]])
+                continue
+
+            line = lines[rows[part_num]]
+            if row_data[2] not in line[2].split("/"):
+                line[2] += "/" + row_data[2]
+
+            line.extend([None] * (column + 1 - len(line)))
+            if line[column] is None or not add_mode:
+                line[column] = row_data[-1]
+            else:
+                line[column] += row_data[-1]
+
+    return [headers] + lines
+
+
+"""
+Method: merge
+Purpose: Merges the files into a new output spreadsheet with update_master.
+
+Parameters:
+files- list of tuples of an assembly number and its rows
+add_mode- whether qtys are added together or replaced
+
+Variables:
+configs- dictionary of configuration parameters
+write_sheet- Openpyxl worksheet of the output spreadsheet
+header_list- HeaderList of the output spreadsheet
+part_table- PartTable of the parts in the output spreadsheet
+
+Return: list of the rows of the output spreadsheet
+"""
+
+
+def merge(files, add_mode):
+    configs = dict(CONFIGS, add_mode=add_mode)
+    write_sheet = openpyxl.Workbook().active
+    write_sheet.append(HEADERS)
+    header_list = parts.HeaderList(HEADERS)
+    part_table = parts.PartTable(2)
+
+    for assembly, rows in files:
+        utils.add_assembly_num(header_list, write_sheet, assembly, configs)
+        excel.update_master(readers.InputFile(assembly, rows), write_sheet, header_list,
+                            part_table, configs, assembly + ".xlsx")
+
+    excel.write_remarks(write_sheet, part_table, configs)
+
+    return [list(row) for row in write_sheet.iter_rows(values_only=True)]
+
+
+"""
+Method: padded
+Purpose: Pads every row out to the same length with None.
+
+Parameter: rows- list of rows
+
+Return: list of the padded rows
+"""
+
+
+def padded(rows):
+    columns = max(len(row) for row in rows)
+
+    return [row + [None] * (columns - len(row)) for row in rows]
+
+
+def test_aggregate_rows_add_mode():
+    records = excel.aggregate_rows(FILES[0][1], dict(CONFIGS, add_mode=True))
+
+    assert list(records) == ["PN-1", "PN-2", "PN-3"]
+    assert records["PN-1"].qty == 6.0
+    assert records["PN-1"].info == ["PN-1", "RES 10K", "ACME CORP"]
+    assert list(records["PN-1"].companies) == ["ACME CORP", "ACME"]
+    assert list(records["PN-3"].companies) == ["ACME", "ACME CORP"]
+
+
+def test_aggregate_rows_replace_mode():
+    records = excel.aggregate_rows(FILES[1][1], dict(CONFIGS, add_mode=False))
+
+    assert records["PN-2"].qty == 5.0
+    assert list(records["PN-2"].companies) == ["BETA"]
+
+
+def test_aggregate_rows_upper_cases_every_description():
+    rows = [("PN-1", "res", "ACME", 1.0), ("PN-1", "Res", "ACME", 1.0)]
+    row_lists = [list(row) for row in rows]
+
+    records = excel.aggregate_rows(row_lists, dict(CONFIGS, add_mode=True))
+
+    assert records["PN-1"].info[1] == "RES"
+    # the rows given in aren't changed
+    assert row_lists[1][1] == "Res"
+
+
+@pytest.mark.parametrize("add_mode", [True, False])
+def test_merge_matches_baseline(add_mode):
+    assert padded(merge(FILES, add_mode)) == padded(baseline_merge(FILES, add_mode))
+
+
+def test_merge_repeated_and_substring_companies():
+    rows = merge(FILES, True)
+
+    assert rows[0] == ["Part", "Desc", "Remarks", "100", "200"]
+    assert rows[1] == ["PN-1", "RES 10K", "ACME CORP/ACME/CORP", 7.0, 1.0]
+    assert rows[2] == ["PN-2", "CAP", "BETA", 1.0, 10.0]
+    assert rows[3] == ["PN-3", "LED", "ACME/ACME CORP", 5.0, None]
+    assert rows[4] == ["PN-4", "DIODE", "GAMMA", 1.0, 2.0]
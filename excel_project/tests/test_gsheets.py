@@ -0,0 +1,193 @@
+"""
+File: test_gsheets.py
+Author: Kyle Fullerton
+Purpose: Tests for sending the google sheets requests in chunks to the
+fake google sheets service.
+"""
+
+import json
+import os
+
+import pytest
+
+from excelScript import gsheets
+from fake_sheets import FakeService
+
+
+"""
+Method: value_chunks
+Purpose: Makes values chunks that each write one row to Sheet1.
+
+Parameters:
+count- number of chunks
+width- number of characters in each value
+
+Return: list of (kind, body) chunks
+"""
+
+
+def value_chunks(count, width=1):
+    return [("values", {"valueInputOption": "RAW",
+                        "data": [{"range": "'Sheet1'!A{0}".format(i + 1),
+                                  "values": [[str(i) * width]]}]})
+            for i in range(count)]
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    slept = []
+    monkeypatch.setattr(gsheets.time, "sleep", slept.append)
+
+    return slept
+
+
+def test_chunk_items_item_limit():
+    chunks = gsheets.chunk_items(list(range(25)), max_items=10)
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert sum(chunks, []) == list(range(25))
+
+
+def test_chunk_items_byte_limit():
+    items = [{"value": "x" * 10}] * 6
+    size = len(json.dumps(items[0], separators=(",", ":"))) + 1
+    chunks = gsheets.chunk_items(items, max_bytes=size * 2)
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 2]
+
+
+def test_chunk_items_large_item_alone():
+    items = [{"v": "a"}, {"v": "b" * 100}, {"v": "c"}]
+    chunks = gsheets.chunk_items(items, max_bytes=50)
+
+    assert chunks == [[items[0]], [items[1]], [items[2]]]
+
+
+def test_send_requests_in_order(tmp_path):
+    service = FakeService(sheets=["Sheet1"])
+    progress_path = str(tmp_path / "progress.json")
+
+    gsheets.send_requests(service, "book", value_chunks(5), progress_path)
+
+    assert len(service.batches) == 5
+    assert service.sheet("Sheet1").rows() == [["0"], ["1"], ["2"], ["3"], ["4"]]
+    assert not os.path.exists(progress_path)
+
+
+def test_send_requests_retries_with_backoff(delays):
+    service = FakeService(sheets=["Sheet1"], failures=[429, 503])
+
+    gsheets.send_requests(service, "book", value_chunks(2))
+
+    assert service.calls == 4
+    assert len(service.batches) == 2
+    # the wait doubles each retry with up to half of it added as jitter
+    assert len(delays) == 2
+    assert gsheets.BACKOFF_SECONDS <= delays[0] <= gsheets.BACKOFF_SECONDS * 1.5
+    assert gsheets.BACKOFF_SECONDS * 2 <= delays[1] <= gsheets.BACKOFF_SECONDS * 3
+
+
+def test_send_requests_exits_on_permanent_failure(tmp_path, delays):
+    service = FakeService(sheets=["Sheet1"], failures=[400])
+    progress_path = str(tmp_path / "progress.json")
+
+    with pytest.raises(SystemExit) as error:
+        gsheets.send_requests(service, "book", value_chunks(3), progress_path)
+
+    assert error.value.code == 1
+    assert service.calls == 1
+    assert delays == []
+    assert service.batches == []
+
+
+def test_send_requests_exits_after_retries(delays):
+    service = FakeService(sheets=["Sheet1"], failures=[503] * (gsheets.MAX_RETRIES + 1))
+
+    with pytest.raises(SystemExit):
+        gsheets.send_requests(service, "book", value_chunks(1))
+
+    assert service.calls == gsheets.MAX_RETRIES + 1
+    assert len(delays) == gsheets.MAX_RETRIES
+
+
+def test_send_requests_resumes_at_failed_chunk(tmp_path, capsys):
+    # the third chunk is too big for the first service so the update stops there
+    chunks = value_chunks(2) + value_chunks(1, width=200) + value_chunks(2)
+    progress_path = str(tmp_path / "progress.json")
+    first_service = FakeService(sheets=["Sheet1"], max_bytes=150)
+
+    with pytest.raises(SystemExit):
+        gsheets.send_requests(first_service, "book", chunks, progress_path)
+
+    assert len(first_service.batches) == 2
+    with open(progress_path) as progress_file:
+        assert json.load(progress_file)["sent"] == 2
+    assert "stopped at chunk 3 of 5" in capsys.readouterr().out
+
+    second_service = FakeService(sheets=["Sheet1"])
+    gsheets.send_requests(second_service, "book", chunks, progress_path)
+
+    assert "Resuming google sheets update at chunk 3 of 5" in capsys.readouterr().out
+    assert second_service.batches == [body for kind, body in chunks[2:]]
+    assert not os.path.exists(progress_path)
+
+
+def test_send_requests_ignores_progress_of_other_requests(tmp_path):
+    progress_path = str(tmp_path / "progress.json")
+    gsheets.save_progress(progress_path, "other requests", 2)
+    service = FakeService(sheets=["Sheet1"])
+
+    gsheets.send_requests(service, "book", value_chunks(3), progress_path)
+
+    assert len(service.batches) == 3
+
+
+def test_diff_blocks_unchanged():
+    grids = {"Sheet1": [["PN", "Desc", 1], ["PN-1", "Res", 2]]}
+    blocks = [("Sheet1", 1, 0, [["PN", "Desc", 1], ["PN-1", "Res", 2]], "RAW")]
+
+    assert gsheets.diff_blocks(blocks, grids) == []
+
+
+def test_diff_blocks_changed_cells():
+    grids = {"Sheet1": [["PN-1", "Res", 1, 2], ["PN-2", "Cap", 3, 4], ["PN-3", "Ind", 5, 6]]}
+    blocks = [("Sheet1", 1, 1, [["Res", 1, 2], ["Cap", 7, 4], ["Ind", 8, 9]], "RAW")]
+
+    # rows with different changed columns are sent as their own blocks
+    assert gsheets.diff_blocks(blocks, grids) == [("Sheet1", 2, 2, [[7]], "RAW"),
+                                                  ("Sheet1", 3, 2, [[8, 9]], "RAW")]
+
+
+def test_diff_blocks_joins_rows_with_same_columns():
+    grids = {"Sheet1": [["PN-1", 1], ["PN-2", 2], ["PN-3", 3], ["PN-4", 4]]}
+    blocks = [("Sheet1", 1, 0, [["PN-1", 5], ["PN-2", 6], ["PN-3", 3], ["PN-4", 7]], "RAW")]
+
+    assert gsheets.diff_blocks(blocks, grids) == [("Sheet1", 1, 1, [[5], [6]], "RAW"),
+                                                  ("Sheet1", 4, 1, [[7]], "RAW")]
+
+
+def test_diff_blocks_new_rows_and_columns():
+    grids = {"Sheet1": [["PN-1", "Res", 1]]}
+    blocks = [("Sheet1", 1, 0, [["PN-1", "Res", 1, 4],
+                                ["PN-2", "Cap", 2, 5],
+                                ["PN-3", "Ind", 3, 6]], "USER_ENTERED")]
+
+    assert gsheets.diff_blocks(blocks, grids) == [
+        ("Sheet1", 1, 3, [[4]], "USER_ENTERED"),
+        ("Sheet1", 2, 0, [["PN-2", "Cap", 2, 5], ["PN-3", "Ind", 3, 6]], "USER_ENTERED")]
+
+
+def test_diff_blocks_new_sheet():
+    blocks = [("Totals", 1, 0, [["Part", "Total"], ["PN-1", 3]], "RAW")]
+
+    assert gsheets.diff_blocks(blocks, {}) == blocks
+
+
+def test_overlay_grids_matches_blocks():
+    grids = {"Sheet1": [["PN-1", "Res", 1]]}
+    blocks = [("Sheet1", 1, 0, [["PN-1", "Res", 4], ["PN-2", "Cap", 2]], "RAW")]
+    new_grids = gsheets.overlay_grids(grids, gsheets.diff_blocks(blocks, grids))
+
+    assert new_grids == {"Sheet1": [["PN-1", "Res", 4], ["PN-2", "Cap", 2]]}
+    assert grids == {"Sheet1": [["PN-1", "Res", 1]]}
+    assert gsheets.diff_blocks(blocks, new_grids) == []
@@ -0,0 +1,41 @@
+"""
+File: test_parts.py
+Author: Kyle Fullerton
+Purpose: Tests for keeping the companies in the remarks of a part.
+"""
+
+from excelScript import parts
+
+
+def test_remarks_start_from_the_remarks_text():
+    part_row = parts.PartRow(2, ["PN-1", "RES", "ACME/BETA"], [1.0])
+
+    assert not part_row.add_remark(2, "BETA")
+    assert part_row.add_remark(2, "GAMMA")
+    assert part_row.remarks_text() == "ACME/BETA/GAMMA"
+
+
+def test_remarks_keep_the_order_companies_were_added():
+    part_row = parts.PartRow(2, ["PN-1", "RES", ""], [1.0])
+
+    for company in ["GAMMA", "ACME", "GAMMA", "BETA", "ACME"]:
+        part_row.add_remark(2, company)
+
+    assert part_row.remarks_text() == "GAMMA/ACME/BETA"
+
+
+def test_remarks_substring_company_names():
+    part_row = parts.PartRow(2, ["PN-1", "RES", "ACME CORP"], [1.0])
+
+    # ACME is part of ACME CORP but is a different company
+    assert part_row.add_remark(2, "ACME")
+    assert part_row.add_remark(2, "CORP")
+    assert not part_row.add_remark(2, "ACME CORP")
+    assert part_row.remarks_text() == "ACME CORP/ACME/CORP"
+
+
+def test_remarks_empty_company_isnt_added():
+    part_row = parts.PartRow(2, ["PN-1", "RES", "ACME"], [1.0])
+
+    assert not part_row.add_remark(2, "")
+    assert part_row.remarks_text() == "ACME"
@@ -0,0 +1,72 @@
+"""
+File: test_rebuild.py
+Author: Kyle Fullerton
+Purpose: Tests for checking if the output file can be made again from
+its values.
+"""
+
+import openpyxl
+
+from excelScript import rebuild, utils
+
+
+CONFIGS = {"out_sheet_name": "BOM", "total_sheet_name": "Totals", "header_row": 1,
+           "out_remarks_index": 3, "qty_start": 4}
+
+
+def test_can_make_grid_book_openpyxl():
+    write_book = openpyxl.Workbook()
+    write_sheet = write_book.active
+    write_sheet.title = "BOM"
+    write_sheet.append(["Part", "Desc", "Remarks", "100"])
+    write_sheet.append(["PN-1", "RES", "ACME/BETA", 2])
+    utils.add_header(write_sheet["A1"], "Part")
+    utils.set_style(write_sheet["C2"], "BOM Remarks")
+    write_book.create_sheet("Totals")
+
+    assert rebuild.can_make_grid_book(write_book, write_sheet, CONFIGS)
+
+    write_sheet.freeze_panes = "A2"
+    assert not rebuild.can_make_grid_book(write_book, write_sheet, CONFIGS)
+
+    write_sheet.freeze_panes = None
+    write_sheet.merge_cells("A3:B3")
+    assert not rebuild.can_make_grid_book(write_book, write_sheet, CONFIGS)
+
+    write_sheet.unmerge_cells("A3:B3")
+    write_sheet["B2"].font = openpyxl.styles.Font(bold=True)
+    assert not rebuild.can_make_grid_book(write_book, write_sheet, CONFIGS)
+
+
+def test_can_make_grid_book_grid_book():
+    master_rows = [["Part", "Desc", "Remarks", "100"], ["PN-1", "RES", "ACME/BETA", 2.0]]
+    grid_book, grid_sheet = rebuild.make_grid_book(master_rows, CONFIGS)
+
+    assert rebuild.can_make_grid_book(grid_book, grid_sheet, CONFIGS)
+
+    grid_sheet.cell(2, 2).font = openpyxl.styles.Font(bold=True)
+    assert not rebuild.can_make_grid_book(grid_book, grid_sheet, CONFIGS)
+
+    grid_sheet.cell(2, 2).font = None
+    grid_book.create_sheet("Notes")
+    assert not rebuild.can_make_grid_book(grid_book, grid_sheet, CONFIGS)
+
+
+def test_grid_book_round_trip(tmp_path):
+    file_path = str(tmp_path / "BOM.xlsx")
+    master_rows = [["Part", "Desc", "Remarks", "100"],
+                   ["PN-1", "RES", "ACME/BETA", 2.0],
+                   ["PN-2", "", "ACME", ""]]
+    grid_book, grid_sheet = rebuild.make_grid_book(master_rows, CONFIGS)
+    grid_sheet.cell(3, 4).value = 5
+    grid_book.save(file_path)
+
+    grid_sheet = rebuild.load_grid_book(file_path)["BOM"]
+
+    assert list(grid_sheet.iter_rows()) == [("Part", "Desc", "Remarks", "100"),
+                                            ("PN-1", "RES", "ACME/BETA", 2),
+                                            ("PN-2", None, "ACME", 5)]
+    assert grid_sheet.cell(1, 1).fill.fgColor.rgb == "00C2C2C2"
+    assert grid_sheet.cell(2, 3).alignment.wrap_text
+    assert grid_sheet.cell(3, 3).alignment is None
+    assert sorted(grid_sheet.styled_cells()) == [(1, 1), (1, 2), (1, 3), (1, 4), (2, 3)]
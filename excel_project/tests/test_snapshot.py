@@ -0,0 +1,108 @@
+"""
+File: test_snapshot.py
+Author: Kyle Fullerton
+Purpose: Tests for saving the snapshot of the output sheet, reading it
+back in, and removing it when it can't be used.
+"""
+
+import datetime
+import os
+
+import openpyxl
+
+from excelScript import process_files, snapshot
+
+
+CONFIGS = {"out_sheet_name": "BOM", "total_sheet_name": "Totals", "header_row": 1,
+           "out_remarks_index": 3, "qty_start": 4}
+
+
+"""
+Method: save_book
+Purpose: Saves an output file with the given rows and its snapshot.
+
+Parameters:
+tmp_path- pathlib.Path of the directory
+rows- list of rows of values for the output sheet
+
+Variables:
+write_file- path of the output file
+write_book- Openpyxl workbook of the output file
+write_sheet- Openpyxl worksheet of the output file
+
+Returns:
+write_file- path of the output file
+write_book- Openpyxl workbook of the output file
+write_sheet- Openpyxl worksheet of the output file
+"""
+
+
+def save_book(tmp_path, rows):
+    write_file = str(tmp_path / "BOM.xlsx")
+    write_book = openpyxl.Workbook()
+    write_sheet = write_book.active
+    write_sheet.title = "BOM"
+
+    for row in rows:
+        write_sheet.append(row)
+
+    write_book.save(write_file)
+    snapshot.save_snapshot(write_file, write_book, write_sheet, CONFIGS)
+
+    return write_file, write_book, write_sheet
+
+
+def test_round_trip(tmp_path):
+    rows = [["Part", "Desc", "Remarks", "100", "200"],
+            ["PN-1", "RES 10K", "ACME/BETA", 2, 1.5],
+            ["PN-2", None, "ACME", None, -3],
+            ["PN-3", "CAP", "ÜBER €", True, False],
+            ["PN-4", "RES 10K"]]
+    write_file, write_book, write_sheet = save_book(tmp_path, rows)
+
+    master_rows = snapshot.load_snapshot(write_file, CONFIGS)
+
+    # short rows come back padded with empty cells
+    assert master_rows == [row + [""] * (5 - len(row))
+                           for row in process_files.read_master_rows(write_sheet)]
+    assert master_rows[2][1] == "" and master_rows[2][3] == ""
+    assert master_rows[1][3] == 2.0 and master_rows[2][4] == -3.0
+    assert master_rows[3][3] is True and master_rows[3][4] is False
+    assert master_rows[3][2] == "ÜBER €"
+
+
+def test_empty_sheet(tmp_path):
+    write_file, write_book, write_sheet = save_book(tmp_path, [])
+
+    assert snapshot.load_snapshot(write_file, CONFIGS) == []
+
+
+def test_changed_output_file(tmp_path):
+    write_file, write_book, write_sheet = save_book(tmp_path, [["Part", "Desc", "Remarks"]])
+    write_sheet.append(["PN-1", "RES", "ACME"])
+    write_book.save(write_file)
+
+    assert snapshot.load_snapshot(write_file, CONFIGS) is None
+    assert snapshot.load_snapshot(write_file, dict(CONFIGS, header_row=2)) is None
+
+
+def test_removed_for_values_it_cant_keep(tmp_path):
+    write_file, write_book, write_sheet = save_book(tmp_path, [["Part", "Desc", "Remarks"]])
+    assert os.path.exists(snapshot.snapshot_path(write_file))
+
+    write_sheet.append(["PN-1", "RES", datetime.datetime(2020, 1, 1)])
+    write_book.save(write_file)
+    snapshot.save_snapshot(write_file, write_book, write_sheet, CONFIGS)
+
+    assert not os.path.exists(snapshot.snapshot_path(write_file))
+    assert snapshot.load_snapshot(write_file, CONFIGS) is None
+
+
+def test_removed_for_other_sheets(tmp_path):
+    write_file, write_book, write_sheet = save_book(tmp_path, [["Part", "Desc", "Remarks"]])
+
+    write_book.create_sheet("Notes")
+    write_book.save(write_file)
+    snapshot.save_snapshot(write_file, write_book, write_sheet, CONFIGS)
+
+    assert not os.path.exists(snapshot.snapshot_path(write_file))
@@ -0,0 +1,90 @@
+"""
+File: test_stats.py
+Author: Kyle Fullerton
+Purpose: Tests for recording the stats and profile of each stage.
+"""
+
+import json
+import pstats
+
+from excelScript import stats
+
+
+"""
+Method: merge_one
+Purpose: Function profiled in the first merge stage.
+"""
+
+
+def merge_one():
+    return sum(range(10))
+
+
+"""
+Method: merge_two
+Purpose: Function profiled in the second merge stage.
+"""
+
+
+def merge_two():
+    return sum(range(20))
+
+
+"""
+Method: profiled_names
+Purpose: Gets the names of the functions in a cProfile stats file.
+
+Parameter: profile_path- path of the stats file
+
+Return: set of the function names
+"""
+
+
+def profiled_names(profile_path):
+    return {name for _, _, name in pstats.Stats(str(profile_path)).stats}
+
+
+def test_profile_keeps_every_merge(tmp_path):
+    profile_path = tmp_path / "merge.prof"
+    run_stats = stats.RunStats(profile_path=str(profile_path))
+
+    with run_stats.stage("merge", profile=True):
+        merge_one()
+
+    assert "merge_one" in profiled_names(profile_path)
+
+    with run_stats.stage("merge", profile=True):
+        merge_two()
+
+    names = profiled_names(profile_path)
+    assert "merge_one" in names
+    assert "merge_two" in names
+
+
+def test_stage_without_profile_isnt_profiled(tmp_path):
+    profile_path = tmp_path / "merge.prof"
+    run_stats = stats.RunStats(profile_path=str(profile_path))
+
+    with run_stats.stage("save"):
+        merge_one()
+
+    assert not profile_path.exists()
+
+
+def test_peak_memory_is_named_for_the_process(tmp_path):
+    json_path = tmp_path / "stats.json"
+    run_stats = stats.RunStats(json_path=str(json_path))
+
+    with run_stats.stage("merge"):
+        pass
+
+    with run_stats.file("asm.xlsx"):
+        pass
+
+    run_stats.save()
+    data = json.loads(json_path.read_text())
+
+    assert "process_peak_rss_kb" in data
+    assert "process_peak_rss_kb" in data["stages"][0]
+    assert "process_peak_rss_kb" in data["files"][0]
+    assert "peak_rss_kb" not in data["stages"][0]
@@ -0,0 +1,123 @@
+"""
+File: test_store.py
+Author: Kyle Fullerton
+Purpose: Tests for when the output file is made from the store and when
+it is read in again so nothing in it is lost.
+"""
+
+import datetime
+import json
+
+import openpyxl
+
+from excelScript import parts, store
+
+
+CONFIGS = {"out_sheet_name": "BOM", "total_sheet_name": "Totals", "header_row": 1,
+           "out_remarks_index": 3, "qty_start": 4}
+
+
+"""
+Method: make_store
+Purpose: Makes an output file and a store that has just exported it.
+
+Parameter: tmp_path- pathlib.Path of the directory
+
+Variables:
+write_file- path of the output file
+write_book- Openpyxl workbook of the output file
+write_sheet- Openpyxl worksheet of the output file
+master_store- MasterStore of the output file
+
+Returns:
+write_file- path of the output file
+master_store- MasterStore of the output file
+"""
+
+
+def make_store(tmp_path):
+    write_file = str(tmp_path / "BOM.xlsx")
+    write_book = openpyxl.Workbook()
+    write_sheet = write_book.active
+    write_sheet.title = "BOM"
+    write_sheet.append(["Part", "Desc", "Remarks", "100"])
+    write_sheet.append(["PN-1", "RES", "ACME", 2])
+    write_book.save(write_file)
+
+    master_store = store.open_store(write_file, CONFIGS)
+    with master_store.connection:
+        master_store.set_meta("config_key", master_store.config_key)
+        master_store.set_meta("head_rows", "[]")
+        master_store.set_meta("headers", json.dumps(["Part", "Desc", "Remarks", "100"]))
+        master_store.connection.execute("INSERT INTO parts VALUES ('PN-1', 2, ?)",
+                                        (json.dumps(["PN-1", "RES", "ACME"]),))
+        master_store.connection.execute("INSERT INTO quantities VALUES ('PN-1', 0, 2)")
+    master_store.rebuildable = True
+    master_store.record_export(write_file)
+
+    return write_file, master_store
+
+
+def test_load_book_from_store(tmp_path):
+    write_file, master_store = make_store(tmp_path)
+    write_book, write_sheet, loaded = store.load_book(master_store, write_file, CONFIGS)
+
+    assert loaded
+    assert master_store.rebuildable
+    assert list(write_sheet.iter_rows()) == [("Part", "Desc", "Remarks", "100"),
+                                             ("PN-1", "RES", "ACME", 2)]
+
+
+def test_load_book_edited_output_file(tmp_path, capsys):
+    write_file, master_store = make_store(tmp_path)
+    write_book = openpyxl.load_workbook(write_file)
+    write_book["BOM"]["B2"] = "RESISTOR"
+    write_book.save(write_file)
+
+    write_book, write_sheet, loaded = store.load_book(master_store, write_file, CONFIGS)
+
+    assert not loaded
+    assert write_sheet["B2"].value == "RESISTOR"
+    assert master_store.rebuildable
+    assert "has changed since it was exported" in capsys.readouterr().out
+
+
+def test_load_book_keeps_other_sheets(tmp_path, capsys):
+    write_file, master_store = make_store(tmp_path)
+    write_book = openpyxl.load_workbook(write_file)
+    write_book.create_sheet("Notes")["A1"] = "keep me"
+    write_book.save(write_file)
+
+    write_book, write_sheet, loaded = store.load_book(master_store, write_file, CONFIGS)
+
+    assert not loaded
+    assert write_book["Notes"]["A1"].value == "keep me"
+    assert not master_store.rebuildable
+    assert "will be read in on every run" in capsys.readouterr().out
+
+    # nothing is recorded for the export so the output file is read in again next time
+    write_book.save(write_file)
+    master_store.record_export(write_file)
+    assert master_store.get_meta("export") is None
+    assert not store.load_book(master_store, write_file, CONFIGS)[2]
+
+
+
+def test_dates_stop_the_output_file_being_made_from_the_store(tmp_path, capsys):
+    write_file, master_store = make_store(tmp_path)
+    part_row = parts.PartRow(3, ["PN-2", datetime.datetime(2024, 5, 1), "ACME"], [1])
+
+    with master_store.connection:
+        master_store.write_parts([("PN-1", parts.PartRow(2, ["PN-1", "RES", "ACME"], [2]))],
+                                 ["Part", "Desc", "Remarks", "100"], CONFIGS)
+    assert master_store.rebuildable
+
+    with master_store.connection:
+        master_store.write_parts([("PN-2", part_row)], ["Part", "Desc", "Remarks", "100"],
+                                 CONFIGS)
+
+    assert not master_store.rebuildable
+    assert "will be read in on every run" in capsys.readouterr().out
+
+    master_store.record_export(write_file)
+    assert master_store.get_meta("export") is None
@@ -0,0 +1,44 @@
+"""
+File: test_utils.py
+Author: Kyle Fullerton
+Purpose: Tests for converting between column numbers and column letters.
+"""
+
+import pytest
+
+from excelScript import utils
+
+
+# column numbers start at 0
+COLUMNS = [(0, "A"), (25, "Z"), (26, "AA"), (51, "AZ"), (52, "BA"), (701, "ZZ"),
+           (702, "AAA"), (16383, "XFD")]
+
+
+@pytest.mark.parametrize("number, letters", COLUMNS)
+def test_column_round_trip(number, letters):
+    assert utils.column_letters(number) == letters
+    assert utils.get_column_letter(number) == letters
+    assert utils.get_column_letter(str(number)) == letters
+    assert utils.get_column_num(letters) == number
+    assert utils.get_column_num(utils.get_column_letter(number)) == number
+
+
+def test_past_the_last_excel_column():
+    assert utils.get_column_letter(16384) == "XFE"
+    assert utils.get_column_num("XFE") == 16384
+
+
+@pytest.mark.parametrize("letters, number", [("a", 0), ("xfd", 16383), ("  AB ", 27),
+                                             ("\tzz\n", 701), ("5", 5), (3, 3)])
+def test_lower_case_and_padded_letters(letters, number):
+    assert utils.get_column_num(letters) == number
+
+
+@pytest.mark.parametrize("letters", ["", "   ", "A1", "A-B", "É", "AB C"])
+def test_bad_letters(letters):
+    with pytest.raises(ValueError):
+        utils.get_column_num(letters)
+
+
+def test_get_range():
+    assert utils.get_range(0, "AB", 1, 10) == "A1:AB10"
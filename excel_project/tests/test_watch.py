@@ -0,0 +1,81 @@
+"""
+File: test_watch.py
+Author: Kyle Fullerton
+Purpose: Tests for finding the new or changed files in the directory
+that is watched.
+"""
+
+from excelScript import watch
+
+
+"""
+Method: run_watch
+Purpose: Runs watch for a number of polls and then stops it like Ctrl+C.
+
+Parameters:
+monkeypatch- pytest MonkeyPatch object
+directory- pathlib.Path of the watched directory
+handled- sizes and modified times of the files before the first pass
+polls- number of polls before it is stopped
+changes- dictionary of poll number mapped to a function run before it
+
+Variables:
+merged- list of the lists of files that were merged
+flushes- list that gets an item each time the output file is saved
+slept- number of polls so far
+
+Returns:
+merged- list of the lists of files that were merged
+flushes- list that gets an item each time the output file is saved
+"""
+
+
+def run_watch(monkeypatch, directory, handled, polls, changes=None):
+    merged, flushes, slept = [], [], [0]
+
+    def sleep(seconds):
+        slept[0] += 1
+        if slept[0] > polls:
+            raise KeyboardInterrupt
+        (changes or {}).get(slept[0], lambda: None)()
+
+    monkeypatch.setattr(watch.time, "sleep", sleep)
+    watch.watch(str(directory), str(directory / "BOM.xlsx"), handled, merged.append,
+                lambda: flushes.append(True), 0, 3600)
+
+    return merged, flushes
+
+
+def test_stat_files_leaves_out_output_files(tmp_path):
+    for file in ("BOM.xlsx", "BOM.xlsx.cache", "BOM.xlsx.db", "BOM.xlsx.snap",
+                 "BOM.xlsx.gsheets", "BOM.xlsx.gsheets.json", "BOM.xlsx.pending", "asm.xlsx"):
+        (tmp_path / file).write_bytes(b"data")
+    (tmp_path / "folder").mkdir()
+
+    assert list(watch.stat_files(str(tmp_path), str(tmp_path / "BOM.xlsx"))) == ["asm.xlsx"]
+
+
+def test_file_changed_during_first_pass(tmp_path, monkeypatch):
+    (tmp_path / "asm.xlsx").write_bytes(b"data")
+    handled = watch.stat_files(str(tmp_path), str(tmp_path / "BOM.xlsx"))
+
+    # the file changes after it was looked at but before the first poll
+    (tmp_path / "asm.xlsx").write_bytes(b"new data")
+    merged, flushes = run_watch(monkeypatch, tmp_path, handled, 3)
+
+    assert merged == [["asm.xlsx"]]
+    assert flushes == [True]
+
+
+def test_sidecar_files_written_while_watching(tmp_path, monkeypatch):
+    (tmp_path / "asm.xlsx").write_bytes(b"data")
+    handled = watch.stat_files(str(tmp_path), str(tmp_path / "BOM.xlsx"))
+
+    def sync():
+        (tmp_path / "BOM.xlsx.gsheets.json").write_bytes(b"{}")
+        (tmp_path / "BOM.xlsx.gsheets").write_bytes(b"{}")
+
+    merged, flushes = run_watch(monkeypatch, tmp_path, handled, 4, {1: sync})
+
+    assert merged == []
+    assert flushes == []